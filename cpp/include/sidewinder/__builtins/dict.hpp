@@ -0,0 +1,324 @@
+#pragma once
+
+#include <sidewinder/__builtins/str.hpp>
+#include <sidewinder/__builtins/types.hpp>
+
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <functional>
+#include <limits>
+#include <memory>
+#include <utility>
+#include <vector>
+
+namespace __detail {
+
+// How dict keys of type K are hashed and compared
+template <typename K>
+struct KeyTraits;
+
+// Ints and bools hash to themselves, so equal hashes mean equal keys, and
+// lookups never compare keys
+template <typename K>
+  requires std::is_same_v<K, Int> || std::is_same_v<K, Bool>
+struct KeyTraits<K> {
+  static constexpr bool kHashIsKey = true;
+
+  static std::size_t Hash(const K key) noexcept { return static_cast<std::uint32_t>(key); }
+  static bool Equal(const K a, const K b) noexcept { return a == b; }
+};
+
+template <>
+struct KeyTraits<Float> {
+  static constexpr bool kHashIsKey = false;
+
+  static std::size_t Hash(const Float key) noexcept { return std::hash<Float>{}(key); }
+  static bool Equal(const Float a, const Float b) noexcept { return a == b; }
+};
+
+// Objects hash themselves, and the same object is always equal to itself
+template <Object K>
+  requires HasHash<K>
+struct KeyTraits<K> {
+  static constexpr bool kHashIsKey = false;
+
+  static std::size_t Hash(const Reference<K>& key) {
+    return static_cast<std::uint32_t>(key->__Hash());
+  }
+  static bool Equal(const Reference<K>& a, const Reference<K>& b) { return a == b || *a == *b; }
+};
+
+// strs use all 64 bits of their cached hash. Entries are only compared
+// once their hashes match, so equal lengths are all that is left to rule out.
+template <>
+struct KeyTraits<Str> {
+  static constexpr bool kHashIsKey = false;
+
+  static std::size_t Hash(const Reference<Str>& key) noexcept { return key->Hash(); }
+  static bool Equal(const Reference<Str>& a, const Reference<Str>& b) noexcept {
+    return a == b || a->View() == b->View();
+  }
+};
+
+}  // namespace __detail
+
+// An insertion-ordered hash table, laid out as CPython's dict. Entries are
+// appended to a dense array, which is all iteration walks, and a sparse
+// array of indices into it is probed with open addressing. Indices are as
+// narrow as the number of entries allows. Each entry caches its key's hash,
+// so growing never rehashes, and lookups only compare keys whose hashes
+// match.
+template <typename K, typename V>
+class Dict : public RefCounted {
+ public:
+  using Key = Mutable<K>;
+  using Value = Mutable<V>;
+
+  struct Entry {
+    std::size_t hash;
+    Key key;
+    Value value;
+  };
+
+  // Iterates over entries in insertion order, skipping erased ones
+  class Iterator {
+   public:
+    Iterator(const Entry* entry, const Entry* end) noexcept : entry_(entry), end_(end) {
+      SkipErased();
+    }
+
+    const Entry& operator*() const noexcept { return *entry_; }
+    const Entry* operator->() const noexcept { return entry_; }
+
+    Iterator& operator++() noexcept {
+      ++entry_;
+      SkipErased();
+      return *this;
+    }
+
+    friend bool operator==(const Iterator& a, const Iterator& b) noexcept {
+      return a.entry_ == b.entry_;
+    }
+
+   private:
+    void SkipErased() noexcept {
+      while (entry_ != end_ && entry_->hash == kErased) {
+        ++entry_;
+      }
+    }
+
+    const Entry* entry_;
+    const Entry* end_;
+  };
+
+  std::size_t Size() const noexcept { return size_; }
+
+  // The value of `key`, or null if it has none
+  Value* Find(Const<K> key) noexcept {
+    return const_cast<Value*>(std::as_const(*this).Find(key));
+  }
+
+  const Value* Find(Const<K> key) const noexcept {
+    const Slot slot = Probe(HashOf(key), key);
+
+    return slot.index >= 0 ? &entries_[slot.index].value : nullptr;
+  }
+
+  bool Contains(Const<K> key) const noexcept { return Find(key) != nullptr; }
+
+  // Replacing the value of a key keeps its position in the order
+  void Set(Const<K> key, Value value) {
+    const std::size_t hash = HashOf(key);
+    Slot slot = Probe(hash, key);
+
+    if (slot.index >= 0) {
+      entries_[slot.index].value = std::move(value);
+      return;
+    }
+
+    if (entries_.size() == Usable()) {
+      // As in CPython, leave room for twice the entries in use
+      Resize(3 * size_ + 1);
+      slot.position = EmptySlot(hash);
+    }
+
+    SetIndexAt(slot.position, static_cast<std::int64_t>(entries_.size()));
+    entries_.push_back(Entry{hash, Key(key), std::move(value)});
+    ++size_;
+  }
+
+  // False if `key` was not in the dict
+  bool Erase(Const<K> key) {
+    const Slot slot = Probe(HashOf(key), key);
+
+    if (slot.index < 0) {
+      return false;
+    }
+
+    // Erased entries stay in place until the next resize, so that the
+    // indices of later entries remain valid
+    Entry& entry = entries_[slot.index];
+    entry.hash = kErased;
+    entry.key = Key();
+    entry.value = Value();
+    SetIndexAt(slot.position, kDummy);
+    --size_;
+
+    return true;
+  }
+
+  Iterator begin() const noexcept {
+    return Iterator(entries_.data(), entries_.data() + entries_.size());
+  }
+  Iterator end() const noexcept {
+    return Iterator(entries_.data() + entries_.size(), entries_.data() + entries_.size());
+  }
+
+ private:
+  using Traits = __detail::KeyTraits<K>;
+
+  // Hashes are masked to leave the top bit clear, so that no key hashes to
+  // the marker of erased entries
+  static constexpr std::size_t kErased = std::numeric_limits<std::size_t>::max();
+  static constexpr std::size_t kHashMask = kErased >> 1;
+
+  // Index values of never used slots and of slots whose entry was erased,
+  // which probing continues past
+  static constexpr std::int64_t kEmpty = -1;
+  static constexpr std::int64_t kDummy = -2;
+
+  static constexpr std::size_t kMinIndexSize = 8;
+  static constexpr unsigned kPerturbShift = 5;
+
+  struct Slot {
+    // Where the key is, or the first empty slot where it would go
+    std::size_t position;
+    // Index of the key's entry, or kEmpty if it is not in the dict
+    std::int64_t index;
+  };
+
+  static std::size_t HashOf(Const<K> key) { return Traits::Hash(key) & kHashMask; }
+
+  // Two thirds of the index slots, so that probe sequences stay short
+  std::size_t Usable() const noexcept { return index_size_ * 2 / 3; }
+
+  Slot Probe(const std::size_t hash, Const<K> key) const noexcept {
+    if (index_size_ == 0) {
+      return Slot{0, kEmpty};
+    }
+
+    const std::size_t mask = index_size_ - 1;
+    std::size_t position = hash & mask;
+
+    // CPython's recurrence, which mixes in the upper bits of the hash and
+    // eventually visits every slot
+    for (std::size_t perturb = hash;;) {
+      const std::int64_t index = IndexAt(position);
+
+      if (index == kEmpty) {
+        return Slot{position, kEmpty};
+      }
+
+      if (index != kDummy) {
+        const Entry& entry = entries_[index];
+
+        if (entry.hash == hash && (Traits::kHashIsKey || Traits::Equal(entry.key, key))) {
+          return Slot{position, index};
+        }
+      }
+
+      perturb >>= kPerturbShift;
+      position = (position * 5 + perturb + 1) & mask;
+    }
+  }
+
+  // The first empty slot for `hash`, after a resize, when there are no dummies
+  std::size_t EmptySlot(const std::size_t hash) const noexcept {
+    const std::size_t mask = index_size_ - 1;
+    std::size_t position = hash & mask;
+
+    for (std::size_t perturb = hash; IndexAt(position) != kEmpty;) {
+      perturb >>= kPerturbShift;
+      position = (position * 5 + perturb + 1) & mask;
+    }
+
+    return position;
+  }
+
+  // Drops erased entries and rebuilds the indices from the cached hashes
+  void Resize(const std::size_t min_index_size) {
+    std::erase_if(entries_, [](const Entry& entry) { return entry.hash == kErased; });
+
+    index_size_ = kMinIndexSize;
+
+    while (index_size_ < min_index_size) {
+      index_size_ <<= 1;
+    }
+
+    index_width_ = index_size_ <= 0x80          ? 1
+                   : index_size_ <= 0x8000      ? 2
+                   : index_size_ <= 0x80000000u ? 4
+                                                : 8;
+    // Every byte set makes every index -1, which is kEmpty at any width
+    indices_ = std::make_unique<std::byte[]>(index_size_ * index_width_);
+    std::memset(indices_.get(), 0xff, index_size_ * index_width_);
+
+    for (std::size_t i = 0; i < entries_.size(); ++i) {
+      SetIndexAt(EmptySlot(entries_[i].hash), static_cast<std::int64_t>(i));
+    }
+
+    entries_.reserve(Usable());
+  }
+
+  std::int64_t IndexAt(const std::size_t position) const noexcept {
+    switch (index_width_) {
+      case 1:
+        return Load<std::int8_t>(position);
+      case 2:
+        return Load<std::int16_t>(position);
+      case 4:
+        return Load<std::int32_t>(position);
+      default:
+        return Load<std::int64_t>(position);
+    }
+  }
+
+  void SetIndexAt(const std::size_t position, const std::int64_t index) noexcept {
+    switch (index_width_) {
+      case 1:
+        Store<std::int8_t>(position, index);
+        break;
+      case 2:
+        Store<std::int16_t>(position, index);
+        break;
+      case 4:
+        Store<std::int32_t>(position, index);
+        break;
+      default:
+        Store<std::int64_t>(position, index);
+    }
+  }
+
+  template <typename I>
+  std::int64_t Load(const std::size_t position) const noexcept {
+    I index;
+    std::memcpy(&index, indices_.get() + position * sizeof(I), sizeof(I));
+    return index;
+  }
+
+  template <typename I>
+  void Store(const std::size_t position, const std::int64_t index) noexcept {
+    const I narrow = static_cast<I>(index);
+    std::memcpy(indices_.get() + position * sizeof(I), &narrow, sizeof(I));
+  }
+
+  std::vector<Entry> entries_;
+  std::unique_ptr<std::byte[]> indices_;
+  // A power of two, or 0 until the first insertion
+  std::size_t index_size_ = 0;
+  // Bytes per index
+  unsigned index_width_ = 0;
+  // Entries that were not erased
+  std::size_t size_ = 0;
+};
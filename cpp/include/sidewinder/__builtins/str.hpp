@@ -0,0 +1,90 @@
+#pragma once
+
+#include <sidewinder/__builtins/types.hpp>
+
+#include <cstddef>
+#include <cstdint>
+#include <string_view>
+
+// 64-bit FNV-1a of the UTF-8 bytes of a str, never 0 so that 0 can mark a
+// hash that was not computed yet. The compiler emits the same hash into the
+// headers of str literals.
+constexpr std::uint64_t HashBytes(const std::string_view bytes) noexcept {
+  std::uint64_t hash = 0xcbf29ce484222325u;
+
+  for (const char byte : bytes) {
+    hash = (hash ^ static_cast<unsigned char>(byte)) * 0x100000001b3u;
+  }
+
+  return hash != 0 ? hash : 1;
+}
+
+// An immutable str. Up to kInlineCapacity bytes are stored in the object
+// itself, so short strs take a single allocation, and longer ones in a
+// buffer of their own. Literals are immortal objects with static storage
+// duration, whose bytes are the literal's own and whose hash is computed
+// at compile time:
+//
+//   constinit Str kGreeting(RefCounted::Immortal{}, "hello");
+//
+// The hash of other strs is computed on first use and cached.
+class Str : public RefCounted {
+ public:
+  static constexpr std::size_t kInlineCapacity = 22;
+
+  explicit Str(const std::string_view text) : size_(text.size()) {
+    char* data = size_ <= kInlineCapacity ? inline_ : new char[size_ + 1];
+    text.copy(data, size_);
+    data[size_] = '\0';
+    data_ = data;
+    heap_ = data != inline_;
+  }
+
+  constexpr Str(Immortal immortal, const std::string_view literal) noexcept
+      : RefCounted(immortal),
+        data_(literal.data()),
+        size_(literal.size()),
+        hash_(HashBytes(literal)) {}
+
+  Str(const Str& other) : Str(other.View()) {}
+  Str& operator=(const Str&) = delete;
+
+  ~Str() override {
+    if (heap_) {
+      delete[] data_;
+    }
+  }
+
+  // NUL-terminated, except for literals, which are exactly their bytes
+  const char* Data() const noexcept { return data_; }
+  std::size_t Size() const noexcept { return size_; }
+  std::string_view View() const noexcept { return std::string_view(data_, size_); }
+
+  std::uint64_t Hash() const noexcept {
+    if (hash_ == 0) {
+      hash_ = HashBytes(View());
+    }
+
+    return hash_;
+  }
+
+  Int __Hash() const noexcept { return static_cast<Int>(Hash()); }
+  Int __Len() const noexcept { return static_cast<Int>(size_); }
+
+  friend bool operator==(const Str& a, const Str& b) noexcept {
+    // Cached hashes that differ settle it without reading the bytes
+    if (a.size_ != b.size_ || (a.hash_ != 0 && b.hash_ != 0 && a.hash_ != b.hash_)) {
+      return false;
+    }
+
+    return a.View() == b.View();
+  }
+
+ private:
+  const char* data_ = inline_;
+  std::size_t size_ = 0;
+  mutable std::uint64_t hash_ = 0;
+  char inline_[kInlineCapacity + 1] = {};
+  // Whether data_ is a buffer this owns
+  bool heap_ = false;
+};
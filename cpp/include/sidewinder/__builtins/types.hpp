@@ -1,7 +1,12 @@
+#pragma once
+
+#include <atomic>
+#include <concepts>
 #include <cstddef>
-#include <memory>
+#include <cstdint>
 #include <optional>
 #include <type_traits>
+#include <utility>
 
 using Int = int;
 using Bool = bool;
@@ -24,17 +29,153 @@ concept Value = std::is_same_v<T, Int> || std::is_same_v<T, Float> ||
 template <typename T>
 concept Object = !Value<T>;
 
+template <typename T>
+concept HasHash = requires(const T& t) {
+  { t.__Hash() } -> std::same_as<Int>;
+};
+
+// Reference counts are only atomic when objects may be shared between
+// threads, which programs opt into by defining SIDEWINDER_THREADED
+#ifdef SIDEWINDER_THREADED
+inline constexpr bool kThreaded = true;
+#else
+inline constexpr bool kThreaded = false;
+#endif
+
+// Every object extends this, so that its reference count lives in the same
+// allocation as the object itself
+class RefCounted {
+ public:
+  // Objects with static storage duration, such as str literals, start out
+  // with a reference to themselves that is never released, so that they
+  // are never deleted
+  struct Immortal {};
+
+  constexpr RefCounted() = default;
+  constexpr explicit RefCounted(Immortal) noexcept : ref_count_(1) {}
+
+  // A copy is a new object, with no references to it yet
+  RefCounted(const RefCounted&) noexcept {}
+  RefCounted& operator=(const RefCounted&) noexcept { return *this; }
+
+  void Retain() const noexcept {
+#ifdef SIDEWINDER_THREADED
+    ref_count_.fetch_add(1, std::memory_order_relaxed);
+#else
+    ++ref_count_;
+#endif
+  }
+
+  // True if this released the last reference, and the object must be deleted
+  bool Release() const noexcept {
+#ifdef SIDEWINDER_THREADED
+    return ref_count_.fetch_sub(1, std::memory_order_acq_rel) == 1;
+#else
+    return --ref_count_ == 0;
+#endif
+  }
+
+  // Virtual because a Ref to a base class may hold the last reference
+  virtual ~RefCounted() = default;
+
+  std::uint32_t RefCount() const noexcept { return ref_count_; }
+
+ private:
+  using Count = std::conditional_t<kThreaded, std::atomic<std::uint32_t>, std::uint32_t>;
+
+  mutable Count ref_count_{0};
+};
+
+template <typename T>
+class Ref {
+ public:
+  constexpr Ref() noexcept = default;
+  constexpr Ref(std::nullptr_t) noexcept {}
+
+  explicit Ref(T* ptr) noexcept : ptr_(ptr) {
+    if (ptr_) {
+      ptr_->Retain();
+    }
+  }
+
+  Ref(const Ref& other) noexcept : Ref(other.ptr_) {}
+  Ref(Ref&& other) noexcept : ptr_(std::exchange(other.ptr_, nullptr)) {}
+
+  template <typename U>
+    requires std::is_convertible_v<U*, T*>
+  Ref(const Ref<U>& other) noexcept : Ref(other.Get()) {}
+
+  template <typename U>
+    requires std::is_convertible_v<U*, T*>
+  Ref(Ref<U>&& other) noexcept : ptr_(other.Detach()) {}
+
+  ~Ref() { Reset(); }
+
+  Ref& operator=(Ref other) noexcept {
+    std::swap(ptr_, other.ptr_);
+    return *this;
+  }
+
+  template <typename... Args>
+  static Ref Make(Args&&... args) {
+    return Ref(new T(std::forward<Args>(args)...));
+  }
+
+  T* Get() const noexcept { return ptr_; }
+  T& operator*() const noexcept { return *ptr_; }
+  T* operator->() const noexcept { return ptr_; }
+  explicit operator bool() const noexcept { return ptr_ != nullptr; }
+
+  // Gives up ownership without releasing, for moves between Refs
+  T* Detach() noexcept { return std::exchange(ptr_, nullptr); }
+
+  void Reset() noexcept {
+    T* ptr = std::exchange(ptr_, nullptr);
+
+    if (ptr && ptr->Release()) {
+      delete ptr;
+    }
+  }
+
+  friend bool operator==(const Ref& a, const Ref& b) noexcept { return a.ptr_ == b.ptr_; }
+  friend bool operator==(const Ref& a, std::nullptr_t) noexcept { return a.ptr_ == nullptr; }
+
+ private:
+  T* ptr_ = nullptr;
+};
+
+template <Object T>
+using Reference = Ref<T>;
+
+namespace __detail {
+
+// How a type is passed around: values by copy, objects by reference.
+// Const parameters borrow the caller's reference, so passing an object
+// to them costs no retain or release.
+template <typename T>
+struct Passing {
+  using Const = const T;
+  using Mutable = T;
+  using Optional = std::optional<T>;
+};
+
 template <Object T>
-using Reference = std::shared_ptr<T>;
+struct Passing<T> {
+  using Const = const Reference<T>&;
+  using Mutable = Reference<T>;
+  using Optional = Reference<T>;
+};
+
+}  // namespace __detail
 
 template <typename T>
-using Optional = std::conditional_t<std::optional<T>, Reference<T>>;
+using Optional = typename __detail::Passing<T>::Optional;
 
 template <typename T>
-using Const = std::conditional_t<Value<T>, const T, const Reference<T>&>;
+using Const = typename __detail::Passing<T>::Const;
 
 template <typename T>
-using Mutable = std::conditional_t<Value<T>, T, Reference<T>>;
+using Mutable = typename __detail::Passing<T>::Mutable;
 
 template <typename T>
-constexpr auto kNone = std::conditional_t<Value<T>, std::nullopt, std::nullptr>;
+inline const Optional<T> kNone{};
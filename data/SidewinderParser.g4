@@ -0,0 +1,241 @@
+/*
+ * Sidewinder subset of the Python 3.12 parser grammar from
+ * https://github.com/antlr/grammars-v4/tree/master/python/python3_12
+ *
+ * Version 1
+ *
+ * Rules and alternatives for features that Sidewinder does not support (see
+ * doc/planning.md) are removed, Sidewinder extensions are added, and
+ * alternatives that share a prefix are left-factored so that prediction does
+ * not need full-context lookahead. The grammar name, token vocabulary, base
+ * class and the names of the remaining rules are unchanged, which makes this
+ * a drop-in replacement for the upstream PythonParser.g4.
+ */
+
+parser grammar PythonParser;
+
+options {
+    tokenVocab=PythonLexer;
+    superClass=PythonParserBase;
+}
+
+// STARTING RULES
+// ==============
+
+file_input: statements? EOF;
+
+// GENERAL STATEMENTS
+// ==================
+
+statements: statement+;
+
+statement: compound_stmt | simple_stmts;
+
+simple_stmts: simple_stmt NEWLINE;
+
+// Assignments only have single names as targets, so telling them apart from
+// expression statements needs at most two tokens of lookahead
+simple_stmt
+    : assignment
+    | star_expressions
+    | return_stmt
+    | 'pass'
+    | 'break'
+    | 'continue'
+    ;
+
+compound_stmt
+    : function_def
+    | extern_def
+    | if_stmt
+    | class_def
+    | struct_def
+    | with_stmt
+    | for_stmt
+    | try_stmt
+    | while_stmt
+    ;
+
+// SIMPLE STATEMENTS
+// =================
+
+assignment
+    : NAME ':' expression ('=' star_expressions)?
+    | NAME '=' star_expressions
+    ;
+
+return_stmt: 'return' star_expressions?;
+
+// COMPOUND STATEMENTS
+// ===================
+
+block: NEWLINE INDENT statements DEDENT | simple_stmts;
+
+// Class definitions
+// -----------------
+
+class_def: 'class' NAME ('(' arguments? ')')? ':' block;
+
+// Sidewinder extension: immutable, copy-only class
+struct_def: soft_kw_struct NAME ':' block;
+
+// Function definitions
+// --------------------
+
+function_def: function_def_raw;
+
+function_def_raw: 'def' NAME '(' params? ')' ('->' expression)? ':' block;
+
+// Sidewinder extension: declaration of a function defined outside of Sidewinder
+extern_def: soft_kw_extern 'def' NAME '(' params? ')' ('->' expression)? NEWLINE;
+
+// Function parameters
+// -------------------
+
+params: parameters;
+
+// Left-factored from the upstream alternatives, which all start with a
+// parameter. Defaults must come last, which the AST builder checks.
+parameters: param_maybe_default (',' param_maybe_default)* ','?;
+
+param_maybe_default: param default_assignment?;
+
+param: NAME annotation?;
+
+annotation: ':' expression;
+
+default_assignment: '=' expression;
+
+// If statement
+// ------------
+
+if_stmt: 'if' expression ':' block (elif_stmt | else_block)?;
+
+elif_stmt: 'elif' expression ':' block (elif_stmt | else_block)?;
+
+else_block: 'else' ':' block;
+
+// While statement
+// ---------------
+
+while_stmt: 'while' expression ':' block else_block?;
+
+// For statement
+// -------------
+
+for_stmt: 'for' star_targets 'in' star_expressions ':' block else_block?;
+
+// With statement
+// --------------
+
+with_stmt: 'with' with_item (',' with_item)* ':' block;
+
+with_item: expression ('as' NAME)?;
+
+// Try statement
+// -------------
+
+try_stmt: 'try' ':' block (except_block+ else_block? finally_block? | finally_block);
+
+except_block: 'except' (expression ('as' NAME)?)? ':' block;
+
+finally_block: 'finally' ':' block;
+
+// EXPRESSIONS
+// ===========
+
+expressions: expression (',' expression)* ','?;
+
+expression: disjunction;
+
+star_expressions: expression (',' expression)* ','?;
+
+// Comparison operators
+// --------------------
+
+disjunction: conjunction ('or' conjunction)*;
+
+conjunction: inversion ('and' inversion)*;
+
+inversion: 'not' inversion | comparison;
+
+comparison: sum compare_op_sum_pair*;
+
+// Left-factored 'is' / 'is not' and 'in' / 'not in'
+compare_op_sum_pair: compare_op sum;
+
+compare_op: '==' | '!=' | '<=' | '<' | '>=' | '>' | 'is' 'not'? | 'not'? 'in';
+
+// Arithmetic operators
+// --------------------
+
+sum: sum ('+' | '-') term | term;
+
+term: term ('*' | '/' | '%') factor | factor;
+
+factor: ('+' | '-') factor | power;
+
+power: primary ('**' factor)?;
+
+// Primary elements
+// ----------------
+
+primary
+    : primary '.' NAME
+    | primary '(' arguments? ')'
+    | primary '[' slices ']'
+    | atom
+    ;
+
+slices: slice (',' slice)* ','?;
+
+slice: expression? ':' expression? (':' expression?)? | expression;
+
+atom
+    : NAME
+    | 'True'
+    | 'False'
+    | 'None'
+    | strings
+    | NUMBER
+    | group
+    | list
+    | dict_or_set
+    ;
+
+// Literals
+// ========
+
+strings: string+;
+
+string: STRING;
+
+list: '[' expressions? ']';
+
+// Covers both parenthesized expressions and tuples, which upstream has as
+// separate alternatives sharing the '(' expression prefix
+group: '(' (expression (',' expressions?)?)? ')';
+
+// Left-factored dict and set displays, which share the '{' expression prefix
+dict_or_set: '{' (expression (':' expression (',' kvpair)* | (',' expression)*) ','?)? '}';
+
+kvpair: expression ':' expression;
+
+// Assignment targets
+// ==================
+
+star_targets: NAME (',' NAME)* ','?;
+
+// ARGUMENTS
+// =========
+
+arguments: args ','?;
+
+args: expression (',' expression)*;
+
+// SOFT KEYWORDS
+// =============
+
+soft_kw_struct: {this.isEqualToCurrentTokenText("struct")}? NAME;
+
+soft_kw_extern: {this.isEqualToCurrentTokenText("extern")}? NAME;
@@ -3,7 +3,7 @@ import argparse
 import sys
 from dataclasses import dataclass
 from io import StringIO
-from typing import AbstractSet, Optional, MutableSequence, Sequence, TypeAlias
+from typing import AbstractSet, Mapping, Optional, MutableSequence, Sequence, TypeAlias
 
 ArgumentType: TypeAlias = str
 ArgumentName: TypeAlias = str
@@ -140,12 +140,26 @@ def generate_function_argument_proxy(func_sig: FunctionSignature) -> str:
     for i, arg in enumerate(args):
         buffer.write(f"using arg{i}_type = {arg.arg_type};\n")
 
+    # Arguments are stored by value but handed out by reference, so that
+    # borrowed Const<T> parameters are passed without a retain/release
+    for i in range(len(args)):
+        buffer.write(f"using arg{i}_storage_type = std::remove_cvref_t<arg{i}_type>;\n")
+
+    # Missing arguments take their default values
     buffer.newline()
     buffer.write(f"explicit {proxy_class_name}(std::vector<std::any> args) {{\n")
     buffer.indent()
 
-    for i in range(len(args)):
-        buffer.write(f"arg{i}_ = std::any_cast<arg{i}_type>(args[{i}]);\n")
+    for i, arg in enumerate(args):
+        cast: str = f"std::any_cast<arg{i}_storage_type>(std::move(args[{i}]))"
+
+        if arg.default_value:
+            buffer.write(
+                f"arg{i}_ = args.size() > {i} ? {cast} "
+                f": arg{i}_storage_type({arg.default_value});\n"
+            )
+        else:
+            buffer.write(f"arg{i}_ = {cast};\n")
 
     buffer.dedent()
     buffer.write("}\n")
@@ -157,14 +171,25 @@ def generate_function_argument_proxy(func_sig: FunctionSignature) -> str:
 
     buffer.indent()
     for i, arg in enumerate(args):
-        buffer.write(f'arg{i}_ = std::any_cast<arg{i}_type>(args.at("{arg.name}"));\n')
+        if arg.default_value:
+            buffer.write(f'auto arg{i} = args.find("{arg.name}");\n')
+            buffer.write(f"arg{i}_ = arg{i} != args.end()\n")
+            buffer.indent(n=4)
+            buffer.write(f"? std::any_cast<arg{i}_storage_type>(std::move(arg{i}->second))\n")
+            buffer.write(f": arg{i}_storage_type({arg.default_value});\n")
+            buffer.dedent(n=4)
+        else:
+            buffer.write(
+                f"arg{i}_ = std::any_cast<arg{i}_storage_type>("
+                f'std::move(args.at("{arg.name}")));\n'
+            )
 
     buffer.dedent()
     buffer.write("}\n")
 
     buffer.newline()
     for i in range(len(args)):
-        buffer.write(f"arg{i}_type Arg{i}() const {{ return arg{i}_; }}\n")
+        buffer.write(f"const arg{i}_storage_type& Arg{i}() const {{ return arg{i}_; }}\n")
 
     buffer.dedent()
     buffer.indent(n=1)
@@ -174,7 +199,7 @@ def generate_function_argument_proxy(func_sig: FunctionSignature) -> str:
     buffer.indent(n=1)
 
     for i in range(len(args)):
-        buffer.write(f"arg{i}_type arg{i}_;\n")
+        buffer.write(f"arg{i}_storage_type arg{i}_;\n")
 
     buffer.dedent()
     buffer.write("};\n")
@@ -191,31 +216,80 @@ def generate_function_argument_proxy_from_str(s: str) -> str:
     return generate_function_argument_proxy(func_sig=opt_sig)
 
 
+def _user_implementation_name(func_name: FunctionName) -> str:
+    return f"__UserFunctionImplementation__{func_name}"
+
+
+def resolve_call_arguments(
+    func_sig: FunctionSignature, args: Sequence[str], kwargs: Mapping[ArgumentName, str]
+) -> Sequence[str]:
+    """
+    The C++ arguments of a call of `func_sig` in parameter order: keyword
+    arguments moved into place and missing ones replaced by their default
+    values, so that the call can go straight to the implementation rather
+    than through the std::any overloads.
+    """
+    if len(args) > len(func_sig.args):
+        raise ValueError(f"Too many arguments for {func_sig.name}")
+
+    resolved: MutableSequence[str] = list(args)
+
+    for arg in func_sig.args[len(args) :]:
+        if arg.name in kwargs:
+            resolved.append(kwargs[arg.name])
+        elif arg.default_value:
+            resolved.append(arg.default_value)
+        else:
+            raise ValueError(f"Missing argument {arg.name} for {func_sig.name}")
+
+    unknown: AbstractSet[str] = kwargs.keys() - {arg.name for arg in func_sig.args[len(args) :]}
+
+    if unknown:
+        raise ValueError(f"Unexpected keyword arguments for {func_sig.name}: {sorted(unknown)}")
+
+    return resolved
+
+
+def generate_direct_call(
+    func_sig: FunctionSignature, args: Sequence[str], kwargs: Mapping[ArgumentName, str]
+) -> str:
+    """
+    A call of the implementation of `func_sig` itself, which the C++
+    compiler can inline.
+    """
+    resolved: Sequence[str] = resolve_call_arguments(func_sig=func_sig, args=args, kwargs=kwargs)
+
+    return f"{_user_implementation_name(func_sig.name)}({', '.join(resolved)})"
+
+
 def _generate_arg_forwarding_body(
-    buffer: CodeStringIO, args_class_name: str, num_args: int
+    buffer: CodeStringIO, func_name: FunctionName, args_class_name: str, num_args: int
 ) -> None:
     buffer.indent()
     buffer.write(f"{args_class_name} arg_helper(std::move(args));\n")
 
     buffer.newline()
+    buffer.write(f"return {_user_implementation_name(func_name)}(\n")
 
-    if num_args:
-        buffer.write(f"return func_(\n")
-
-        buffer.indent()
+    buffer.indent()
 
-        for i in range(num_args - 1):
-            buffer.write(f"arg_helper.Arg{i}(),\n")
+    for i in range(num_args - 1):
+        buffer.write(f"arg_helper.Arg{i}(),\n")
 
-        buffer.write(f"arg_helper.Arg{num_args - 1}());\n")
-        buffer.dedent()
-    else:
-        buffer.write(f"return func_();\n")
+    buffer.write(f"arg_helper.Arg{num_args - 1}());\n")
+    buffer.dedent()
 
     buffer.dedent()
 
 
 def generate_function_invocable_proxy(func_sig: FunctionSignature) -> str:
+    """
+    The proxy through which a function is called. Calls whose arguments are
+    known at compile time use the overloads taking the arguments themselves,
+    which call the implementation directly and can be inlined, with one
+    overload per number of trailing defaulted arguments. The std::any
+    overloads are only for dynamic calls.
+    """
     buffer = CodeStringIO()
     func_name: FunctionName = func_sig.name
     return_type: ReturnType = func_sig.return_type
@@ -224,7 +298,7 @@ def generate_function_invocable_proxy(func_sig: FunctionSignature) -> str:
 
     args_class_name: str = f"__FunctionArgs__{func_name}"
     proxy_class_name: str = f"__FunctionProxy__{func_name}"
-    user_implementation_name: str = f"__UserFunctionImplementation__{func_name}"
+    user_implementation_name: str = _user_implementation_name(func_name)
 
     buffer.write(f"struct {proxy_class_name} : public FunctionBase {{\n")
 
@@ -237,19 +311,23 @@ def generate_function_invocable_proxy(func_sig: FunctionSignature) -> str:
     for i in range(num_args):
         buffer.write(f"using arg{i}_type = {args_class_name}::arg{i}_type;\n")
 
-    buffer.newline()
-    buffer.write(f"{proxy_class_name}() : func_({user_implementation_name}) {{}}\n")
-
     buffer.newline()
 
     if num_args:
         buffer.write("return_type operator()(std::vector<std::any> args) const {\n")
         _generate_arg_forwarding_body(
-            buffer=buffer, args_class_name=args_class_name, num_args=num_args
+            buffer=buffer,
+            func_name=func_name,
+            args_class_name=args_class_name,
+            num_args=num_args,
         )
         buffer.write("}\n")
     else:
-        buffer.write("return_type operator()(std::vector<std::any>) const { return func_(); }\n")
+        buffer.write("return_type operator()(std::vector<std::any>) const {\n")
+        buffer.indent()
+        buffer.write(f"return {user_implementation_name}();\n")
+        buffer.dedent()
+        buffer.write("}\n")
 
     buffer.newline()
 
@@ -258,61 +336,46 @@ def generate_function_invocable_proxy(func_sig: FunctionSignature) -> str:
             f"return_type operator()(std::unordered_map<std::string, std::any> args) const {{\n"
         )
         _generate_arg_forwarding_body(
-            buffer=buffer, args_class_name=args_class_name, num_args=num_args
+            buffer=buffer,
+            func_name=func_name,
+            args_class_name=args_class_name,
+            num_args=num_args,
         )
         buffer.write("}\n")
     else:
-        buffer.write(
-            "return_type operator()(std::unordered_map<std::string, std::any>) const { return func_(); }\n"
-        )
-
-    buffer.newline()
-
-    if num_args:
-        buffer.write("return_type operator()(\n")
-        buffer.indent(n=4)
-
-        for i, arg in enumerate(args[:-1]):
-            buffer.write(f"arg{i}_type {arg.name},\n")
-
-        buffer.write(f"arg{i}_type {args[-1].name}) const {{\n")
-        buffer.dedent()
-
-        buffer.write("return func_(\n")
+        buffer.write("return_type operator()(std::unordered_map<std::string, std::any>) const {\n")
         buffer.indent()
-
-        for arg in args[:-1]:
-            buffer.write(f"{arg.name},\n")
-
-        buffer.write(f"{args[-1].name});\n")
-        buffer.dedent(n=4)
+        buffer.write(f"return {user_implementation_name}();\n")
+        buffer.dedent()
         buffer.write("}\n")
-    else:
-        buffer.write("return_type operator()() const { return func_(); }\n")
 
-    buffer.newline()
-    buffer.dedent(n=1)
-    buffer.write("private:\n")
-    buffer.indent(n=1)
+    # Trailing arguments with default values may be left out
+    num_required: int = num_args
 
-    if num_args:
-        buffer.write(f"std::function<{return_type}(\n")
-        buffer.indent(n=4)
+    while num_required and args[num_required - 1].default_value:
+        num_required -= 1
 
-        for i, arg in enumerate(args[:-1]):
-            buffer.write(f"{arg.arg_type},\n")
+    for num_given in range(num_args, num_required - 1, -1):
+        params: str = ", ".join(f"arg{i}_type {args[i].name}" for i in range(num_given))
+        direct_call: str = generate_direct_call(
+            func_sig=func_sig, args=[arg.name for arg in args[:num_given]], kwargs={}
+        )
 
-        buffer.write(f"{args[-1].arg_type})> func_;\n")
-        buffer.dedent(n=4)
-    else:
-        buffer.write(f"std::function<{return_type}()> func_;\n")
+        buffer.newline()
+        buffer.write(f"return_type operator()({params}) const {{\n")
+        buffer.indent()
+        buffer.write(f"return {direct_call};\n")
+        buffer.dedent()
+        buffer.write("}\n")
 
     buffer.dedent()
     buffer.write("};\n")
     buffer.dedent()
 
+    # Proxies are stateless and trivially destructible, so they are constant
+    # initialized and cost nothing before main() or at exit
     buffer.newline()
-    buffer.write(f"const {proxy_class_name} {func_name};\n")
+    buffer.write(f"inline constexpr {proxy_class_name} {func_name}{{}};\n")
 
     return buffer.getvalue()
 
@@ -326,24 +389,70 @@ def generate_function_invocable_proxy_from_str(s: str) -> str:
     return generate_function_invocable_proxy(func_sig=opt_sig)
 
 
+def generate_used_function_proxies(
+    func_sigs: Sequence[FunctionSignature], used_names: Optional[AbstractSet[FunctionName]]
+) -> str:
+    """
+    Proxies for the functions in `used_names`, or for all of them if it is
+    None. Unused builtins then cost no code.
+    """
+    buffer = StringIO()
+
+    for func_sig in func_sigs:
+        if used_names is not None and func_sig.name not in used_names:
+            continue
+
+        argument_proxy: str = generate_function_argument_proxy(func_sig=func_sig)
+
+        if argument_proxy:
+            buffer.write(argument_proxy)
+            buffer.write("\n")
+
+        buffer.write(generate_function_invocable_proxy(func_sig=func_sig))
+        buffer.write("\n")
+
+    return buffer.getvalue()
+
+
 def main() -> None:
     args: argparse.Namespace = parse_args()
-    input_sig: str = args.input
+    func_sigs: MutableSequence[FunctionSignature] = []
 
-    opt_sig: Optional[FunctionSignature] = parse_function_signature(s=input_sig)
+    for input_sig in args.input:
+        opt_sig: Optional[FunctionSignature] = parse_function_signature(s=input_sig)
 
-    if not opt_sig:
-        print(f"Function signature is invalid", file=sys.stderr)
-        sys.exit(1)
+        if not opt_sig:
+            print(f"Function signature is invalid: {input_sig}", file=sys.stderr)
+            sys.exit(1)
 
-    print(generate_function_argument_proxy(func_sig=opt_sig))
-    print(generate_function_invocable_proxy(func_sig=opt_sig))
+        func_sigs.append(opt_sig)
+
+    used_names: Optional[AbstractSet[FunctionName]] = (
+        frozenset(args.used) if args.used is not None else None
+    )
+
+    print(generate_used_function_proxies(func_sigs=func_sigs, used_names=used_names))
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument(
-        "-i", "--input", type=str, required=True, help="The C++ function signature."
+        "-i",
+        "--input",
+        type=str,
+        action="append",
+        required=True,
+        help="The C++ function signature. May be given several times.",
+    )
+    parser.add_argument(
+        "--used",
+        type=str,
+        nargs="*",
+        default=None,
+        help=(
+            "Only generate proxies for these functions, e.g. the builtins the "
+            "program still calls after tree shaking."
+        ),
     )
 
     return parser.parse_args()
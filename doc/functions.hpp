@@ -30,10 +30,10 @@ class __FunctionArgs__add {
   arg1_type arg1_;
 };
 
-class FunctionBase {
- public:
-  virtual ~FunctionBase() = default;
-};
+// Proxies are never deleted through a FunctionBase, so it has no virtual
+// destructor, which keeps them trivially destructible and constant
+// initialized
+struct FunctionBase {};
 
 struct Str {
  public:
@@ -83,30 +83,31 @@ struct DictItem : public DictItemBase<K, V> {
 
 struct __FunctionProxy__add : public FunctionBase {
  public:
-  __FunctionProxy__add() : func_(__UserFunctionImplementation__add) {}
-
   using return_type = int;
   using arg0_type = __FunctionArgs__add::arg0_type;
   using arg1_type = __FunctionArgs__add::arg1_type;
 
+  // Dynamic calls only, the arguments of static calls are resolved at
+  // compile time
   return_type operator()(std::vector<std::any> args) const {
     __FunctionArgs__add arg_helper(std::move(args));
 
-    return func_(arg_helper.Arg0(), arg_helper.Arg1());
+    return __UserFunctionImplementation__add(arg_helper.Arg0(), arg_helper.Arg1());
   }
 
   return_type operator()(std::unordered_map<std::string, std::any> args) const {
     __FunctionArgs__add arg_helper(std::move(args));
 
-    return func_(arg_helper.Arg0(), arg_helper.Arg1());
+    return __UserFunctionImplementation__add(arg_helper.Arg0(), arg_helper.Arg1());
   }
 
-  return_type operator()(arg0_type x, arg1_type y) const { return func_(x, y); }
-
-  std::function<int(int, int)> func_;
+  // A direct call, which inlines
+  return_type operator()(arg0_type x, arg1_type y) const {
+    return __UserFunctionImplementation__add(x, y);
+  }
 };
 
-const __FunctionProxy__add add;
+inline constexpr __FunctionProxy__add add{};
 
 // Questions, how do we pass this around? Simply passing copies is viable
 // or wrap it in std::function itself --> therefore it is a value that is
@@ -5,6 +5,7 @@ from PythonParser import PythonParser
 from PythonParserListener import PythonParserListener
 
 from sidewinder.compiler_toolchain.antlr.ast_context import Context, ContextFactory, NodeName
+from sidewinder.compiler_toolchain.ast import AtomPool
 from sidewinder.compiler_toolchain.ast import Node as ASTNode
 from sidewinder.compiler_toolchain.ast_builder import ASTBuilderBase
 from sidewinder.compiler_toolchain.parser import ParseTreeNode
@@ -15,8 +16,11 @@ class AntlrASTBuilder(ASTBuilderBase, PythonParserListener):
         super().__init__()
         self._ast: Optional[ASTNode] = None
         self._ctx_stack: MutableSequence[Context] = []
+        # Pool of the module being built, which every atom is interned into
+        self._atom_pool: Optional[AtomPool] = None
 
     def generate_ast(self, parse_tree: ParseTreeNode) -> ASTNode:
+        self._atom_pool = AtomPool()
         walker = ParseTreeWalker()
         walker.walk(listener=self, t=parse_tree)
 
@@ -41,7 +45,7 @@ class AntlrASTBuilder(ASTBuilderBase, PythonParserListener):
     def ensure_top_level_context(self, node_name: NodeName) -> None:
         if not self._ctx_stack:
             new_ctx: Optional[Context] = ContextFactory.build_context_for(
-                node_name=node_name, top_level=True
+                node_name=node_name, atom_pool=self._atom_pool, top_level=True
             )
 
             if not new_ctx:
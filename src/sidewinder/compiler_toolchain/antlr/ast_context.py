@@ -1,7 +1,7 @@
 from enum import Enum, auto
 from typing import Mapping, MutableSequence, Optional, Type
 
-from sidewinder.compiler_toolchain.ast import Atom, Expression, FunctionCall, Module, Node
+from sidewinder.compiler_toolchain.ast import Atom, AtomPool, Expression, FunctionCall, Module, Node
 
 
 class NodeName(Enum):
@@ -53,9 +53,10 @@ class Context:
 
 
 class ModuleContext(Context):
-    def __init__(self):
+    def __init__(self, atom_pool: AtomPool):
         super().__init__(node_name=NodeName.MODULE)
 
+        self._atom_pool: AtomPool = atom_pool
         self._statements: MutableSequence[Node] = []
 
     def handle(self, name: NodeName, text: str) -> Optional[Context]:
@@ -63,12 +64,12 @@ class ModuleContext(Context):
             # No need to do anything
             return None
         elif name == NodeName.FUNCTION_CALL:
-            return FunctionCallContext()
+            return FunctionCallContext(atom_pool=self._atom_pool)
 
         self.raise_unexpected(name=name)
 
     def flush(self) -> Optional[Node]:
-        module = Module()
+        module = Module(atom_pool=self._atom_pool)
         module.statements().extend(self._statements)
 
         return module
@@ -103,8 +104,8 @@ class ArgumentsContext(Context):
         if name == NodeName.ARGUMENTS:
             return None
         elif name == NodeName.ATOM:
-            atom = Atom()
-            atom.set_name(name=text)
+            atom_pool: AtomPool = self._func.atom_pool()
+            atom = Atom(pool=atom_pool, index=atom_pool.intern(text))
 
             self._func.arguments().append(atom)
             return None
@@ -116,12 +117,16 @@ class ArgumentsContext(Context):
 
 
 class FunctionCallContext(Context):
-    def __init__(self):
+    def __init__(self, atom_pool: AtomPool):
         super().__init__(node_name=NodeName.FUNCTION_CALL)
 
+        self._atom_pool: AtomPool = atom_pool
         self._name: Optional[str] = None
         self._args: MutableSequence[Expression] = []
 
+    def atom_pool(self) -> AtomPool:
+        return self._atom_pool
+
     def arguments(self) -> MutableSequence[Expression]:
         return self._args
 
@@ -163,7 +168,9 @@ class ContextFactory:
     }
 
     @classmethod
-    def build_context_for(cls, node_name: NodeName, top_level: bool = False) -> Optional[Context]:
+    def build_context_for(
+        cls, node_name: NodeName, atom_pool: AtomPool, top_level: bool = False
+    ) -> Optional[Context]:
         res: Optional[Type] = None
 
         if top_level:
@@ -174,4 +181,4 @@ class ContextFactory:
         if not res:
             raise ValueError(f"No context for {node_name.name} with top_level = {top_level}")
 
-        return res()
+        return res(atom_pool=atom_pool)
@@ -1,17 +1,19 @@
 from io import TextIOBase
-from typing import MutableSequence
+from typing import MutableSequence, Optional
 
 from antlr4 import CommonTokenStream, InputStream
 from PythonLexer import PythonLexer
 from PythonParser import PythonParser
 from PythonParserListener import PythonParserListener
 
+from sidewinder.compiler_toolchain.antlr.profiling import ParserProfile, enable_profiling
 from sidewinder.compiler_toolchain.parser import ParserBase, ParseTreeNode
 
 
 class AntlrParser(ParserBase, PythonParserListener):
-    def __init__(self):
+    def __init__(self, profile: Optional[ParserProfile] = None):
         super().__init__()
+        self._profile: Optional[ParserProfile] = profile
 
     def parse(self, input: TextIOBase) -> ParseTreeNode:
         parse_tree: ParseTreeNode = self._generate_parse_tree(input=input)
@@ -21,8 +23,13 @@ class AntlrParser(ParserBase, PythonParserListener):
         stream = InputStream(data=input.read())
         lexer = PythonLexer(input=stream)
         token_stream = CommonTokenStream(lexer=lexer)
+        parser = PythonParser(input=token_stream)
 
-        return PythonParser(input=token_stream)
+        if self._profile is not None:
+            enable_profiling(parser=parser, profile=self._profile)
+            self._profile.add_file()
+
+        return parser
 
     def _generate_parse_tree(self, input: TextIOBase) -> ParseTreeNode:
         parser: PythonParser = self._create_parser(input=input)
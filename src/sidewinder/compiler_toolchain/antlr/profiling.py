@@ -0,0 +1,197 @@
+import time
+from dataclasses import dataclass
+from io import StringIO
+from typing import MutableMapping, Optional, Sequence
+
+from antlr4 import Parser, ParserRuleContext, TokenStream
+from antlr4.atn.ATNConfigSet import ATNConfigSet
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.dfa.DFA import DFA
+from antlr4.dfa.DFAState import DFAState
+
+
+@dataclass
+class DecisionInfo:
+    """
+    Statistics for a single grammar decision, following the fields of the
+    Java runtime's DecisionInfo.
+    """
+
+    decision: int
+    rule_name: str
+    invocations: int = 0
+    time_ns: int = 0
+    # SLL prediction, which is used for every invocation
+    sll_total_lookahead: int = 0
+    sll_max_lookahead: int = 0
+    # DFA cache hits (existing DFA edge) and misses (ATN simulation)
+    dfa_hits: int = 0
+    dfa_misses: int = 0
+    # Full-context (LL) prediction after an SLL conflict
+    ll_fallbacks: int = 0
+    ll_total_lookahead: int = 0
+    ll_max_lookahead: int = 0
+    ll_atn_transitions: int = 0
+    ambiguities: int = 0
+
+    def average_sll_lookahead(self) -> float:
+        return self.sll_total_lookahead / self.invocations if self.invocations else 0.0
+
+    def average_ll_lookahead(self) -> float:
+        return self.ll_total_lookahead / self.ll_fallbacks if self.ll_fallbacks else 0.0
+
+
+class ParserProfile:
+    """
+    Decision statistics aggregated over every parse that uses it, so that a
+    whole corpus can be profiled with one instance.
+    """
+
+    def __init__(self):
+        self._decisions: MutableMapping[int, DecisionInfo] = {}
+        self._num_files: int = 0
+
+    def decision_info(self, decision: int, rule_name: str) -> DecisionInfo:
+        info: Optional[DecisionInfo] = self._decisions.get(decision)
+
+        if info is None:
+            info = DecisionInfo(decision=decision, rule_name=rule_name)
+            self._decisions[decision] = info
+
+        return info
+
+    def decisions(self) -> Sequence[DecisionInfo]:
+        return list(self._decisions.values())
+
+    def num_files(self) -> int:
+        return self._num_files
+
+    def add_file(self) -> None:
+        self._num_files += 1
+
+    def report(self, limit: Optional[int] = None) -> str:
+        decisions: Sequence[DecisionInfo] = sorted(
+            self.decisions(), key=lambda info: info.time_ns, reverse=True
+        )
+
+        if limit is not None:
+            decisions = decisions[:limit]
+
+        total_ns: int = sum(info.time_ns for info in self._decisions.values())
+
+        buffer = StringIO()
+        buffer.write(
+            f"Parser profile over {self._num_files} file(s), "
+            f"{len(self._decisions)} decision(s), {total_ns / 1e6:.2f} ms in prediction\n"
+        )
+        buffer.write(
+            f"{'decision':>8} {'rule':<28} {'calls':>8} {'time ms':>9} {'sll la':>7} "
+            f"{'max':>5} {'ll':>6} {'ll la':>7} {'max':>5} {'dfa hit':>8} {'miss':>7} "
+            f"{'ambig':>6}\n"
+        )
+
+        for info in decisions:
+            buffer.write(
+                f"{info.decision:>8} {info.rule_name:<28.28} {info.invocations:>8} "
+                f"{info.time_ns / 1e6:>9.2f} {info.average_sll_lookahead():>7.2f} "
+                f"{info.sll_max_lookahead:>5} {info.ll_fallbacks:>6} "
+                f"{info.average_ll_lookahead():>7.2f} {info.ll_max_lookahead:>5} "
+                f"{info.dfa_hits:>8} {info.dfa_misses:>7} {info.ambiguities:>6}\n"
+            )
+
+        return buffer.getvalue()
+
+
+class ProfilingParserATNSimulator(ParserATNSimulator):
+    """
+    Port of the Java runtime's ProfilingATNSimulator, which the Python runtime
+    does not have. Records per-decision statistics into a ParserProfile.
+    """
+
+    def __init__(self, parser: Parser, profile: ParserProfile):
+        interpreter: ParserATNSimulator = parser._interp
+
+        super().__init__(
+            parser, interpreter.atn, interpreter.decisionToDFA, interpreter.sharedContextCache
+        )
+
+        self._profile: ParserProfile = profile
+        self._rule_names: Sequence[str] = parser.ruleNames
+        self._current_info: Optional[DecisionInfo] = None
+        self._sll_stop_index: int = -1
+        self._ll_stop_index: int = -1
+
+    def adaptivePredict(self, input: TokenStream, decision: int, outerContext: ParserRuleContext):
+        rule_index: int = self.atn.decisionToState[decision].ruleIndex
+        info: DecisionInfo = self._profile.decision_info(
+            decision=decision, rule_name=self._rule_names[rule_index]
+        )
+
+        self._current_info = info
+        self._sll_stop_index = -1
+        self._ll_stop_index = -1
+
+        start_index: int = input.index
+        start_ns: int = time.perf_counter_ns()
+
+        try:
+            return super().adaptivePredict(input, decision, outerContext)
+        finally:
+            info.time_ns += time.perf_counter_ns() - start_ns
+            info.invocations += 1
+
+            sll_lookahead: int = self._sll_stop_index - start_index + 1
+            info.sll_total_lookahead += sll_lookahead
+            info.sll_max_lookahead = max(info.sll_max_lookahead, sll_lookahead)
+
+            if self._ll_stop_index >= 0:
+                ll_lookahead: int = self._ll_stop_index - start_index + 1
+                info.ll_total_lookahead += ll_lookahead
+                info.ll_max_lookahead = max(info.ll_max_lookahead, ll_lookahead)
+
+            self._current_info = None
+
+    def getExistingTargetState(self, previousD: DFAState, t: int):
+        self._sll_stop_index = self._input.index
+
+        existing: Optional[DFAState] = super().getExistingTargetState(previousD, t)
+
+        if existing is not None:
+            self._current_info.dfa_hits += 1
+
+        return existing
+
+    def computeTargetState(self, dfa: DFA, previousD: DFAState, t: int):
+        self._current_info.dfa_misses += 1
+
+        return super().computeTargetState(dfa, previousD, t)
+
+    def execATNWithFullContext(
+        self,
+        dfa: DFA,
+        D: DFAState,
+        s0: ATNConfigSet,
+        input: TokenStream,
+        startIndex: int,
+        outerContext: ParserRuleContext,
+    ):
+        self._current_info.ll_fallbacks += 1
+
+        return super().execATNWithFullContext(dfa, D, s0, input, startIndex, outerContext)
+
+    def computeReachSet(self, closure: ATNConfigSet, t: int, fullCtx: bool):
+        if fullCtx:
+            self._ll_stop_index = self._input.index
+            self._current_info.ll_atn_transitions += 1
+
+        return super().computeReachSet(closure, t, fullCtx)
+
+    def reportAmbiguity(self, dfa, D, startIndex, stopIndex, exact, ambigAlts, configs):
+        if self._current_info is not None:
+            self._current_info.ambiguities += 1
+
+        super().reportAmbiguity(dfa, D, startIndex, stopIndex, exact, ambigAlts, configs)
+
+
+def enable_profiling(parser: Parser, profile: ParserProfile) -> None:
+    parser._interp = ProfilingParserATNSimulator(parser=parser, profile=profile)
@@ -1,40 +1,216 @@
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import MutableSequence, Optional, Sequence, TextIO, Tuple
 
-from antlr4 import ParserRuleContext
-from graphviz import Digraph
+from antlr4 import ParserRuleContext, TerminalNode
 from PythonParser import PythonParser
 
 from sidewinder.compiler_toolchain.parser import ParseTreeNode
 
+DEFAULT_MAX_LABEL_LENGTH: int = 32
 
-def render_as_png(parse_tree: ParseTreeNode, parser: PythonParser, output_path: Path):
-    dot: Digraph = parse_tree_to_dot(tree=parse_tree, parser=parser)
-    dot.render(outfile=output_path, format="png")
 
+@dataclass
+class LineRange:
+    """
+    Inclusive range of 1-based source lines. Nodes whose source span does not
+    overlap this range are not rendered.
+    """
 
-def parse_tree_to_dot(
+    first: int
+    last: int
+
+    def overlaps(self, first: int, last: int) -> bool:
+        return first <= self.last and last >= self.first
+
+
+def render_as_png(
+    parse_tree: ParseTreeNode,
+    parser: PythonParser,
+    output_path: Path,
+    max_depth: Optional[int] = None,
+    line_range: Optional[LineRange] = None,
+    max_label_length: int = DEFAULT_MAX_LABEL_LENGTH,
+):
+    # Only needed for rasterizing, writing DOT does not depend on graphviz
+    from graphviz import render
+
+    dot_path: Path = output_path.with_suffix(".dot")
+
+    with dot_path.open("w") as out:
+        write_parse_tree_dot(
+            tree=parse_tree,
+            parser=parser,
+            out=out,
+            max_depth=max_depth,
+            line_range=line_range,
+            max_label_length=max_label_length,
+        )
+
+    render(engine="dot", format="png", filepath=dot_path, outfile=output_path)
+
+
+def find_subtree(
+    tree: ParseTreeNode, parser: PythonParser, rule_name: str, line: Optional[int] = None
+) -> Optional[ParseTreeNode]:
+    """
+    Returns the outermost node for the rule `rule_name` in `tree`, optionally
+    restricted to nodes whose source span contains `line`.
+    """
+    try:
+        rule_index: int = list(parser.ruleNames).index(rule_name)
+    except ValueError:
+        raise ValueError(f"Unknown rule {rule_name}")
+
+    # Breadth-first so that the outermost match is found first
+    queue: MutableSequence[ParseTreeNode] = [tree]
+    i: int = 0
+
+    while i < len(queue):
+        node: ParseTreeNode = queue[i]
+        i += 1
+
+        if not isinstance(node, ParserRuleContext):
+            continue
+
+        first, last = _line_span(node=node)
+
+        if line is not None and not first <= line <= last:
+            continue
+
+        if node.getRuleIndex() == rule_index:
+            return node
+
+        if node.children:
+            queue.extend(node.children)
+
+    return None
+
+
+def write_parse_tree_dot(
     tree: ParseTreeNode,
     parser: PythonParser,
-    dot: Optional[Digraph] = None,
-) -> Digraph:
-    if not dot:
-        dot = Digraph()
+    out: TextIO,
+    max_depth: Optional[int] = None,
+    line_range: Optional[LineRange] = None,
+    max_label_length: int = DEFAULT_MAX_LABEL_LENGTH,
+) -> int:
+    """
+    Streams `tree` to `out` in DOT format, writing each node and edge as it is
+    visited. Returns the number of nodes written.
+    """
+    rule_names: Sequence[str] = parser.ruleNames
+    token_stream = parser.getTokenStream()
+
+    out.write("digraph {\n")
+
+    # Pending (node, depth, parent id) entries, traversed depth-first without
+    # recursion so that deep trees do not hit the interpreter recursion limit
+    stack: MutableSequence[Tuple[ParseTreeNode, int, Optional[str]]] = [(tree, 0, None)]
+    num_nodes: int = 0
+
+    while stack:
+        node, depth, parent_id = stack.pop()
+
+        if line_range is not None and not line_range.overlaps(*_line_span(node=node)):
+            continue
+
+        node_id: str = f"n{num_nodes}"
+        num_nodes += 1
+
+        label: str = _label_for(
+            node=node,
+            rule_names=rule_names,
+            token_stream=token_stream,
+            max_label_length=max_label_length,
+        )
+        out.write(f'  {node_id} [label="{_escape(label)}"];\n')
+
+        if parent_id is not None:
+            out.write(f"  {parent_id} -> {node_id};\n")
+
+        children: Optional[Sequence[ParseTreeNode]] = getattr(node, "children", None)
+
+        if not children:
+            continue
+
+        if max_depth is not None and depth >= max_depth:
+            # Mark the cut so that truncated subtrees are not mistaken for leaves
+            elided_id: str = f"n{num_nodes}"
+            num_nodes += 1
+
+            out.write(f'  {elided_id} [label="... ({len(children)})", shape=plaintext];\n')
+            out.write(f"  {node_id} -> {elided_id} [style=dashed];\n")
+            continue
+
+        # Push in reverse so that children are emitted in source order
+        for child in reversed(children):
+            stack.append((child, depth + 1, node_id))
+
+    out.write("}\n")
+
+    return num_nodes
+
+
+def _line_span(node: ParseTreeNode) -> Tuple[int, int]:
+    if isinstance(node, TerminalNode):
+        line: int = node.getSymbol().line
+        return line, line
+
+    start = node.start
+    stop = node.stop if node.stop is not None else start
+
+    if start is None:
+        return 0, 0
+
+    # An empty rule may stop before it starts
+    return start.line, max(start.line, stop.line)
+
+
+def _label_for(
+    node: ParseTreeNode, rule_names: Sequence[str], token_stream, max_label_length: int
+) -> str:
+    if isinstance(node, TerminalNode):
+        return _truncate(text=node.getSymbol().text or "<empty>", max_length=max_label_length)
+
+    rule_index: int = node.getRuleIndex()
+    rule_name: str = rule_names[rule_index] if rule_index >= 0 else "<unknown_rule>"
+
+    text: str = _prefix_text(node=node, token_stream=token_stream, max_length=max_label_length)
+
+    return f"{text or '<empty>'}\nRule: {rule_name}"
+
+
+def _prefix_text(node: ParserRuleContext, token_stream, max_length: int) -> str:
+    # Only read as many tokens as are needed to fill the label, rather than
+    # calling getText(), which concatenates the whole subtree at every node
+    if node.start is None or node.stop is None or token_stream is None:
+        return ""
+
+    parts: MutableSequence[str] = []
+    length: int = 0
+
+    for i in range(node.start.tokenIndex, node.stop.tokenIndex + 1):
+        text: Optional[str] = token_stream.get(i).text
+
+        if not text or not text.strip():
+            continue
+
+        parts.append(text)
+        length += len(text)
+
+        if length > max_length:
+            break
+
+    return _truncate(text="".join(parts), max_length=max_length)
 
-    label: str = tree.getText()
-    if not label:
-        label = "<empty>"
 
-    if isinstance(tree, ParserRuleContext):
-        rule_index: int = tree.getRuleIndex()
-        rule_name: str = parser.ruleNames[rule_index] if rule_index >= 0 else "<unknown_rule>"
-        label += f"\nRule: {rule_name}"
+def _truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
 
-    dot.node(name=str(id(tree)), label=label)
+    return text[: max(max_length - 3, 0)] + "..."
 
-    if tree.getChildCount() > 0:
-        for child in tree.getChildren():
-            dot.edge(tail_name=str(id(tree)), head_name=str(id(child)))
-            parse_tree_to_dot(tree=child, parser=parser, dot=dot)
 
-    return dot
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,488 @@
+from typing import (
+    AbstractSet,
+    Callable,
+    List,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from antlr4 import ParserRuleContext, TerminalNode
+from PythonParser import PythonParser
+from PythonParserVisitor import PythonParserVisitor
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomPool,
+    BinaryOperation,
+    BinaryOperator,
+    DataType,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    MethodCall,
+    Module,
+    Node,
+    Parameter,
+    Return,
+    StructDef,
+    Subscript,
+    UnaryOperation,
+    UnaryOperator,
+    Variable,
+    With,
+)
+from sidewinder.compiler_toolchain.ast_builder import ASTBuilderBase
+from sidewinder.compiler_toolchain.parser import ParseTreeNode
+from sidewinder.compiler_toolchain.token_type import TokenType
+
+VisitResult = Union[None, Node, List[Node]]
+
+# Rules that only group other rules. Their children are visited and the
+# resulting AST nodes are concatenated.
+_container_rule_names: AbstractSet[str] = {
+    "statements",
+    "statement",
+    "simple_stmts",
+    "simple_stmt",
+    "compound_stmt",
+    "block",
+    "star_expressions",
+    "expressions",
+    "arguments",
+    "args",
+    "params",
+    "parameters",
+    "param_no_default",
+}
+
+# Atom token types by ANTLR symbolic name, anything else is an identifier
+_symbolic_name_to_token_type_mapping: Mapping[str, TokenType] = {
+    "NUMBER": TokenType.LITERAL_NUMBER,
+    "STRING": TokenType.LITERAL_STRING,
+}
+
+_text_to_binary_operator_mapping: Mapping[str, BinaryOperator] = {
+    operator.value: operator for operator in BinaryOperator
+}
+
+# Rules whose subtrees can never produce AST nodes
+_skipped_rule_names: AbstractSet[str] = {
+    "func_type_comment",
+}
+
+
+class AntlrVisitorASTBuilder(ASTBuilderBase, PythonParserVisitor):
+    """
+    Builds the AST from an ANTLR parse tree by visiting it top-down. Each
+    rule is dispatched through a table indexed by rule index, and nodes are
+    constructed directly by the handlers rather than through per-node
+    contexts. Works on both raw and post-processed parse trees.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._atom_pool: Optional[AtomPool] = None
+
+        handlers: MutableMapping[str, Callable[[ParserRuleContext], VisitResult]] = {
+            "file_input": self._visit_file_input,
+            "function_def_raw": self._visit_function_def_raw,
+            "param": self._visit_param,
+            "param_with_default": self._visit_param_with_default,
+            "param_maybe_default": self._visit_param_with_default,
+            "return_stmt": self._visit_return_stmt,
+            "assignment": self._visit_assignment,
+            "with_stmt": self._visit_with_stmt,
+            "struct_def": self._visit_struct_def,
+            "disjunction": self._visit_binary_operations,
+            "conjunction": self._visit_binary_operations,
+            "inversion": self._visit_inversion,
+            "comparison": self._visit_comparison,
+            "sum": self._visit_binary_operations,
+            "term": self._visit_binary_operations,
+            "factor": self._visit_factor,
+            "primary": self._visit_primary,
+            "atom": self._visit_atom,
+            "string": self._visit_atom,
+            "group": self._visit_group,
+            "list": self._visit_list,
+        }
+
+        for rule_name in _container_rule_names:
+            handlers[rule_name] = self._visit_children
+
+        for rule_name in _skipped_rule_names:
+            handlers[rule_name] = self._skip
+
+        rule_names: Sequence[str] = PythonParser.ruleNames
+        self._dispatch: Sequence[Optional[Callable[[ParserRuleContext], VisitResult]]] = [
+            handlers.get(rule_name) for rule_name in rule_names
+        ]
+        self._token_types: Sequence[TokenType] = [
+            _symbolic_name_to_token_type_mapping.get(name, TokenType.IDENTIFIER)
+            for name in PythonParser.symbolicNames
+        ]
+
+    def generate_ast(self, parse_tree: ParseTreeNode) -> Node:
+        self._atom_pool = AtomPool()
+        node: VisitResult = self.visit(parse_tree)
+
+        if not isinstance(node, Module):
+            raise Exception("Failed to generate an AST")
+
+        return node
+
+    def visit(self, tree: ParseTreeNode) -> VisitResult:
+        # Descend through lineages of single children without a handler, e.g.
+        # the expression -> disjunction -> ... -> primary chain of a raw tree
+        while True:
+            if isinstance(tree, TerminalNode):
+                # Terminals that matter are read directly by their parent rule
+                return None
+
+            handler: Optional[Callable[[ParserRuleContext], VisitResult]] = self._dispatch[
+                tree.getRuleIndex()
+            ]
+
+            if handler is not None:
+                return handler(tree)
+
+            children: Optional[Sequence[ParseTreeNode]] = tree.children
+
+            if not children:
+                return None
+
+            if len(children) != 1:
+                self._raise_unsupported(tree)
+
+            tree = children[0]
+
+    def _skip(self, ctx: ParserRuleContext) -> VisitResult:
+        return None
+
+    def _visit_children(self, ctx: ParserRuleContext) -> VisitResult:
+        nodes: List[Node] = []
+
+        for child in ctx.children or ():
+            self._extend(dest=nodes, result=self.visit(child))
+
+        return nodes
+
+    def _visit_expression(self, tree: ParseTreeNode) -> Expression:
+        result: VisitResult = self.visit(tree)
+
+        if not isinstance(result, Expression):
+            raise ValueError(f"Expected an expression: {tree.getText()}")
+
+        return result
+
+    def _extend(self, dest: MutableSequence[Node], result: VisitResult) -> None:
+        if result is None:
+            return
+        elif isinstance(result, list):
+            dest.extend(result)
+        else:
+            dest.append(result)
+
+    def _visit_file_input(self, ctx: ParserRuleContext) -> VisitResult:
+        module = Module(atom_pool=self._atom_pool)
+        self._extend(dest=module.statements(), result=self._visit_children(ctx))
+
+        return module
+
+    def _visit_function_def_raw(self, ctx: ParserRuleContext) -> VisitResult:
+        children: Sequence[ParseTreeNode] = ctx.children
+
+        # 'def' NAME '(' params? ')' ('->' expression)? ':' block
+        if _terminal_text(children[0]) != "def" or _terminal_text(children[2]) != "(":
+            self._raise_unsupported(ctx)
+
+        node = FunctionDef()
+        node.set_name(children[1].getText())
+
+        close_index: int = 3
+
+        if _terminal_text(children[3]) != ")":
+            for param in self._visit_children_of(tree=children[3]):
+                if not isinstance(param, Parameter):
+                    raise ValueError(f"Unsupported parameter in {node.name()}")
+
+                node.parameters().append(param)
+
+            close_index = 4
+
+        if _terminal_text(children[close_index + 1]) == "->":
+            node.set_return_type(DataType.from_str(children[close_index + 2].getText()))
+
+        # Skip ':', the block is always last
+        self._extend(dest=node.statements(), result=self.visit(children[-1]))
+
+        return node
+
+    def _visit_children_of(self, tree: ParseTreeNode) -> Sequence[Node]:
+        nodes: List[Node] = []
+        self._extend(dest=nodes, result=self.visit(tree))
+
+        return nodes
+
+    def _visit_param(self, ctx: ParserRuleContext) -> VisitResult:
+        node = Parameter()
+        node.set_name(ctx.children[0].getText())
+
+        if len(ctx.children) > 1:
+            # annotation: ':' expression
+            annotation: ParserRuleContext = ctx.children[1]
+            node.set_data_type(DataType.from_str(annotation.children[-1].getText()))
+
+        return node
+
+    def _visit_param_with_default(self, ctx: ParserRuleContext) -> VisitResult:
+        node: VisitResult = self.visit(ctx.children[0])
+
+        if not isinstance(node, Parameter):
+            raise ValueError(f"Unsupported parameter: {ctx.getText()}")
+
+        if len(ctx.children) > 1:
+            # default_assignment: '=' expression
+            default_assignment: ParserRuleContext = ctx.children[1]
+            node.set_default_value(self._visit_expression(default_assignment.children[-1]))
+
+        return node
+
+    def _visit_return_stmt(self, ctx: ParserRuleContext) -> VisitResult:
+        node = Return()
+
+        for child in ctx.children[1:]:
+            self._extend(dest=node.expressions(), result=self.visit(child))
+
+        return node
+
+    def _visit_assignment(self, ctx: ParserRuleContext) -> VisitResult:
+        children: Sequence[ParseTreeNode] = ctx.children
+        variable = Variable()
+        variable.set_name(children[0].getText())
+
+        if not variable.name().isidentifier():
+            raise ValueError(f"Unsupported assignment target: {variable.name()}")
+
+        if _terminal_text(children[1]) == ":":
+            # NAME ':' expression ('=' annotated_rhs)?
+            variable.set_data_type(DataType.from_str(children[2].getText()))
+            rest: Sequence[ParseTreeNode] = children[3:]
+
+            if not rest:
+                # A declaration without a value, which is a struct field
+                field = Parameter()
+                field.set_name(variable.name())
+                field.set_data_type(variable.data_type())
+
+                return field
+        else:
+            # star_targets '=' star_expressions
+            rest = children[1:]
+
+        if len(rest) != 2 or _terminal_text(rest[0]) != "=":
+            raise ValueError(f"Unsupported assignment: {ctx.getText()}")
+
+        node = Assignment()
+        node.set_left(variable)
+        node.set_right(self._visit_expression(rest[1]))
+
+        return node
+
+    def _visit_with_stmt(self, ctx: ParserRuleContext) -> VisitResult:
+        children: Sequence[ParseTreeNode] = ctx.children
+
+        # 'with' with_item ':' block, for a single with_item without 'as'
+        if len(children) != 4 or len(children[1].children) != 1:
+            self._raise_unsupported(ctx)
+
+        node = With()
+        node.set_context(self._visit_expression(children[1].children[0]))
+        self._extend(dest=node.statements(), result=self.visit(children[-1]))
+
+        return node
+
+    def _visit_struct_def(self, ctx: ParserRuleContext) -> VisitResult:
+        # soft_kw_struct NAME ':' block, whose statements are NAME ':' expression
+        node = StructDef()
+        node.set_name(ctx.children[1].getText())
+
+        for field in self._visit_children_of(tree=ctx.children[-1]):
+            if not isinstance(field, Parameter):
+                raise ValueError(f"Unsupported statement in struct {node.name()}")
+
+            node.fields().append(field)
+
+        return node
+
+    def _visit_binary_operations(self, ctx: ParserRuleContext) -> VisitResult:
+        # Left-associative chains of operands separated by operator terminals,
+        # e.g. sum: sum ('+' | '-') term or disjunction: conjunction ('or' conjunction)*
+        children: Sequence[ParseTreeNode] = ctx.children
+        node: Expression = self._visit_expression(children[0])
+
+        for i in range(1, len(children), 2):
+            node = self._binary_operation(
+                op_text=_terminal_text(children[i]), left=node, right=children[i + 1]
+            )
+
+        return node
+
+    def _visit_comparison(self, ctx: ParserRuleContext) -> VisitResult:
+        children: Sequence[ParseTreeNode] = ctx.children
+
+        if len(children) == 1:
+            return self.visit(children[0])
+
+        # Chained comparisons like a < b < c are not supported
+        if len(children) != 2:
+            raise ValueError(f"Unsupported chained comparison: {ctx.getText()}")
+
+        # comparison: sum compare_op_sum_pair, compare_op_sum_pair: compare_op sum
+        compare_op, right = children[1].children
+
+        return self._binary_operation(
+            op_text=compare_op.getText(), left=self._visit_expression(children[0]), right=right
+        )
+
+    def _binary_operation(
+        self, op_text: Optional[str], left: Expression, right: ParseTreeNode
+    ) -> Expression:
+        operator: Optional[BinaryOperator] = _text_to_binary_operator_mapping.get(op_text)
+
+        if operator is None:
+            raise ValueError(f"Unsupported operator {op_text}")
+
+        node: BinaryOperation = BinaryOperation.for_operator(operator)
+        node.set_left(left)
+        node.set_right(self._visit_expression(right))
+
+        return node
+
+    def _visit_inversion(self, ctx: ParserRuleContext) -> VisitResult:
+        if len(ctx.children) == 1:
+            return self.visit(ctx.children[0])
+
+        # 'not' inversion
+        node = UnaryOperation(operator=UnaryOperator.NOT)
+        node.set_operand(self._visit_expression(ctx.children[1]))
+
+        return node
+
+    def _visit_factor(self, ctx: ParserRuleContext) -> VisitResult:
+        if len(ctx.children) == 1:
+            return self.visit(ctx.children[0])
+
+        op, operand = ctx.children
+        node: Expression = self._visit_expression(operand)
+
+        # Negative literals are a single atom
+        if _terminal_text(op) == "-" and isinstance(node, Atom) and node.name()[:1].isdigit():
+            index: int = self._atom_pool.intern(text="-" + node.name(), atom_type=node.atom_type())
+            return node.set_pool_entry(pool=self._atom_pool, index=index)
+
+        if _terminal_text(op) != "-":
+            raise ValueError(f"Unsupported unary operator {op.getText()}")
+
+        negation = UnaryOperation(operator=UnaryOperator.NEGATE)
+        negation.set_operand(node)
+
+        return negation
+
+    def _visit_primary(self, ctx: ParserRuleContext) -> VisitResult:
+        children: Sequence[ParseTreeNode] = ctx.children
+
+        if len(children) == 1:
+            return self.visit(children[0])
+
+        if _terminal_text(children[1]) == ".":
+            # primary '.' NAME
+            field_access = FieldAccess()
+            field_access.set_value(self._visit_expression(children[0]))
+            field_access.set_name(children[2].getText())
+
+            return field_access
+
+        if _terminal_text(children[1]) == "[":
+            # primary '[' slices ']', with a single index
+            if len(children[2].children) != 1:
+                raise ValueError(f"Unsupported subscript: {ctx.getText()}")
+
+            subscript = Subscript()
+            subscript.set_value(self._visit_expression(children[0]))
+            subscript.set_index(self._visit_expression(children[2].children[0]))
+
+            return subscript
+
+        if _terminal_text(children[1]) != "(":
+            raise ValueError(f"Unsupported expression: {ctx.getText()}")
+
+        callee: VisitResult = self.visit(children[0])
+
+        if isinstance(callee, FieldAccess):
+            # The receiver of a method is its first argument
+            node: FunctionCall = MethodCall()
+            node.set_name(callee.name())
+            node.arguments().append(callee.value())
+        elif isinstance(callee, Atom) and callee.name().isidentifier():
+            node = FunctionCall()
+            node.set_name(callee.name())
+        else:
+            raise ValueError(f"Unsupported callee: {children[0].getText()}")
+
+        # The arguments, if any, are between '(' and ')'
+        for child in children[2:-1]:
+            self._extend(dest=node.arguments(), result=self.visit(child))
+
+        return node
+
+    def _visit_atom(self, ctx: ParserRuleContext) -> VisitResult:
+        if len(ctx.children) != 1:
+            self._raise_unsupported(ctx)
+
+        child: ParseTreeNode = ctx.children[0]
+
+        if not isinstance(child, TerminalNode):
+            return self.visit(child)
+
+        token_type: int = child.getSymbol().type
+        index: int = self._atom_pool.intern_token(
+            text=child.getText(),
+            token_type=self._token_types[token_type] if token_type > 0 else TokenType.IDENTIFIER,
+        )
+
+        return Atom(pool=self._atom_pool, index=index)
+
+    def _visit_group(self, ctx: ParserRuleContext) -> VisitResult:
+        # '(' expression ')', anything else is a tuple
+        if len(ctx.children) != 3:
+            self._raise_unsupported(ctx)
+
+        return self._visit_expression(ctx.children[1])
+
+    def _visit_list(self, ctx: ParserRuleContext) -> VisitResult:
+        # '[' expressions? ']'
+        node = ListLiteral()
+
+        for child in ctx.children[1:-1]:
+            self._extend(dest=node.elements(), result=self.visit(child))
+
+        return node
+
+    def _raise_unsupported(self, ctx: ParserRuleContext) -> None:
+        rule_name: str = PythonParser.ruleNames[ctx.getRuleIndex()]
+        raise ValueError(f"Unsupported rule {rule_name}: {ctx.getText()}")
+
+
+def _terminal_text(tree: ParseTreeNode) -> Optional[str]:
+    if isinstance(tree, TerminalNode):
+        return tree.getText()
+
+    return None
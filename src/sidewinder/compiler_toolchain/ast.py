@@ -1,7 +1,22 @@
 import re
+import sys
+from ast import literal_eval
 from enum import Enum, auto
 from io import StringIO
-from typing import MutableSequence, Optional, TypeAlias
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeAlias,
+    Union,
+)
+
+from sidewinder.compiler_toolchain.token_type import TokenType
 
 
 class NodeType(Enum):
@@ -9,8 +24,16 @@ class NodeType(Enum):
     FUNCTION_DEF = auto()
     RETURN_STATEMENT = auto()
     SUM = auto()
+    BINARY_OPERATION = auto()
+    UNARY_OPERATION = auto()
     ASSIGNMENT = auto()
+    WITH_STATEMENT = auto()
+    STRUCT_DEF = auto()
     FUNCTION_CALL = auto()
+    METHOD_CALL = auto()
+    FIELD_ACCESS = auto()
+    LIST_LITERAL = auto()
+    SUBSCRIPT = auto()
     PARAMETER = auto()
     VARIABLE = auto()
     MODULE = auto()
@@ -83,13 +106,17 @@ class Statement(Node):
 
 
 class Module(Node):
-    def __init__(self):
+    def __init__(self, atom_pool: Optional["AtomPool"] = None):
         super().__init__(node_type=Node.Type.MODULE)
         self._statements: MutableSequence[Statement] = []
+        self._atom_pool: AtomPool = atom_pool if atom_pool is not None else AtomPool()
 
     def statements(self) -> MutableSequence[Statement]:
         return self._statements
 
+    def atom_pool(self) -> "AtomPool":
+        return self._atom_pool
+
     def is_complete(self):
         # Always complete, there can be 0 statements
         return True
@@ -101,59 +128,194 @@ class Module(Node):
 class Expression(Node):
     def __init__(self, node_type: Node.Type):
         super().__init__(node_type=node_type)
+        self._data_type: Optional["DataType"] = None
+
+    def data_type(self) -> Optional["DataType"]:
+        """
+        The resolved type of the expression, or None if type checking has not
+        run yet.
+        """
+        return self._data_type
+
+    def set_data_type(self, data_type: "DataType") -> "Expression":
+        self._data_type = data_type
+        return self
+
+
+AtomValue: TypeAlias = Union[int, float, str]
+
+_token_type_to_atom_type_mapping: Mapping[TokenType, AtomType] = {
+    TokenType.IDENTIFIER: AtomType.IDENTIFIER,
+    TokenType.LITERAL_STRING: AtomType.STR,
+    TokenType.TRUE: AtomType.IDENTIFIER,
+    TokenType.FALSE: AtomType.IDENTIFIER,
+    TokenType.NONE: AtomType.IDENTIFIER,
+}
+
+
+class AtomPool:
+    """
+    Module-wide table of the distinct identifiers and literals. Each text is
+    classified and its value parsed once when it is first interned, and atoms
+    refer to entries by index. The literal entries double as the module's
+    constant table.
+    """
+
+    def __init__(self):
+        self._texts: MutableSequence[str] = []
+        self._atom_types: MutableSequence[AtomType] = []
+        self._values: MutableSequence[AtomValue] = []
+        self._indices: MutableMapping[str, int] = {}
+
+    def intern(self, text: str, atom_type: Optional[AtomType] = None) -> int:
+        index: Optional[int] = self._indices.get(text)
+
+        if index is None:
+            if atom_type is None:
+                atom_type = _classify_atom_text(text=text)
+
+            index = len(self._texts)
+            self._texts.append(sys.intern(text))
+            self._atom_types.append(atom_type)
+            self._values.append(_parse_atom_value(text=text, atom_type=atom_type))
+            self._indices[text] = index
+
+        return index
+
+    def intern_token(self, text: str, token_type: TokenType) -> int:
+        index: Optional[int] = self._indices.get(text)
+
+        if index is not None:
+            return index
+
+        if token_type == TokenType.LITERAL_NUMBER:
+            atom_type: AtomType = _number_atom_type(text=text)
+        else:
+            # Type names such as int are identifiers when used as atoms
+            atom_type = _token_type_to_atom_type_mapping.get(token_type, AtomType.IDENTIFIER)
+
+        return self.intern(text=text, atom_type=atom_type)
+
+    def text(self, index: int) -> str:
+        return self._texts[index]
+
+    def atom_type(self, index: int) -> AtomType:
+        return self._atom_types[index]
+
+    def value(self, index: int) -> AtomValue:
+        return self._values[index]
+
+    def constants(self) -> Sequence[int]:
+        """
+        Indices of the int, float and str literal entries.
+        """
+        return [
+            index
+            for index, atom_type in enumerate(self._atom_types)
+            if atom_type in (AtomType.INT, AtomType.FLOAT, AtomType.STR)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+
+def _number_atom_type(text: str) -> AtomType:
+    digits: str = text.lstrip("-")
+
+    if digits[:2].lower() not in ("0x", "0o", "0b") and any(c in digits for c in ".eE"):
+        return AtomType.FLOAT
+
+    return AtomType.INT
+
+
+def _classify_atom_text(text: str) -> AtomType:
+    if re.match(r"-?(?:[0-9]+|0[xX][0-9A-Fa-f]+|0[oO][0-7]+|0[bB][01]+)$", text):
+        return AtomType.INT
+    elif re.match(
+        r"-?(?:(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|[0-9]+[eE][+-]?[0-9]+)$",
+        text,
+    ):
+        return AtomType.FLOAT
+    elif re.match(r"(['\"]).*\1$", text):
+        return AtomType.STR
+    elif text.isidentifier():
+        return AtomType.IDENTIFIER
+
+    return AtomType.UNKNOWN
+
+
+def _parse_atom_value(text: str, atom_type: AtomType) -> AtomValue:
+    if atom_type == AtomType.INT:
+        digits: str = text.lstrip("-")
+        value: int = int(digits, 0) if digits[:2].lower() in ("0x", "0o", "0b") else int(digits)
+
+        return -value if text.startswith("-") else value
+    elif atom_type == AtomType.FLOAT:
+        return float(text)
+    elif atom_type == AtomType.STR:
+        return literal_eval(text)
+
+    return text
 
 
 class Atom(Expression):
     Type: TypeAlias = AtomType
 
-    def __init__(self):
+    def __init__(self, pool: Optional[AtomPool] = None, index: Optional[int] = None):
         super().__init__(node_type=Node.Type.ATOM)
-        self._atom_type: AtomType = AtomType.UNKNOWN
-
-    def set_name(self, name) -> None:
-        super().set_name(name)
-
-        if re.match(r"(?:-?[0-9]+|0x[0-9A-Fa-f]+)$", self.name()):
-            self._atom_type = AtomType.INT
-        elif re.match(r"-?[0-9]+\.[0-9]+$", self.name()):
-            self._atom_type = AtomType.FLOAT
-        elif re.match(r"(['\"]).*\1$", self.name()):
-            self._atom_type = AtomType.STR
-        elif re.match(r"[_a-zA-Z][_A-Za-z0-9]*$", self.name()):
-            self._atom_type = AtomType.IDENTIFIER
-        else:
-            pass
-            # raise ValueError(f"Unable to determine atom type with name {self.name()}")
+        self._pool: Optional[AtomPool] = pool
+        self._index: Optional[int] = index
+
+    def name(self) -> str:
+        return self._pool.text(self._index) if self._pool is not None else ""
+
+    def set_name(self, name) -> "Atom":
+        # Names are entries of the pool of the module the atom belongs to
+        if self._pool is None:
+            raise ValueError(f"Atom {name} has no atom pool to intern its name into")
+
+        return self.set_pool_entry(pool=self._pool, index=self._pool.intern(name))
+
+    def pool(self) -> Optional[AtomPool]:
+        return self._pool
+
+    def index(self) -> Optional[int]:
+        return self._index
+
+    def set_pool_entry(self, pool: AtomPool, index: int) -> "Atom":
+        self._pool = pool
+        self._index = index
+        return self
 
     def atom_type(self) -> AtomType:
-        return self._atom_type
+        return self._pool.atom_type(self._index) if self._pool is not None else AtomType.UNKNOWN
 
     def int_value(self) -> int:
-        if self._atom_type != AtomType.INT:
+        if self.atom_type() != AtomType.INT:
             raise ValueError("Atom is not an int")
 
-        return int(self.name())
+        return self._pool.value(self._index)
 
     def float_value(self) -> float:
-        if self._atom_type != AtomType.FLOAT:
+        if self.atom_type() != AtomType.FLOAT:
             raise ValueError("Atom is not a float")
 
-        return float(self.name())
+        return self._pool.value(self._index)
 
-    def identifier_value(self) -> str:
-        if self._atom_type != AtomType.STR:
+    def str_value(self) -> str:
+        if self.atom_type() != AtomType.STR:
             raise ValueError("Atom is not a str")
 
-        return self.name()
+        return self._pool.value(self._index)
 
     def identifier_value(self) -> str:
-        if self._atom_type != AtomType.IDENTIFIER:
+        if self.atom_type() != AtomType.IDENTIFIER:
             raise ValueError("Atom is not an identifier")
 
         return self.name()
 
     def is_complete(self) -> bool:
-        return self.name() is not None
+        return self._pool is not None
 
     def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
         fields.append(f"atom_type = {self.atom_type().name}")
@@ -165,20 +327,214 @@ class DataTypeName(Enum):
     INT = "int"
     FLOAT = "float"
     STR = "str"
+    LIST = "list"
+    SET = "set"
+    DICT = "dict"
+    TUPLE = "tuple"
+    OPTIONAL = "Optional"
+    STRUCT = "struct"
+
+
+# Number of type parameters of each type, None if any number is allowed
+_data_type_name_to_arity_mapping: Mapping[DataTypeName, Optional[int]] = {
+    DataTypeName.NONE: 0,
+    DataTypeName.BOOL: 0,
+    DataTypeName.INT: 0,
+    DataTypeName.FLOAT: 0,
+    DataTypeName.STR: 0,
+    DataTypeName.LIST: 1,
+    DataTypeName.SET: 1,
+    DataTypeName.DICT: 2,
+    DataTypeName.TUPLE: None,
+    DataTypeName.OPTIONAL: 1,
+    DataTypeName.STRUCT: None,
+}
 
 
 class DataType:
+    """
+    Types are hash-consed: constructing a type that already exists returns
+    the existing instance, so that there is exactly one object for every
+    distinct type and equality is identity.
+
+    Struct types are named, and their parameters are the types of their
+    fields. A struct type without fields may also be a reference to a struct
+    by name only, which the type checker resolves.
+    """
+
     Name: TypeAlias = DataTypeName
 
-    def __init__(self, name: DataTypeName):
-        self._name: DataTypeName = name
+    _table: MutableMapping[
+        Tuple[DataTypeName, Tuple["DataType", ...], Optional[str], Tuple[str, ...]], "DataType"
+    ] = {}
+
+    def __new__(
+        cls,
+        name: DataTypeName,
+        parameters: Sequence["DataType"] = (),
+        struct_name: Optional[str] = None,
+        field_names: Sequence[str] = (),
+    ) -> "DataType":
+        key: Tuple[DataTypeName, Tuple[DataType, ...], Optional[str], Tuple[str, ...]] = (
+            name,
+            tuple(parameters),
+            struct_name,
+            tuple(field_names),
+        )
+        data_type: Optional[DataType] = cls._table.get(key)
+
+        if data_type is None:
+            arity: Optional[int] = _data_type_name_to_arity_mapping[name]
+
+            if arity is not None and arity != len(key[1]):
+                raise ValueError(f"{name.value} takes {arity} type parameters, got {len(key[1])}")
+
+            if (name == DataTypeName.STRUCT) != (struct_name is not None):
+                raise ValueError(f"Only struct types have a struct name, got {name.value}")
+
+            if len(key[3]) != len(key[1]) and name == DataTypeName.STRUCT:
+                raise ValueError(f"Struct {struct_name} needs a name for each of its fields")
+
+            data_type = super().__new__(cls)
+            data_type._name = name
+            data_type._parameters = key[1]
+            data_type._struct_name = struct_name
+            data_type._field_names = key[3]
+            cls._table[key] = data_type
+
+        return data_type
+
+    def __copy__(self) -> "DataType":
+        return self
+
+    def __deepcopy__(self, memo: MutableMapping[int, object]) -> "DataType":
+        return self
+
+    def __reduce__(self):
+        return DataType, (self._name, self._parameters, self._struct_name, self._field_names)
 
     def name(self) -> DataTypeName:
         return self._name
 
+    def parameters(self) -> Tuple["DataType", ...]:
+        return self._parameters
+
+    def struct_name(self) -> Optional[str]:
+        return self._struct_name
+
+    def field_names(self) -> Tuple[str, ...]:
+        return self._field_names
+
+    def is_primitive(self) -> bool:
+        return self._name in _primitive_data_type_names
+
+    def __str__(self) -> str:
+        if self._name == DataTypeName.NONE:
+            return "None"
+
+        if self._name == DataTypeName.STRUCT:
+            return self._struct_name
+
+        if not self._parameters and self._name != DataTypeName.TUPLE:
+            return self._name.value
+
+        return f"{self._name.value}[{', '.join(str(param) for param in self._parameters)}]"
+
+    def __repr__(self):
+        return f"DataType({self})"
+
     @classmethod
     def none_type(cls) -> "DataType":
-        return DataType(name=DataTypeName.NONE)
+        return _none_type
+
+    @classmethod
+    def struct_reference(cls, name: str) -> "DataType":
+        """
+        The struct called `name`, before the type checker resolves its fields.
+        """
+        return cls(name=DataTypeName.STRUCT, struct_name=name)
+
+    @classmethod
+    def from_str(cls, s: str) -> "DataType":
+        """
+        Parses a type annotation such as int, list[int], dict[str, list[float]]
+        or int?, which is shorthand for Optional[int]. Other names refer to
+        structs.
+        """
+        data_type, end = _parse_data_type(s=s, pos=0)
+
+        if s[end:].strip():
+            raise ValueError(f"Unsupported type {s}")
+
+        return data_type
+
+
+_primitive_data_type_names = frozenset(
+    (DataTypeName.NONE, DataTypeName.BOOL, DataTypeName.INT, DataTypeName.FLOAT)
+)
+
+_none_type: DataType = DataType(name=DataTypeName.NONE)
+
+_source_name_to_data_type_name_mapping: Mapping[str, DataTypeName] = {
+    "None": DataTypeName.NONE,
+    "bool": DataTypeName.BOOL,
+    "int": DataTypeName.INT,
+    "float": DataTypeName.FLOAT,
+    "str": DataTypeName.STR,
+    "list": DataTypeName.LIST,
+    "set": DataTypeName.SET,
+    "dict": DataTypeName.DICT,
+    "tuple": DataTypeName.TUPLE,
+    "Optional": DataTypeName.OPTIONAL,
+}
+
+_data_type_token_pattern: re.Pattern = re.compile(r"\s*([A-Za-z_]\w*|[\[\],?])")
+
+
+def _parse_data_type(s: str, pos: int) -> Tuple[DataType, int]:
+    match: Optional[re.Match] = _data_type_token_pattern.match(s, pos)
+
+    if not match or not match.group(1).isidentifier():
+        raise ValueError(f"Unsupported type {s}")
+
+    source_name: str = match.group(1)
+    name: Optional[DataTypeName] = _source_name_to_data_type_name_mapping.get(source_name)
+    pos = match.end()
+    parameters: MutableSequence[DataType] = []
+    match = _data_type_token_pattern.match(s, pos)
+
+    if name is not None and match and match.group(1) == "[":
+        pos = match.end()
+
+        while True:
+            parameter, pos = _parse_data_type(s=s, pos=pos)
+            parameters.append(parameter)
+
+            match = _data_type_token_pattern.match(s, pos)
+
+            if not match or match.group(1) not in (",", "]"):
+                raise ValueError(f"Unsupported type {s}")
+
+            pos = match.end()
+
+            if match.group(1) == "]":
+                break
+
+        match = _data_type_token_pattern.match(s, pos)
+
+    data_type = (
+        DataType(name=name, parameters=parameters)
+        if name is not None
+        else DataType.struct_reference(name=source_name)
+    )
+
+    # Any number of trailing ? wrap the type in Optional
+    while match and match.group(1) == "?":
+        data_type = DataType(name=DataTypeName.OPTIONAL, parameters=(data_type,))
+        pos = match.end()
+        match = _data_type_token_pattern.match(s, pos)
+
+    return data_type, pos
 
 
 class Variable(Node):
@@ -234,42 +590,146 @@ class Parameter(Node):
         fields.append(f"default_value = {repr(self.default_value())}")
 
 
-class Sum(Expression):
-    def __init__(self):
-        super().__init__(node_type=Node.Type.SUM)
+class BinaryOperator(Enum):
+    ADD = "+"
+    SUBTRACT = "-"
+    MULTIPLY = "*"
+    DIVIDE = "/"
+    EQUAL = "=="
+    NOT_EQUAL = "!="
+    LESS_THAN = "<"
+    LESS_THAN_OR_EQUAL = "<="
+    GREATER_THAN = ">"
+    GREATER_THAN_OR_EQUAL = ">="
+    AND = "and"
+    OR = "or"
+
+    def is_arithmetic(self) -> bool:
+        return self in _arithmetic_operators
+
+    def is_comparison(self) -> bool:
+        return self in _comparison_operators
+
+    def is_logical(self) -> bool:
+        return self in (BinaryOperator.AND, BinaryOperator.OR)
+
+
+_arithmetic_operators: AbstractSet[BinaryOperator] = frozenset(
+    (
+        BinaryOperator.ADD,
+        BinaryOperator.SUBTRACT,
+        BinaryOperator.MULTIPLY,
+        BinaryOperator.DIVIDE,
+    )
+)
+
+_comparison_operators: AbstractSet[BinaryOperator] = frozenset(
+    (
+        BinaryOperator.EQUAL,
+        BinaryOperator.NOT_EQUAL,
+        BinaryOperator.LESS_THAN,
+        BinaryOperator.LESS_THAN_OR_EQUAL,
+        BinaryOperator.GREATER_THAN,
+        BinaryOperator.GREATER_THAN_OR_EQUAL,
+    )
+)
+
+
+class UnaryOperator(Enum):
+    NEGATE = "-"
+    NOT = "not"
+
+
+class BinaryOperation(Expression):
+    def __init__(self, operator: BinaryOperator, node_type: Node.Type = Node.Type.BINARY_OPERATION):
+        super().__init__(node_type=node_type)
+        self._operator: BinaryOperator = operator
         self._left: Optional[Expression] = None
         self._right: Optional[Expression] = None
 
+    @staticmethod
+    def for_operator(operator: BinaryOperator) -> "BinaryOperation":
+        """
+        A new node for `operator`, which is a Sum for addition.
+        """
+        if operator == BinaryOperator.ADD:
+            return Sum()
+
+        return BinaryOperation(operator=operator)
+
+    def operator(self) -> BinaryOperator:
+        return self._operator
+
     def left(self) -> Optional[Expression]:
         return self._left
 
-    def set_left(self, left: Expression) -> "Sum":
+    def set_left(self, left: Expression) -> "BinaryOperation":
         self._left = left
         return self
 
     def right(self) -> Optional[Expression]:
         return self._right
 
-    def set_right(self, right: Expression) -> "Sum":
+    def set_right(self, right: Expression) -> "BinaryOperation":
         self._right = right
         return self
 
     def is_complete(self) -> bool:
         return self.left() is not None and self.right() is not None
 
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"operator = '{self.operator().value}'")
+        fields.append(f"left = {repr(self.left())}")
+        fields.append(f"right = {repr(self.right())}")
+
+
+class Sum(BinaryOperation):
+    def __init__(self):
+        super().__init__(operator=BinaryOperator.ADD, node_type=Node.Type.SUM)
+
     def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
         fields.append(f"left = {repr(self.left())}")
         fields.append(f"right = {repr(self.right())}")
 
 
+class UnaryOperation(Expression):
+    def __init__(self, operator: UnaryOperator):
+        super().__init__(node_type=Node.Type.UNARY_OPERATION)
+        self._operator: UnaryOperator = operator
+        self._operand: Optional[Expression] = None
+
+    def operator(self) -> UnaryOperator:
+        return self._operator
+
+    def operand(self) -> Optional[Expression]:
+        return self._operand
+
+    def set_operand(self, operand: Expression) -> "UnaryOperation":
+        self._operand = operand
+        return self
+
+    def is_complete(self) -> bool:
+        return self.operand() is not None
+
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"operator = '{self.operator().value}'")
+        fields.append(f"operand = {repr(self.operand())}")
+
+
 class Return(Statement):
     def __init__(self):
         super().__init__(node_type=Node.Type.RETURN_STATEMENT)
         self._expressions: MutableSequence[Expression] = []
 
-    def return_type(self) -> DataType:
-        # Calculate this from the expressions
-        pass
+    def return_type(self) -> Optional[DataType]:
+        if not self._expressions:
+            return DataType.none_type()
+
+        if len(self._expressions) > 1:
+            # Tuples are not supported yet
+            return None
+
+        return self._expressions[0].data_type()
 
     def expressions(self) -> MutableSequence[Expression]:
         return self._expressions
@@ -300,7 +760,7 @@ class FunctionDef(Statement):
         if self._return_type is not None:
             return self._return_type
 
-        return DataType(name=DataTypeName.NONE)
+        return DataType.none_type()
 
     def set_return_type(self, return_type: DataType) -> "FunctionDef":
         self._return_type: DataType = return_type
@@ -315,21 +775,56 @@ class FunctionDef(Statement):
         fields.append(f"return_type = {repr(self.return_type())}")
 
 
+class StructDef(Statement):
+    """
+    Representation of a struct definition. Structs are immutable, are
+    copied rather than shared, and their fields have no default values.
+    """
+
+    def __init__(self):
+        super().__init__(node_type=Node.Type.STRUCT_DEF)
+        self._fields: MutableSequence[Parameter] = []
+        self._data_type: Optional[DataType] = None
+
+    def fields(self) -> MutableSequence[Parameter]:
+        return self._fields
+
+    def data_type(self) -> DataType:
+        """
+        The type of the struct's values, with its fields once resolved by the
+        type checker.
+        """
+        if self._data_type is None:
+            return DataType.struct_reference(name=self.name())
+
+        return self._data_type
+
+    def set_data_type(self, data_type: DataType) -> "StructDef":
+        self._data_type = data_type
+        return self
+
+    def is_complete(self) -> bool:
+        return bool(self.name())
+
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"fields = {repr(self.fields())}")
+
+
 class FunctionCall(Expression):
     """
     Representation of a function call, aka "primary" in ANTLR parse tree.
     """
 
-    def __init__(self):
-        super().__init__(node_type=Node.Type.FUNCTION_CALL)
+    def __init__(self, node_type: Node.Type = Node.Type.FUNCTION_CALL):
+        super().__init__(node_type=node_type)
         self._arguments: MutableSequence[Expression] = []
 
     def arguments(self) -> MutableSequence[Expression]:
         return self._arguments
 
-    def return_type(self) -> DataType:
-        # Calculate from function call
-        pass
+    def return_type(self) -> Optional[DataType]:
+        # Resolved from the signature of the called function
+        return self.data_type()
 
     def is_complete(self) -> bool:
         # Function call doesn't need arguments, but does need a name
@@ -341,6 +836,96 @@ class FunctionCall(Expression):
         fields.append(f"return_type = {repr(self.return_type())}")
 
 
+class MethodCall(FunctionCall):
+    """
+    Representation of a call of a builtin method, such as xs.append(1). The
+    receiver is the first argument. The type checker qualifies the name with
+    the receiver's type, e.g. list.append, so that it cannot be mistaken for
+    a function.
+    """
+
+    def __init__(self):
+        super().__init__(node_type=Node.Type.METHOD_CALL)
+
+
+class ListLiteral(Expression):
+    def __init__(self):
+        super().__init__(node_type=Node.Type.LIST_LITERAL)
+        self._elements: MutableSequence[Expression] = []
+
+    def elements(self) -> MutableSequence[Expression]:
+        return self._elements
+
+    def is_complete(self) -> bool:
+        # Lists can be empty, but then their type must be known from context
+        return True
+
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"elements = {repr(self.elements())}")
+
+
+class Subscript(Expression):
+    """
+    Representation of indexing a value, such as xs[i].
+    """
+
+    def __init__(self):
+        super().__init__(node_type=Node.Type.SUBSCRIPT)
+        self._value: Optional[Expression] = None
+        self._index: Optional[Expression] = None
+
+    def value(self) -> Optional[Expression]:
+        return self._value
+
+    def set_value(self, value: Expression) -> "Subscript":
+        self._value = value
+        return self
+
+    def index(self) -> Optional[Expression]:
+        return self._index
+
+    def set_index(self, index: Expression) -> "Subscript":
+        self._index = index
+        return self
+
+    def is_complete(self) -> bool:
+        return self.value() is not None and self.index() is not None
+
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"value = {repr(self.value())}")
+        fields.append(f"index = {repr(self.index())}")
+
+
+class FieldAccess(Expression):
+    """
+    Representation of reading a field of a struct value, such as p.x. The
+    node's name is the field's.
+    """
+
+    def __init__(self):
+        super().__init__(node_type=Node.Type.FIELD_ACCESS)
+        self._value: Optional[Expression] = None
+
+    def value(self) -> Optional[Expression]:
+        return self._value
+
+    def set_value(self, value: Expression) -> "FieldAccess":
+        self._value = value
+        return self
+
+    def index(self) -> int:
+        """
+        Position of the field in the struct, once the value is type checked.
+        """
+        return self.value().data_type().field_names().index(self.name())
+
+    def is_complete(self) -> bool:
+        return self.value() is not None and bool(self.name())
+
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"value = {repr(self.value())}")
+
+
 class Assignment(Statement):
     """
     Representation of an assignment to a variable. Note that assignments are
@@ -372,3 +957,45 @@ class Assignment(Statement):
     def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
         fields.append(f"left = {repr(self.left())}")
         fields.append(f"right = {repr(self.right())}")
+
+
+class With(Statement):
+    """
+    Representation of a with statement. Its block shares the enclosing
+    scope, and the only context managers are builtins such as arena().
+    """
+
+    def __init__(self):
+        super().__init__(node_type=Node.Type.WITH_STATEMENT)
+        self._context: Optional[Expression] = None
+        self._statements: MutableSequence[Statement] = []
+
+    def context(self) -> Optional[Expression]:
+        return self._context
+
+    def set_context(self, context: Expression) -> "With":
+        self._context = context
+        return self
+
+    def statements(self) -> MutableSequence[Statement]:
+        return self._statements
+
+    def is_complete(self) -> bool:
+        return self.context() is not None
+
+    def _write_additional_fields(self, fields: MutableSequence[str]) -> None:
+        fields.append(f"context = {repr(self.context())}")
+        fields.append(f"statements = {repr(self.statements())}")
+
+
+def block_statements(statements: Sequence[Statement]) -> Iterator[Statement]:
+    """
+    The statements of a block in order, each followed by those of the with
+    blocks nested in it, which share its scope. Function bodies are not
+    entered.
+    """
+    for statement in statements:
+        yield statement
+
+        if isinstance(statement, With):
+            yield from block_statements(statements=statement.statements())
@@ -1,4 +1,5 @@
 import subprocess
+import sys
 from pathlib import Path
 from typing import Optional, Sequence
 
@@ -6,9 +7,12 @@ from sidewinder.compiler_toolchain.linker import LinkerBase
 
 
 class ClangLinker(LinkerBase):
-    def __init__(self, clang_path: Optional[Path]):
+    def __init__(self, clang_path: Optional[Path], gc_sections: bool = True):
         super().__init__()
         self._clang_path: Optional[Path] = clang_path
+        # Drop unreferenced sections, which with per-function sections
+        # removes unused functions and globals
+        self._gc_sections: bool = gc_sections
 
     def link(self, objects: Sequence[Path], output: Path) -> None:
         clang_args: Sequence[str] = []
@@ -21,4 +25,10 @@ class ClangLinker(LinkerBase):
         clang_args.extend([str(obj) for obj in objects])
         clang_args.extend(["-o", str(output)])
 
+        if self._gc_sections:
+            if sys.platform == "darwin":
+                clang_args.append("-Wl,-dead_strip")
+            else:
+                clang_args.append("-Wl,--gc-sections")
+
         subprocess.run(args=clang_args, check=True)
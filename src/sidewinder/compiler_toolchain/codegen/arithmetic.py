@@ -0,0 +1,138 @@
+from enum import Enum
+from typing import Callable, Mapping, Optional
+
+from llvmlite import ir
+
+from sidewinder.compiler_toolchain.ast import BinaryOperator
+from sidewinder.compiler_toolchain.codegen.types import VOID_T
+
+
+class OverflowMode(Enum):
+    """
+    What int arithmetic does when a result does not fit in 32 bits:
+
+    - WRAP: wraps around in two's complement.
+    - TRAP: aborts the program through llvm.trap.
+    - PROMOTE: computes intermediate results of an expression in 64 bits,
+      truncating only where the value is stored, passed or returned.
+    """
+
+    WRAP = "wrap"
+    TRAP = "trap"
+    PROMOTE = "promote"
+
+
+_operator_to_predicate_mapping: Mapping[BinaryOperator, str] = {
+    BinaryOperator.EQUAL: "==",
+    BinaryOperator.NOT_EQUAL: "!=",
+    BinaryOperator.LESS_THAN: "<",
+    BinaryOperator.LESS_THAN_OR_EQUAL: "<=",
+    BinaryOperator.GREATER_THAN: ">",
+    BinaryOperator.GREATER_THAN_OR_EQUAL: ">=",
+}
+
+_int_operations: Mapping[BinaryOperator, Callable[..., ir.Instruction]] = {
+    BinaryOperator.ADD: ir.IRBuilder.add,
+    BinaryOperator.SUBTRACT: ir.IRBuilder.sub,
+    BinaryOperator.MULTIPLY: ir.IRBuilder.mul,
+}
+
+_int_operations_with_overflow: Mapping[BinaryOperator, Callable[..., ir.Instruction]] = {
+    BinaryOperator.ADD: ir.IRBuilder.sadd_with_overflow,
+    BinaryOperator.SUBTRACT: ir.IRBuilder.ssub_with_overflow,
+    BinaryOperator.MULTIPLY: ir.IRBuilder.smul_with_overflow,
+}
+
+_float_operations: Mapping[BinaryOperator, Callable[..., ir.Instruction]] = {
+    BinaryOperator.ADD: ir.IRBuilder.fadd,
+    BinaryOperator.SUBTRACT: ir.IRBuilder.fsub,
+    BinaryOperator.MULTIPLY: ir.IRBuilder.fmul,
+    BinaryOperator.DIVIDE: ir.IRBuilder.fdiv,
+}
+
+
+def emit_int_arithmetic(
+    builder: ir.IRBuilder,
+    operator: BinaryOperator,
+    left: ir.Value,
+    right: ir.Value,
+    overflow_mode: OverflowMode,
+    flush: Optional[Callable[[], ir.Function]] = None,
+) -> ir.Value:
+    """
+    Adds, subtracts or multiplies two ints of the same width. Only TRAP mode
+    checks for overflow, PROMOTE mode is handled by the caller choosing the
+    width of the operands. `flush` is passed on to `emit_trap`.
+    """
+    if operator not in _int_operations:
+        raise ValueError(f"Unsupported int operator {operator.value}")
+
+    if overflow_mode != OverflowMode.TRAP:
+        return _int_operations[operator](builder, left, right)
+
+    result: ir.Value = _int_operations_with_overflow[operator](builder, left, right)
+
+    with builder.if_then(builder.extract_value(result, 1), likely=False):
+        emit_trap(builder=builder, flush=flush)
+
+    return builder.extract_value(result, 0)
+
+
+def emit_int_negation(
+    builder: ir.IRBuilder,
+    operand: ir.Value,
+    overflow_mode: OverflowMode,
+    flush: Optional[Callable[[], ir.Function]] = None,
+) -> ir.Value:
+    return emit_int_arithmetic(
+        builder=builder,
+        operator=BinaryOperator.SUBTRACT,
+        left=ir.Constant(operand.type, 0),
+        right=operand,
+        overflow_mode=overflow_mode,
+        flush=flush,
+    )
+
+
+def emit_int_comparison(
+    builder: ir.IRBuilder, operator: BinaryOperator, left: ir.Value, right: ir.Value
+) -> ir.Value:
+    return builder.icmp_signed(_operator_to_predicate_mapping[operator], left, right)
+
+
+def emit_float_arithmetic(
+    builder: ir.IRBuilder, operator: BinaryOperator, left: ir.Value, right: ir.Value
+) -> ir.Value:
+    if operator not in _float_operations:
+        raise ValueError(f"Unsupported float operator {operator.value}")
+
+    return _float_operations[operator](builder, left, right)
+
+
+def emit_float_comparison(
+    builder: ir.IRBuilder, operator: BinaryOperator, left: ir.Value, right: ir.Value
+) -> ir.Value:
+    predicate: str = _operator_to_predicate_mapping[operator]
+
+    # As in Python, NaN compares unequal to everything, including itself
+    if operator == BinaryOperator.NOT_EQUAL:
+        return builder.fcmp_unordered(predicate, left, right)
+
+    return builder.fcmp_ordered(predicate, left, right)
+
+
+def emit_trap(builder: ir.IRBuilder, flush: Optional[Callable[[], ir.Function]] = None) -> None:
+    """
+    Aborts the program. `flush` gives the routine that writes out buffered
+    output, which is called first so that what was printed is not lost. It
+    is only looked up when a trap is emitted, so that modules that cannot
+    trap do not pull it in.
+    """
+    if flush is not None:
+        builder.call(flush(), [])
+
+    trap: ir.Function = builder.module.declare_intrinsic(
+        "llvm.trap", fnty=ir.FunctionType(VOID_T, [])
+    )
+    builder.call(trap, [])
+    builder.unreachable()
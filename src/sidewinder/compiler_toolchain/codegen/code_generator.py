@@ -1,20 +1,76 @@
-from collections import deque
-from typing import Any, Deque, Mapping, MutableMapping, MutableSet, Optional, Union
+import math
+from collections import Counter, deque
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Deque,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from llvmlite import binding, ir
 
+from sidewinder.compiler_toolchain.ast import Assignment as AssignmentNode
 from sidewinder.compiler_toolchain.ast import Atom as AtomNode
+from sidewinder.compiler_toolchain.ast import AtomType
+from sidewinder.compiler_toolchain.ast import BinaryOperation as BinaryOperationNode
+from sidewinder.compiler_toolchain.ast import BinaryOperator, DataType, DataTypeName
+from sidewinder.compiler_toolchain.ast import Expression as ExpressionNode
+from sidewinder.compiler_toolchain.ast import FieldAccess as FieldAccessNode
 from sidewinder.compiler_toolchain.ast import FunctionCall as FunctionCallNode
+from sidewinder.compiler_toolchain.ast import FunctionDef as FunctionDefNode
+from sidewinder.compiler_toolchain.ast import ListLiteral as ListLiteralNode
 from sidewinder.compiler_toolchain.ast import Module as ModuleNode
 from sidewinder.compiler_toolchain.ast import Node
+from sidewinder.compiler_toolchain.ast import Return as ReturnNode
+from sidewinder.compiler_toolchain.ast import StructDef as StructDefNode
+from sidewinder.compiler_toolchain.ast import Subscript as SubscriptNode
+from sidewinder.compiler_toolchain.ast import UnaryOperation as UnaryOperationNode
+from sidewinder.compiler_toolchain.ast import UnaryOperator
+from sidewinder.compiler_toolchain.ast import With as WithNode
+from sidewinder.compiler_toolchain.ast import block_statements
+from sidewinder.compiler_toolchain.codegen.arithmetic import (
+    OverflowMode,
+    emit_float_arithmetic,
+    emit_float_comparison,
+    emit_int_arithmetic,
+    emit_int_comparison,
+    emit_int_negation,
+)
+from sidewinder.compiler_toolchain.codegen.compile_time_evaluator import (
+    CompileTimeEvaluator,
+    can_evaluate,
+)
+from sidewinder.compiler_toolchain.codegen.runtime import (
+    AllocatorRuntime,
+    ListRuntime,
+    StdoutRuntime,
+    emit_list_get,
+    emit_list_length,
+    format_value,
+    str_hash,
+)
 from sidewinder.compiler_toolchain.codegen.types import (
+    FLOAT32_T,
+    INT1_T,
     INT8_T,
     INT32_T,
+    INT64_T,
+    STR_T,
     VOID_T,
     ConstantValueArgs,
     GlobalVariableInitializer,
-    GlobalVariableInitializerFunc,
+    ir_type_for,
+    str_header_type,
 )
+from sidewinder.compiler_toolchain.semantic.escape import EscapeAnalyzer
+from sidewinder.compiler_toolchain.semantic.purity import PurityAnalyzer
 
 
 class FunctionCodeGenerator:
@@ -32,6 +88,9 @@ class FunctionCodeGenerator:
         if name in self._block_names:
             raise ValueError(f"Cannot define {name} because it already exists in {self._func.name}")
 
+    def function(self) -> ir.Function:
+        return self._func
+
     def current_builder(self) -> ir.IRBuilder:
         self._assert_has_current_builder()
 
@@ -58,38 +117,102 @@ class FunctionCodeGenerator:
 class ModuleCodeGenerator:
     def __init__(self, module: ir.Module):
         self._module: ir.Module = module
+        # Pooled constants keyed by their IR text, which identifies type and content
+        self._constants: MutableMapping[str, ir.GlobalVariable] = {}
+        self._string_constants: MutableMapping[str, ir.GlobalVariable] = {}
+        # llvmlite caches the text of global variables once they are rendered
+        self._dumped: bool = False
 
     def module(self) -> ir.Module:
         return self._module
 
     def dump(self) -> str:
+        self._dumped = True
+
         return str(self.module())
 
     def _assert_global_name_undefined(self, name: str) -> None:
-        try:
-            self._module.get_global(name=name)
+        if name in self._module.globals:
             raise ValueError(
                 f"Cannot define {name} because it already exists in {self._module.name}"
             )
-        except KeyError:
-            # We want this to not exist, so pass
-            pass
+
+    def add_constant(self, value: ir.Constant) -> ir.GlobalVariable:
+        """
+        Returns a private unnamed_addr global holding `value`, emitting it only
+        the first time a constant with the same type and content is requested.
+        """
+        key: str = str(value)
+        global_var: Optional[ir.GlobalVariable] = self._constants.get(key)
+
+        if global_var is None:
+            global_var = ir.GlobalVariable(
+                module=self.module(), typ=value.type, name=self.module().get_unique_name(".const")
+            )
+            global_var.linkage = "private"
+            global_var.unnamed_addr = True
+            global_var.global_constant = True
+            global_var.initializer = value
+            self._constants[key] = global_var
+
+        return global_var
+
+    def add_string_constant(self, value: str) -> ir.GlobalVariable:
+        """
+        Pooled NUL-terminated UTF-8 bytes of `value`.
+        """
+        global_var: Optional[ir.GlobalVariable] = self._string_constants.get(value)
+
+        if global_var is None:
+            data = bytearray(value.encode("utf-8") + b"\0")
+            global_var = self.add_constant(ir.Constant(ir.ArrayType(INT8_T, len(data)), data))
+            self._string_constants[value] = global_var
+
+        return global_var
+
+    def add_str_literal(self, value: str) -> ir.Constant:
+        """
+        A str object for the literal `value`: a pooled constant header with
+        its precomputed hash and length, followed by its NUL-terminated bytes.
+        Literals are immortal, they are never allocated or freed.
+        """
+        data = bytearray(value.encode("utf-8") + b"\0")
+        # Hashes are unsigned, IR constants are signed
+        hash_value: int = str_hash(value)
+        hash_value -= (hash_value >> 63) << 64
+        header: ir.Constant = ir.Constant(
+            str_header_type(length=len(data)),
+            [
+                ir.Constant(INT64_T, hash_value),
+                ir.Constant(INT64_T, len(data) - 1),
+                ir.Constant(ir.ArrayType(INT8_T, len(data)), data),
+            ],
+        )
+
+        return self.add_constant(header).bitcast(STR_T)
+
+    def add_constant_array(self, element_type: ir.Type, values: Sequence[Any]) -> ir.GlobalVariable:
+        return self.add_constant(ir.Constant(ir.ArrayType(element_type, len(values)), values))
+
+    def constants(self) -> Sequence[ir.GlobalVariable]:
+        return list(self._constants.values())
 
     def add_global_variable(
         self,
         ir_type: ir.Type,
         name: str,
         initializer: GlobalVariableInitializer,
+        constant: bool = True,
     ) -> ir.GlobalVariable:
         self._assert_global_name_undefined(name=name)
 
         global_var = ir.GlobalVariable(module=self.module(), typ=ir_type, name=name)
-        global_var.global_constant = True
+        global_var.global_constant = constant
 
-        if isinstance(initializer, GlobalVariableInitializerFunc):
+        if isinstance(initializer, ConstantValueArgs):
+            global_var.initializer = ir.Constant(initializer.ir_type, initializer.constant)
+        elif callable(initializer):
             global_var.initializer = initializer()
-        elif isinstance(initializer, ConstantValueArgs):
-            global_var.initializer = initializer
         else:
             raise ValueError(
                 "initializer must either be a global variable initializer "
@@ -103,20 +226,71 @@ class ModuleCodeGenerator:
 
         return FunctionCodeGenerator(module=self.module(), name=name, func_type=func_type)
 
+    def assign_sections(self) -> None:
+        """
+        Places every defined function and global variable in its own ELF
+        section, so that the linker can drop the ones nothing refers to with
+        --gc-sections. Must run after initializers are final, because
+        zero-initialized variables go to .bss, and before the module is first
+        dumped, which fixes the text of its globals.
+        """
+        if self._dumped:
+            raise RuntimeError(f"Module {self._module.name} was dumped before assigning sections")
+
+        for global_value in self.module().global_values:
+            if isinstance(global_value, ir.Function):
+                if global_value.is_declaration:
+                    continue
+
+                prefix: str = ".text"
+            elif global_value.global_constant:
+                prefix = ".rodata"
+            elif _is_zero_initializer(constant=global_value.initializer):
+                prefix = ".bss"
+            else:
+                prefix = ".data"
+
+            global_value.section = f"{prefix}.{global_value.name}"
+
+
+def _is_zero_initializer(constant: Optional[ir.Constant]) -> bool:
+    if constant is None or constant.constant is None:
+        return True
+
+    value: Any = constant.constant
+
+    if isinstance(value, float):
+        # -0.0 is not all zero bits
+        return value == 0.0 and math.copysign(1.0, value) > 0.0
+
+    return isinstance(value, int) and value == 0
+
+
+def _is_elf_triple(triple: str) -> bool:
+    return not any(os_name in triple for os_name in ("darwin", "macos", "ios", "windows", "win32"))
+
 
 class CodeGenerator:
-    def __init__(self, triple: str):
+    def __init__(self, triple: str, function_sections: Optional[bool] = None):
         binding.initialize()
         binding.initialize_native_target()
         binding.initialize_native_asmprinter()
 
         self._triple: str = triple
+        # Per-function sections only make sense for ELF, Mach-O dead-strips
+        # by symbol anyway
+        self._function_sections: bool = (
+            _is_elf_triple(triple=triple) if function_sections is None else function_sections
+        )
         self._modules: MutableMapping[str, ir.Module] = dict()
         self._current_module: Optional[ir.Module] = None
 
     def triple(self) -> str:
         return self._triple
 
+    def function_sections(self) -> bool:
+        return self._function_sections
+
     def finalize(self):
         binding.shutdown()
 
@@ -177,30 +351,84 @@ class CodeGenerator:
 
 
 class CodeGeneratorASTVisitor:
-    def __init__(self, generator: CodeGenerator):
+    """
+    Lowers a type-checked AST to LLVM IR. Functions become IR functions,
+    module-level variables become globals and the remaining module-level
+    statements are emitted into main(). Primitive values are unboxed IR values
+    of the types in codegen/types.py, and operators lower to native
+    instructions with int overflow handled according to `overflow_mode`.
+    Object variables that do not escape their function are kept in SSA
+    values when they are bound only once. Objects are allocated through
+    AllocatorRuntime, in the arena of the `with arena():` block they are
+    created in if they cannot outlive it, which frees them when it ends.
+    """
+
+    def __init__(
+        self,
+        generator: CodeGenerator,
+        evaluate_at_compile_time: bool = True,
+        overflow_mode: OverflowMode = OverflowMode.WRAP,
+    ):
         self._generator: CodeGenerator = generator
         self._node_stack: Deque[Node] = deque()
+        self._evaluate_at_compile_time: bool = evaluate_at_compile_time
+        self._overflow_mode: OverflowMode = overflow_mode
+
+        self._module_generator: Optional[ModuleCodeGenerator] = None
+        self._function_defs: MutableMapping[str, FunctionDefNode] = {}
+        self._function_generators: MutableMapping[str, FunctionCodeGenerator] = {}
+        self._global_variables: MutableMapping[str, ir.GlobalVariable] = {}
+        # The function being generated, or None for main()
+        self._func_def: Optional[FunctionDefNode] = None
+        # Stack slots of the function being generated
+        self._local_variables: MutableMapping[str, ir.Value] = {}
+        # Variables of the function being generated that live in SSA values,
+        # and the values bound to them so far
+        self._ssa_variables: AbstractSet[str] = frozenset()
+        self._local_values: MutableMapping[str, ir.Value] = {}
+        self._non_escaping: Mapping[str, AbstractSet[str]] = {}
+        self._arena_list_literals: AbstractSet[ListLiteralNode] = frozenset()
+        self._builder: Optional[ir.IRBuilder] = None
+        # Calls to pure functions at module scope are run at compile time
+        self._pure_functions: AbstractSet[str] = frozenset()
+        self._evaluator: Optional[CompileTimeEvaluator] = None
+        # Whether each pure function may trap, which would abort the compiler
+        self._may_trap: MutableMapping[str, bool] = {}
+        self._runtime: Optional[StdoutRuntime] = None
+        self._allocator: Optional[AllocatorRuntime] = None
+        self._lists: Optional[ListRuntime] = None
+        # Marks of the arenas entered by the function being generated, so
+        # that returns can exit them
+        self._arena_marks: MutableSequence[ir.Value] = []
+        # Constant text of print() calls not written out yet, so that
+        # adjacent prints become a single write
+        self._pending_output: MutableSequence[str] = []
 
     def generator(self) -> CodeGenerator:
         return self._generator
 
     def generate_module(self, name: str, node: Node) -> str:
-        module_generator: ModuleCodeGenerator = self.generator().add_module(
-            name=name, open_module=True
-        )
+        self._module_generator = self.generator().add_module(name=name, open_module=True)
+        self._runtime = StdoutRuntime(module=self._module_generator.module())
+        self._allocator = AllocatorRuntime(module=self._module_generator.module())
+        self._lists = ListRuntime(module=self._module_generator.module(), allocator=self._allocator)
 
         # Push node into stack
         self.push(node)
 
         # Visit nodes until we exhaust them
-        while not self._node_stack:
+        while self._node_stack:
             self.visit(node=self.pop())
 
+        if self.generator().function_sections():
+            self._module_generator.assign_sections()
+
         # Dump IR
-        module_ir: str = module_generator.dump()
+        module_ir: str = self._module_generator.dump()
 
         # Close the module
         self.generator().close_module()
+        self._module_generator = None
 
         return module_ir
 
@@ -213,19 +441,782 @@ class CodeGeneratorASTVisitor:
     def visit(self, node: Node) -> None:
         if isinstance(node, ModuleNode):
             # TODO: check for nested module and raise error
-            for statement_node in reversed(node.statements()):
-                self.push(statement_node)
-        elif isinstance(node, FunctionCallNode):
-            pass
-        elif isinstance(node, AtomNode):
-            pass
+            self._generate_module_body(module=node)
+        elif isinstance(node, FunctionDefNode):
+            self._generate_function(func_def=node)
         else:
             raise ValueError(f"Unsupported node {node}")
 
+    def _generate_module_body(self, module: ModuleNode) -> None:
+        func_defs: Sequence[FunctionDefNode] = [
+            statement for statement in module.statements() if isinstance(statement, FunctionDefNode)
+        ]
+
+        # Declare every function first so that calls can precede definitions
+        for func_def in func_defs:
+            self._declare_function(func_def=func_def)
+
+        # Pure functions are compiled on their own first, so that globals can
+        # be declared with the results of the calls to them
+        if self._evaluate_at_compile_time:
+            self._pure_functions = PurityAnalyzer().pure_functions(module=module)
+
+            if self._pure_functions:
+                self._evaluator = CompileTimeEvaluator(
+                    module_ir=self._generate_pure_module(module=module)
+                )
+
+        assignment_counts: Counter = Counter(
+            statement.left().name()
+            for statement in block_statements(statements=module.statements())
+            if isinstance(statement, AssignmentNode)
+        )
+
+        # Functions may read any module variable. Only variables assigned once,
+        # outside of with blocks, can be baked.
+        for statement in module.statements():
+            for nested in block_statements(statements=[statement]):
+                if isinstance(nested, AssignmentNode):
+                    self._declare_global_variable(
+                        assignment=nested,
+                        bake=nested is statement and assignment_counts[nested.left().name()] == 1,
+                    )
+
+        escape_analyzer = EscapeAnalyzer()
+        self._non_escaping = escape_analyzer.non_escaping_variables(module=module)
+        self._arena_list_literals = escape_analyzer.arena_list_literals(module=module)
+
+        for func_def in func_defs:
+            self.visit(node=func_def)
+
+        main_generator: FunctionCodeGenerator = self._module_generator.add_global_function(
+            name="main", func_type=ir.FunctionType(INT32_T, [])
+        )
+        self._begin_function(function_generator=main_generator)
+
+        for statement in module.statements():
+            if isinstance(statement, FunctionDefNode):
+                continue
+            elif (
+                isinstance(statement, AssignmentNode)
+                and self._global_variables[statement.left().name()].global_constant
+            ):
+                # Baked, there is nothing left to compute
+                continue
+
+            self._emit_statement(statement=statement)
+
+        self._flush_pending_output()
+
+        if self._runtime.is_used():
+            self._builder.call(self._runtime.flush(), [])
+
+        main_generator.add_return(ir.Constant(INT32_T, 0))
+
+        self._evaluator = None
+
+    def _declare_function(self, func_def: FunctionDefNode) -> None:
+        func_type = ir.FunctionType(
+            ir_type_for(func_def.return_type()),
+            [ir_type_for(param.data_type()) for param in func_def.parameters()],
+        )
+        function_generator: FunctionCodeGenerator = self._module_generator.add_global_function(
+            name=func_def.name(), func_type=func_type
+        )
+
+        self._function_defs[func_def.name()] = func_def
+        self._function_generators[func_def.name()] = function_generator
+
+    def _declare_global_variable(self, assignment: AssignmentNode, bake: bool) -> None:
+        """
+        Declares the global an assignment is to. If `bake` is set and it is
+        assigned the result of a compile-time call, it is declared constant
+        with that value, so that main() has nothing to compute.
+        """
+        name: str = assignment.left().name()
+
+        if name in self._global_variables:
+            return
+
+        data_type: DataType = assignment.left().data_type()
+        ir_type: ir.Type = ir_type_for(data_type)
+        value: Optional[Any] = (
+            self._constant_value(expression=assignment.right(), target=data_type)
+            if bake and isinstance(assignment.right(), FunctionCallNode)
+            else None
+        )
+        self._global_variables[name] = self._module_generator.add_global_variable(
+            ir_type=ir_type,
+            name=name,
+            initializer=ConstantValueArgs(ir_type=ir_type, constant=value),
+            constant=value is not None,
+        )
+
+    def _generate_pure_module(self, module: ModuleNode) -> str:
+        """
+        The IR of a module of only the pure functions of `module`, for the
+        compile-time evaluator. They only read their parameters and locals,
+        so they need none of the globals.
+        """
+        pure_module = ModuleNode(atom_pool=module.atom_pool())
+        pure_module.statements().extend(
+            statement
+            for statement in module.statements()
+            if isinstance(statement, FunctionDefNode) and statement.name() in self._pure_functions
+        )
+        visitor = CodeGeneratorASTVisitor(
+            generator=CodeGenerator(triple=self.generator().triple(), function_sections=False),
+            evaluate_at_compile_time=False,
+            overflow_mode=self._overflow_mode,
+        )
+
+        return visitor.generate_module(
+            name=f"{self._module_generator.module().name}.pure", node=pure_module
+        )
+
+    def _evaluate_call(self, call: FunctionCallNode) -> Optional[Any]:
+        if (
+            self._evaluator is None
+            or call.name() not in self._pure_functions
+            or self._function_may_trap(name=call.name())
+        ):
+            return None
+
+        func_def: FunctionDefNode = self._function_defs[call.name()]
+        function: ir.Function = self._function_generators[call.name()].function()
+
+        if not can_evaluate(function_type=function.function_type):
+            return None
+
+        args: MutableSequence[Any] = []
+
+        for i, param in enumerate(func_def.parameters()):
+            arg: ExpressionNode = (
+                call.arguments()[i] if i < len(call.arguments()) else param.default_value()
+            )
+            value: Optional[Any] = self._constant_value(expression=arg, target=param.data_type())
+
+            if value is None:
+                return None
+
+            args.append(value)
+
+        return self._evaluator.call(function=function, args=args)
+
+    def _function_may_trap(self, name: str) -> bool:
+        if self._overflow_mode != OverflowMode.TRAP:
+            return False
+
+        if name not in self._may_trap:
+            func_def: FunctionDefNode = self._function_defs[name]
+            # Only called for pure functions, which only have assignments and
+            # returns and are not recursive, so this terminates
+            self._may_trap[name] = any(
+                self._expression_may_trap(expression=expression)
+                for statement in func_def.statements()
+                for expression in (
+                    [statement.right()]
+                    if isinstance(statement, AssignmentNode)
+                    else statement.expressions()
+                )
+            )
+
+        return self._may_trap[name]
+
+    def _expression_may_trap(self, expression: ExpressionNode) -> bool:
+        if isinstance(expression, BinaryOperationNode):
+            return (
+                expression.data_type().name() == DataTypeName.INT
+                and expression.operator().is_arithmetic()
+            ) or any(
+                self._expression_may_trap(expression=operand)
+                for operand in (expression.left(), expression.right())
+            )
+        elif isinstance(expression, UnaryOperationNode):
+            return (
+                expression.operator() == UnaryOperator.NEGATE
+                and expression.data_type().name() == DataTypeName.INT
+            ) or self._expression_may_trap(expression=expression.operand())
+        elif isinstance(expression, FunctionCallNode):
+            # Default values are evaluated by the caller
+            defaults: Sequence[ExpressionNode] = [
+                param.default_value()
+                for param in self._function_defs[expression.name()].parameters()
+                if param.default_value() is not None
+            ]
+
+            return self._function_may_trap(name=expression.name()) or any(
+                self._expression_may_trap(expression=arg)
+                for arg in [*expression.arguments(), *defaults]
+            )
+
+        return False
+
+    def _constant_value(self, expression: ExpressionNode, target: DataType) -> Optional[Any]:
+        """
+        The value of a literal or a compile-time call, converted to `target`,
+        or None if it is only known at run time.
+        """
+        value: Optional[Any] = None
+
+        if isinstance(expression, AtomNode):
+            if expression.atom_type() in (AtomType.INT, AtomType.FLOAT):
+                value = expression.pool().value(expression.index())
+            elif expression.name() in ("True", "False"):
+                value = expression.name() == "True"
+        elif isinstance(expression, FunctionCallNode):
+            value = self._evaluate_call(call=expression)
+
+        if value is None or ir_type_for(target) not in (INT1_T, INT32_T, FLOAT32_T):
+            return None
+
+        return float(value) if target.name() == DataTypeName.FLOAT else value
+
+    def _begin_function(
+        self, function_generator: FunctionCodeGenerator, func_def: Optional[FunctionDefNode] = None
+    ) -> None:
+        self._builder = function_generator.add_block()
+        self._func_def = func_def
+        self._local_variables = {}
+        self._ssa_variables = frozenset()
+        self._local_values = {}
+        self._arena_marks = []
+
+    def _generate_function(self, func_def: FunctionDefNode) -> None:
+        function_generator: FunctionCodeGenerator = self._function_generators[func_def.name()]
+        function: ir.Function = function_generator.function()
+
+        self._begin_function(function_generator=function_generator, func_def=func_def)
+        self._ssa_variables = self._find_ssa_variables(func_def=func_def)
+
+        # Parameters live in stack slots so that they can be reassigned,
+        # mem2reg promotes them back to registers
+        for param, arg in zip(func_def.parameters(), function.args):
+            arg.name = param.name()
+
+            if param.name() in self._ssa_variables:
+                self._local_values[param.name()] = arg
+                continue
+
+            slot: ir.Value = self._alloca(ir_type=arg.type, name=param.name())
+            self._builder.store(arg, slot)
+            self._local_variables[param.name()] = slot
+
+        for statement in func_def.statements():
+            self._emit_statement(statement=statement)
+
+        self._flush_pending_output()
+
+        if not self._builder.block.is_terminated:
+            function_generator.add_return(None)
+
+    def _find_ssa_variables(self, func_def: FunctionDefNode) -> AbstractSet[str]:
+        """
+        Object variables of `func_def` that do not escape, and struct
+        variables, which are values and cannot escape, that are bound once:
+        either as a parameter that is never reassigned or by a single
+        assignment. Function bodies have no branches, so the binding dominates
+        every read and the value needs no stack slot.
+        """
+        param_names: AbstractSet[str] = {param.name() for param in func_def.parameters()}
+        assignments: Sequence[AssignmentNode] = [
+            statement
+            for statement in block_statements(statements=func_def.statements())
+            if isinstance(statement, AssignmentNode)
+        ]
+        assignment_counts: Counter = Counter(assignment.left().name() for assignment in assignments)
+        candidates: MutableSet[str] = set(self._non_escaping.get(func_def.name(), frozenset()))
+        candidates.update(
+            variable.name()
+            for variable in [
+                *func_def.parameters(),
+                *(assignment.left() for assignment in assignments),
+            ]
+            if variable.data_type().name() == DataTypeName.STRUCT
+        )
+
+        return frozenset(
+            name
+            for name in candidates
+            if assignment_counts[name] == (0 if name in param_names else 1)
+        )
+
+    def _alloca(self, ir_type: ir.Type, name: str) -> ir.Value:
+        # Keep every stack slot in the entry block so that mem2reg can promote
+        # it. Instructions are only ever appended, so return to the block end.
+        block: ir.Block = self._builder.block
+        self._builder.position_at_start(self._builder.function.entry_basic_block)
+        slot: ir.Value = self._builder.alloca(ir_type, name=f"{name}.addr")
+        self._builder.position_at_end(block)
+
+        return slot
+
+    def _emit_statement(self, statement: Node) -> None:
+        if self._is_print_call(expression=statement):
+            self._emit_print(call=statement)
+            return
+
+        self._flush_pending_output()
+
+        if isinstance(statement, StructDefNode):
+            # Structs are only types, they have no code
+            return
+        elif isinstance(statement, AssignmentNode):
+            self._emit_assignment(assignment=statement)
+        elif isinstance(statement, ReturnNode):
+            self._emit_return(statement=statement)
+        elif isinstance(statement, WithNode):
+            self._emit_with(statement=statement)
+        elif isinstance(statement, ExpressionNode):
+            self._emit_expression(expression=statement)
+        else:
+            raise ValueError(f"Unsupported statement {statement}")
+
+    def _is_print_call(self, expression: Node) -> bool:
+        return (
+            isinstance(expression, FunctionCallNode)
+            and expression.name() == "print"
+            and expression.name() not in self._function_defs
+        )
+
+    def _emit_print(self, call: FunctionCallNode) -> None:
+        texts: Sequence[Optional[str]] = [
+            self._print_constant(expression=arg) for arg in call.arguments()
+        ]
+        values: MutableSequence[Optional[ir.Value]] = []
 
-# Module @ 4381591824 (type = 'MODULE', name = '', statements = [
-#   FunctionCall @ 4374328272 (type = 'FUNCTION_CALL', name = 'print', arguments = [
-#       Atom @ 4383281744 (type = 'ATOM', name = '5'),
-#       Atom @ 4379802256 (type = 'ATOM', name = '7')
-#   ],
-#   return_type = None)])
+        # As in Python, every argument is evaluated before anything is written
+        for arg, text in zip(call.arguments(), texts):
+            if text is None:
+                # Output of earlier prints goes before any the argument writes
+                self._flush_pending_output()
+                values.append(self._emit_expression(expression=arg))
+            else:
+                values.append(None)
+
+        for i, (arg, text, value) in enumerate(zip(call.arguments(), texts, values)):
+            if i:
+                self._pending_output.append(" ")
+
+            if text is not None:
+                self._pending_output.append(text)
+                continue
+
+            if arg.data_type() is DataType.none_type():
+                # It was only evaluated for its effects
+                self._pending_output.append("None")
+                continue
+
+            printer: Optional[Callable[[], ir.Function]] = {
+                DataTypeName.INT: self._runtime.print_int,
+                DataTypeName.FLOAT: self._runtime.print_float,
+                DataTypeName.BOOL: self._runtime.print_bool,
+                DataTypeName.STR: self._runtime.print_str,
+            }.get(arg.data_type().name())
+
+            if printer is None:
+                raise ValueError(f"Unsupported print argument type {arg.data_type()}")
+
+            self._flush_pending_output()
+            self._builder.call(printer(), [value])
+
+        self._pending_output.append("\n")
+
+    def _print_constant(self, expression: ExpressionNode) -> Optional[str]:
+        """
+        The text print() writes for `expression`, or None if it is only known
+        at run time.
+        """
+        if isinstance(expression, AtomNode):
+            if expression.atom_type() in (AtomType.INT, AtomType.FLOAT, AtomType.STR):
+                return format_value(expression.pool().value(expression.index()))
+            elif expression.name() in ("True", "False", "None"):
+                return expression.name()
+        elif isinstance(expression, FunctionCallNode):
+            value: Optional[Any] = self._evaluate_call(call=expression)
+
+            if value is not None:
+                if expression.data_type().name() == DataTypeName.BOOL:
+                    value = bool(value)
+
+                return format_value(value)
+
+        return None
+
+    def _flush_pending_output(self) -> None:
+        if not self._pending_output:
+            return
+
+        text: str = "".join(self._pending_output)
+        self._pending_output.clear()
+
+        string: ir.GlobalVariable = self._module_generator.add_string_constant(text)
+        self._builder.call(
+            self._runtime.write(),
+            [
+                string.gep([ir.Constant(INT32_T, 0), ir.Constant(INT32_T, 0)]),
+                ir.Constant(INT64_T, len(text.encode("utf-8"))),
+            ],
+        )
+
+        if "\n" in text:
+            self._builder.call(self._runtime.end_line(), [])
+
+    def _emit_assignment(self, assignment: AssignmentNode) -> None:
+        name: str = assignment.left().name()
+        target_type: DataType = assignment.left().data_type()
+        value: ir.Value = self._emit_coerced(expression=assignment.right(), target=target_type)
+
+        if name in self._ssa_variables:
+            self._local_values[name] = value
+            return
+
+        slot: Optional[ir.Value] = self._local_variables.get(name)
+
+        if slot is None and self._func_def is None:
+            slot = self._global_variables[name]
+
+        if slot is None:
+            # As in Python, assigning in a function makes the variable local to
+            # it, even if a global has the same name
+            slot = self._alloca(ir_type=ir_type_for(target_type), name=name)
+            self._local_variables[name] = slot
+
+        self._builder.store(value, slot)
+
+    def _emit_return(self, statement: ReturnNode) -> None:
+        function: ir.Function = self._builder.function
+        return_type: ir.Type = function.function_type.return_type
+
+        if return_type == VOID_T:
+            # Only None can be returned, so there is nothing to compute
+            self._exit_arenas()
+            self._builder.ret_void()
+            return
+
+        func_def: FunctionDefNode = self._function_defs[function.name]
+        value: ir.Value = self._emit_coerced(
+            expression=statement.expressions()[0], target=func_def.return_type()
+        )
+        self._exit_arenas()
+        self._builder.ret(value)
+
+    def _emit_with(self, statement: WithNode) -> None:
+        # arena() is the only context manager
+        mark: ir.Value = self._builder.call(self._allocator.arena_enter(), [])
+        self._arena_marks.append(mark)
+
+        for nested in statement.statements():
+            self._emit_statement(statement=nested)
+
+        self._arena_marks.pop()
+
+        if not self._builder.block.is_terminated:
+            self._builder.call(self._allocator.arena_exit(), [mark])
+
+    def _exit_arenas(self) -> None:
+        for mark in reversed(self._arena_marks):
+            self._builder.call(self._allocator.arena_exit(), [mark])
+
+    def _emit_coerced(self, expression: ExpressionNode, target: DataType) -> ir.Value:
+        if expression.data_type() is DataType.none_type():
+            # None only has a value as an empty Optional
+            return ir.Constant(ir_type_for(target), None)
+
+        if (
+            expression.data_type().name() == DataTypeName.INT
+            and target.name() == DataTypeName.FLOAT
+        ):
+            # Converted from the full width of a promoted expression, since
+            # only int values are truncated
+            return self._builder.sitofp(self._emit_int_operand(expression=expression), FLOAT32_T)
+
+        value: ir.Value = self._emit_expression(expression=expression)
+
+        return self._coerce(value=value, source=expression.data_type(), target=target)
+
+    def _coerce(self, value: ir.Value, source: DataType, target: DataType) -> ir.Value:
+        if source is target:
+            return value
+
+        if source.name() == DataTypeName.INT and target.name() == DataTypeName.FLOAT:
+            return self._builder.sitofp(value, FLOAT32_T)
+
+        if target.name() == DataTypeName.OPTIONAL and isinstance(
+            ir_type_for(target), ir.LiteralStructType
+        ):
+            value = self._coerce(value=value, source=source, target=target.parameters()[0])
+            optional = ir.Constant(ir_type_for(target), [ir.Constant(INT1_T, True), None])
+
+            return self._builder.insert_value(optional, value, 1)
+
+        return value
+
+    def _emit_expression(self, expression: ExpressionNode) -> ir.Value:
+        if expression.data_type() is None:
+            raise ValueError(f"Expression has not been type checked: {expression}")
+
+        if isinstance(expression, AtomNode):
+            return self._emit_atom(atom=expression)
+        elif isinstance(expression, BinaryOperationNode):
+            return self._emit_binary_operation(node=expression)
+        elif isinstance(expression, UnaryOperationNode):
+            return self._emit_unary_operation(node=expression)
+        elif isinstance(expression, FunctionCallNode):
+            return self._emit_function_call(call=expression)
+        elif isinstance(expression, FieldAccessNode):
+            return self._builder.extract_value(
+                self._emit_expression(expression=expression.value()),
+                expression.index(),
+                name=expression.name(),
+            )
+        elif isinstance(expression, ListLiteralNode):
+            return self._emit_list_literal(node=expression)
+        elif isinstance(expression, SubscriptNode):
+            return emit_list_get(
+                builder=self._builder,
+                header=self._emit_expression(expression=expression.value()),
+                index=self._builder.sext(
+                    self._emit_expression(expression=expression.index()), INT64_T
+                ),
+                element_type=ir_type_for(expression.data_type()),
+                flush=self._runtime.flush,
+            )
+
+        raise ValueError(f"Unsupported expression {expression}")
+
+    def _emit_atom(self, atom: AtomNode) -> ir.Value:
+        atom_type: AtomType = atom.atom_type()
+
+        if atom_type == AtomType.INT:
+            return ir.Constant(INT32_T, atom.int_value())
+        elif atom_type == AtomType.FLOAT:
+            return ir.Constant(FLOAT32_T, atom.float_value())
+        elif atom_type == AtomType.STR:
+            return self._module_generator.add_str_literal(atom.str_value())
+        elif atom_type == AtomType.IDENTIFIER:
+            if atom.name() in ("True", "False"):
+                return ir.Constant(INT1_T, atom.name() == "True")
+
+            if atom.name() in self._local_values:
+                return self._local_values[atom.name()]
+
+            slot: Optional[ir.Value] = self._local_variables.get(atom.name())
+
+            if slot is None:
+                slot = self._global_variables[atom.name()]
+
+            return self._builder.load(slot, name=atom.name())
+
+        raise ValueError(f"Unsupported atom {atom}")
+
+    def _emit_binary_operation(self, node: BinaryOperationNode) -> ir.Value:
+        operator: BinaryOperator = node.operator()
+
+        if operator.is_logical():
+            return self._emit_logical_operation(node=node)
+
+        left_type: DataType = node.left().data_type()
+        right_type: DataType = node.right().data_type()
+
+        # Operands are converted to the type of the result, or for
+        # comparisons to the wider operand type
+        if operator.is_comparison():
+            operand_type: DataType = (
+                right_type if right_type.name() == DataTypeName.FLOAT else left_type
+            )
+        else:
+            operand_type = node.data_type()
+
+        if operand_type.name() == DataTypeName.INT:
+            if operator.is_comparison():
+                return emit_int_comparison(
+                    builder=self._builder,
+                    operator=operator,
+                    left=self._emit_int_operand(expression=node.left()),
+                    right=self._emit_int_operand(expression=node.right()),
+                )
+
+            return self._narrow_int(value=self._emit_int_arithmetic(node=node))
+
+        left: ir.Value = self._emit_coerced(expression=node.left(), target=operand_type)
+        right: ir.Value = self._emit_coerced(expression=node.right(), target=operand_type)
+
+        if operand_type.name() == DataTypeName.FLOAT:
+            if operator.is_comparison():
+                return emit_float_comparison(
+                    builder=self._builder, operator=operator, left=left, right=right
+                )
+
+            return emit_float_arithmetic(
+                builder=self._builder, operator=operator, left=left, right=right
+            )
+        elif operand_type.name() == DataTypeName.BOOL and operator.is_comparison():
+            return emit_int_comparison(
+                builder=self._builder, operator=operator, left=left, right=right
+            )
+
+        raise ValueError(f"Unsupported operand type for {operator.value}: {operand_type}")
+
+    def _emit_int_arithmetic(self, node: BinaryOperationNode) -> ir.Value:
+        """
+        An int operation at the width of `_emit_int_operand`.
+        """
+        return emit_int_arithmetic(
+            builder=self._builder,
+            operator=node.operator(),
+            left=self._emit_int_operand(expression=node.left()),
+            right=self._emit_int_operand(expression=node.right()),
+            overflow_mode=self._overflow_mode,
+            flush=self._runtime.flush,
+        )
+
+    def _emit_int_operand(self, expression: ExpressionNode) -> ir.Value:
+        """
+        An int operand, extended to 64 bits when promoting so that whole
+        arithmetic expressions are computed without intermediate overflow.
+        """
+        if self._overflow_mode != OverflowMode.PROMOTE:
+            return self._emit_expression(expression=expression)
+
+        if isinstance(expression, BinaryOperationNode) and expression.operator().is_arithmetic():
+            return self._emit_int_arithmetic(node=expression)
+        elif (
+            isinstance(expression, UnaryOperationNode)
+            and expression.operator() == UnaryOperator.NEGATE
+        ):
+            return emit_int_negation(
+                builder=self._builder,
+                operand=self._emit_int_operand(expression=expression.operand()),
+                overflow_mode=self._overflow_mode,
+                flush=self._runtime.flush,
+            )
+
+        return self._builder.sext(self._emit_expression(expression=expression), INT64_T)
+
+    def _narrow_int(self, value: ir.Value) -> ir.Value:
+        if value.type == INT64_T:
+            return self._builder.trunc(value, INT32_T)
+
+        return value
+
+    def _emit_logical_operation(self, node: BinaryOperationNode) -> ir.Value:
+        # The right operand is only evaluated if the left one does not decide
+        # the result
+        is_and: bool = node.operator() == BinaryOperator.AND
+        left: ir.Value = self._emit_expression(expression=node.left())
+        left_block: ir.Block = self._builder.block
+        right_block: ir.Block = self._builder.append_basic_block(name=f"{node.operator().value}")
+        end_block: ir.Block = self._builder.append_basic_block(name=f"{node.operator().value}.end")
+
+        if is_and:
+            self._builder.cbranch(left, right_block, end_block)
+        else:
+            self._builder.cbranch(left, end_block, right_block)
+
+        self._builder.position_at_end(right_block)
+        right: ir.Value = self._emit_expression(expression=node.right())
+        right_end_block: ir.Block = self._builder.block
+        self._builder.branch(end_block)
+
+        self._builder.position_at_end(end_block)
+        result: ir.PhiInstr = self._builder.phi(INT1_T)
+        result.add_incoming(left, left_block)
+        result.add_incoming(right, right_end_block)
+
+        return result
+
+    def _emit_unary_operation(self, node: UnaryOperationNode) -> ir.Value:
+        if node.operator() == UnaryOperator.NOT:
+            return self._builder.not_(self._emit_expression(expression=node.operand()))
+
+        if node.data_type().name() == DataTypeName.FLOAT:
+            return self._builder.fneg(self._emit_expression(expression=node.operand()))
+
+        return self._narrow_int(
+            value=emit_int_negation(
+                builder=self._builder,
+                operand=self._emit_int_operand(expression=node.operand()),
+                overflow_mode=self._overflow_mode,
+                flush=self._runtime.flush,
+            )
+        )
+
+    def _emit_function_call(self, call: FunctionCallNode) -> ir.Value:
+        result: Optional[Any] = self._evaluate_call(call=call)
+
+        if result is not None:
+            return ir.Constant(ir_type_for(call.data_type()), result)
+
+        function_generator: Optional[FunctionCodeGenerator] = self._function_generators.get(
+            call.name()
+        )
+
+        if function_generator is None and call.data_type().struct_name() == call.name():
+            return self._emit_struct(call=call)
+
+        if function_generator is None and call.name() in ("len", "list.append"):
+            return self._emit_list_builtin(call=call)
+
+        if function_generator is None:
+            raise ValueError(f"Unsupported builtin function {call.name()}")
+
+        func_def: FunctionDefNode = self._function_defs[call.name()]
+        args: Sequence[ir.Value] = []
+
+        for i, param in enumerate(func_def.parameters()):
+            # Missing arguments take the parameter's default value
+            arg: ExpressionNode = (
+                call.arguments()[i] if i < len(call.arguments()) else param.default_value()
+            )
+            args.append(self._emit_coerced(expression=arg, target=param.data_type()))
+
+        return self._builder.call(function_generator.function(), args)
+
+    def _emit_struct(self, call: FunctionCallNode) -> ir.Value:
+        """
+        A struct built in registers from its field values, which is only
+        spilled to the stack if it is stored in a variable.
+        """
+        struct_type: DataType = call.data_type()
+        value: ir.Value = ir.Constant(ir_type_for(struct_type), ir.Undefined)
+
+        for i, (arg, field_type) in enumerate(zip(call.arguments(), struct_type.parameters())):
+            value = self._builder.insert_value(
+                value, self._emit_coerced(expression=arg, target=field_type), i
+            )
+
+        return value
+
+    def _emit_list_literal(self, node: ListLiteralNode) -> ir.Value:
+        element_type: DataType = node.data_type().parameters()[0]
+        element_ir_type: ir.Type = ir_type_for(element_type)
+        header: ir.Value = self._builder.call(
+            self._lists.new(element_ir_type, in_arena=node in self._arena_list_literals),
+            [ir.Constant(INT64_T, len(node.elements()))],
+        )
+
+        for element in node.elements():
+            self._builder.call(
+                self._lists.append(element_ir_type),
+                [header, self._emit_coerced(expression=element, target=element_type)],
+            )
+
+        return header
+
+    def _emit_list_builtin(self, call: FunctionCallNode) -> ir.Value:
+        list_type: DataType = call.arguments()[0].data_type()
+        header: ir.Value = self._emit_expression(expression=call.arguments()[0])
+
+        if call.name() == "len":
+            length: ir.Value = emit_list_length(builder=self._builder, header=header)
+
+            return self._builder.trunc(length, INT32_T)
+
+        # list.append
+        element_type: DataType = list_type.parameters()[0]
+
+        return self._builder.call(
+            self._lists.append(ir_type_for(element_type)),
+            [header, self._emit_coerced(expression=call.arguments()[1], target=element_type)],
+        )
@@ -0,0 +1,59 @@
+import ctypes
+from typing import Any, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from llvmlite import binding, ir
+
+from sidewinder.compiler_toolchain.codegen.types import FLOAT32_T, INT1_T, INT32_T
+
+_ir_type_to_ctype_mapping: Mapping[ir.Type, Any] = {
+    INT1_T: ctypes.c_bool,
+    INT32_T: ctypes.c_int32,
+    FLOAT32_T: ctypes.c_float,
+}
+
+
+class CompileTimeEvaluator:
+    """
+    Runs functions of a module at compile time with the llvmlite MCJIT. The
+    module IR is only parsed and compiled on the first call, and results are
+    memoized per function and arguments. Only functions that are known to be
+    pure and to terminate may be called.
+    """
+
+    def __init__(self, module_ir: str):
+        self._module_ir: str = module_ir
+        self._engine: Optional[binding.ExecutionEngine] = None
+        self._results: MutableMapping[Tuple[str, Tuple[Any, ...]], Any] = {}
+
+    def call(self, function: ir.Function, args: Sequence[Any]) -> Any:
+        key: Tuple[str, Tuple[Any, ...]] = (function.name, tuple(args))
+
+        if key not in self._results:
+            func_type: ir.FunctionType = function.function_type
+            cfunc_type = ctypes.CFUNCTYPE(
+                _ir_type_to_ctype_mapping[func_type.return_type],
+                *[_ir_type_to_ctype_mapping[arg_type] for arg_type in func_type.args],
+            )
+            cfunc = cfunc_type(self._execution_engine().get_function_address(function.name))
+            self._results[key] = cfunc(*args)
+
+        return self._results[key]
+
+    def _execution_engine(self) -> binding.ExecutionEngine:
+        if self._engine is None:
+            module_ref: binding.ModuleRef = binding.parse_assembly(self._module_ir)
+            module_ref.verify()
+
+            target_machine: binding.TargetMachine = (
+                binding.Target.from_default_triple().create_target_machine()
+            )
+            self._engine = binding.create_mcjit_compiler(module_ref, target_machine)
+            self._engine.finalize_object()
+
+        return self._engine
+
+
+def can_evaluate(function_type: ir.FunctionType) -> bool:
+    return function_type.return_type in _ir_type_to_ctype_mapping and all(
+        arg_type in _ir_type_to_ctype_mapping for arg_type in function_type.args
+    )
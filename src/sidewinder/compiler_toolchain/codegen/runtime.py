@@ -0,0 +1,1177 @@
+import math
+import struct
+from typing import Callable, MutableMapping, Optional, Sequence, Tuple
+
+from llvmlite import ir
+
+from sidewinder.compiler_toolchain.codegen.arithmetic import emit_trap
+from sidewinder.compiler_toolchain.codegen.types import (
+    FLOAT32_T,
+    FLOAT64_T,
+    INT1_T,
+    INT8_T,
+    INT32_T,
+    INT64_T,
+    LIST_BITS_PER_WORD,
+    LIST_CAPACITY,
+    LIST_DATA,
+    LIST_LENGTH,
+    PTR_T,
+    STR_DATA,
+    STR_LENGTH,
+    STR_T,
+    VOID_T,
+    list_header_type,
+    list_storage_type,
+)
+
+STDOUT_BUFFER_SIZE: int = 1 << 16
+ARENA_CHUNK_SIZE: int = 1 << 16
+# Freed blocks of these sizes are kept on free lists, larger ones go back
+# to malloc
+ALLOCATION_SIZE_CLASSES: Sequence[int] = (16, 32, 64, 128, 256, 512)
+# Capacity of the first buffer of a list, in elements. That of a list[bool]
+# is one word.
+LIST_INITIAL_CAPACITY: int = 8
+
+_STDOUT_FILENO: int = 1
+# Digits of the shortest float32 round trip are at most this many
+_MAX_FLOAT_PRECISION: int = 9
+# Floats whose decimal exponent is in [_MIN_FIXED_EXPONENT,
+# _MAX_FIXED_EXPONENT) are printed in fixed notation, like Python's repr()
+_MIN_FIXED_EXPONENT: int = -4
+_MAX_FIXED_EXPONENT: int = 16
+# "-2147483648"
+_MAX_INT_LENGTH: int = 11
+
+# Every block is preceded by a header holding its size class or one of the
+# tags below, sized so that blocks stay 16-byte aligned
+_BLOCK_HEADER_SIZE: int = 16
+_LARGE_BLOCK_TAG: int = -1
+# Arena blocks are tagged with this minus the depth of their arena, which is
+# at least 1, so that no block has the tag computed outside of arenas
+_ARENA_BLOCK_TAG: int = -2
+
+_FNV_OFFSET_BASIS: int = 0xCBF29CE484222325
+_FNV_PRIME: int = 0x100000001B3
+
+_CHAR_PTR_T: ir.Type = PTR_T(INT8_T)
+# Arena state saved by __sw_arena_enter: current chunk, top and limit
+_ARENA_MARK_T: ir.Type = ir.LiteralStructType([_CHAR_PTR_T, _CHAR_PTR_T, _CHAR_PTR_T])
+
+
+def format_float(value: float) -> str:
+    """
+    The text __sw_print_float writes for `value`, laid out as Python's repr():
+    the fewest digits that read back as the same float32, in fixed notation
+    when 1e-4 <= |value| < 1e16 and in exponent notation otherwise.
+    """
+    try:
+        value = struct.unpack("f", struct.pack("f", value))[0]
+    except OverflowError:
+        value = math.copysign(math.inf, value)
+
+    if math.isnan(value):
+        return "nan"
+    elif math.isinf(value):
+        return "inf" if value > 0 else "-inf"
+
+    text: str = ""
+
+    for precision in range(1, _MAX_FLOAT_PRECISION + 1):
+        text = "%.*e" % (precision - 1, value)
+
+        if struct.unpack("f", struct.pack("f", float(text)))[0] == value:
+            break
+
+    mantissa, exponent_text = text.split("e")
+    exponent: int = int(exponent_text)
+
+    if not _MIN_FIXED_EXPONENT <= exponent < _MAX_FIXED_EXPONENT:
+        return text
+
+    sign: str = "-" if mantissa.startswith("-") else ""
+    digits: str = mantissa.lstrip("-").replace(".", "")
+    # Digit i is worth 10 ** (exponent - i), missing ones are zeros
+    places: range = range(max(exponent, 0), min(exponent - len(digits) + 1, -1) - 1, -1)
+
+    return sign + "".join(
+        (digits[exponent - place] if 0 <= exponent - place < len(digits) else "0")
+        + ("." if place == 0 else "")
+        for place in places
+    )
+
+
+def format_value(value: object) -> str:
+    """
+    The text printed for a constant argument of print(), as the runtime
+    formats it.
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return str(value)
+    elif isinstance(value, float):
+        return format_float(value)
+
+    raise ValueError(f"Unsupported print argument {value!r}")
+
+
+def str_hash(value: str) -> int:
+    """
+    64-bit FNV-1a of the UTF-8 bytes of `value`, never 0, as HashBytes() in
+    the C++ runtime computes it.
+    """
+    result: int = _FNV_OFFSET_BASIS
+
+    for byte in value.encode("utf-8"):
+        result = ((result ^ byte) * _FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+
+    return result or 1
+
+
+class Runtime:
+    """
+    Routines and state emitted into the module being generated, with
+    internal linkage. Routines are only defined once they are first
+    requested.
+    """
+
+    def __init__(self, module: ir.Module):
+        self._module: ir.Module = module
+        self._functions: MutableMapping[str, ir.Function] = {}
+        self._globals: MutableMapping[str, ir.GlobalVariable] = {}
+
+    def is_used(self) -> bool:
+        return bool(self._functions)
+
+    def _function(
+        self,
+        name: str,
+        func_type: ir.FunctionType,
+        define: Callable[[ir.Function], None],
+    ) -> ir.Function:
+        function: Optional[ir.Function] = self._functions.get(name)
+
+        if function is None:
+            function = ir.Function(self._module, func_type, name=name)
+            function.linkage = "internal"
+            self._functions[name] = function
+            define(function)
+
+        return function
+
+    def _libc(self, name: str, func_type: ir.FunctionType) -> ir.Function:
+        function: Optional[ir.GlobalValue] = self._module.globals.get(name)
+
+        if function is None:
+            function = ir.Function(self._module, func_type, name=name)
+
+        return function
+
+    def _global(self, name: str, ir_type: ir.Type, initializer: ir.Constant) -> ir.GlobalVariable:
+        global_var: Optional[ir.GlobalVariable] = self._globals.get(name)
+
+        if global_var is None:
+            global_var = ir.GlobalVariable(self._module, ir_type, name=name)
+            global_var.linkage = "internal"
+            global_var.initializer = initializer
+            self._globals[name] = global_var
+
+        return global_var
+
+
+class StdoutRuntime(Runtime):
+    """
+    Buffered stdout for print(). Values are formatted by typed routines that
+    write into a module-owned buffer of STDOUT_BUFFER_SIZE bytes, which is
+    flushed when it is full, at the end of every line if stdout is a TTY,
+    and when main() returns.
+    """
+
+    def write(self) -> ir.Function:
+        """
+        void __sw_stdout_write(i8* data, i64 size)
+        """
+        return self._function(
+            name="__sw_stdout_write",
+            func_type=ir.FunctionType(VOID_T, [_CHAR_PTR_T, INT64_T]),
+            define=self._define_write,
+        )
+
+    def end_line(self) -> ir.Function:
+        """
+        void __sw_stdout_end_line(), called after a line has been written
+        """
+        return self._function(
+            name="__sw_stdout_end_line",
+            func_type=ir.FunctionType(VOID_T, []),
+            define=self._define_end_line,
+        )
+
+    def flush(self) -> ir.Function:
+        return self._function(
+            name="__sw_stdout_flush",
+            func_type=ir.FunctionType(VOID_T, []),
+            define=self._define_flush,
+        )
+
+    def print_int(self) -> ir.Function:
+        return self._function(
+            name="__sw_print_int",
+            func_type=ir.FunctionType(VOID_T, [INT32_T]),
+            define=self._define_print_int,
+        )
+
+    def print_float(self) -> ir.Function:
+        return self._function(
+            name="__sw_print_float",
+            func_type=ir.FunctionType(VOID_T, [FLOAT32_T]),
+            define=self._define_print_float,
+        )
+
+    def print_bool(self) -> ir.Function:
+        return self._function(
+            name="__sw_print_bool",
+            func_type=ir.FunctionType(VOID_T, [INT1_T]),
+            define=self._define_print_bool,
+        )
+
+    def print_str(self) -> ir.Function:
+        return self._function(
+            name="__sw_print_str",
+            func_type=ir.FunctionType(VOID_T, [STR_T]),
+            define=self._define_print_str,
+        )
+
+    def _buffer(self) -> ir.GlobalVariable:
+        buffer_type = ir.ArrayType(INT8_T, STDOUT_BUFFER_SIZE)
+
+        return self._global(
+            name="__sw_stdout_buffer",
+            ir_type=buffer_type,
+            initializer=ir.Constant(buffer_type, None),
+        )
+
+    def _length(self) -> ir.GlobalVariable:
+        return self._global(
+            name="__sw_stdout_length", ir_type=INT64_T, initializer=ir.Constant(INT64_T, 0)
+        )
+
+    def _string(self, name: str, value: str) -> ir.Value:
+        data = bytearray(value.encode("utf-8") + b"\0")
+        string_type = ir.ArrayType(INT8_T, len(data))
+        global_var: ir.GlobalVariable = self._global(
+            name=name, ir_type=string_type, initializer=ir.Constant(string_type, data)
+        )
+        global_var.global_constant = True
+        global_var.unnamed_addr = True
+
+        return global_var.gep([ir.Constant(INT32_T, 0), ir.Constant(INT32_T, 0)])
+
+    def _write_all(self) -> ir.Function:
+        """
+        void __sw_write_all(i8* data, i64 size), retrying partial writes and
+        giving up on errors
+        """
+        return self._function(
+            name="__sw_write_all",
+            func_type=ir.FunctionType(VOID_T, [_CHAR_PTR_T, INT64_T]),
+            define=self._define_write_all,
+        )
+
+    def _define_write_all(self, function: ir.Function) -> None:
+        libc_write: ir.Function = self._libc(
+            name="write", func_type=ir.FunctionType(INT64_T, [INT32_T, _CHAR_PTR_T, INT64_T])
+        )
+        data, size = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        loop: ir.Block = function.append_basic_block(name="loop")
+        done: ir.Block = function.append_basic_block(name="done")
+        builder = ir.IRBuilder(entry)
+        builder.cbranch(builder.icmp_signed(">", size, ir.Constant(INT64_T, 0)), loop, done)
+
+        builder.position_at_end(loop)
+        offset: ir.PhiInstr = builder.phi(INT64_T)
+        written: ir.Value = builder.call(
+            libc_write,
+            [
+                ir.Constant(INT32_T, _STDOUT_FILENO),
+                builder.gep(data, [offset]),
+                builder.sub(size, offset),
+            ],
+        )
+        next_offset: ir.Value = builder.add(offset, written)
+        offset.add_incoming(ir.Constant(INT64_T, 0), entry)
+        offset.add_incoming(next_offset, loop)
+        builder.cbranch(
+            builder.and_(
+                builder.icmp_signed(">", written, ir.Constant(INT64_T, 0)),
+                builder.icmp_signed("<", next_offset, size),
+            ),
+            loop,
+            done,
+        )
+
+        builder.position_at_end(done)
+        builder.ret_void()
+
+    def _define_flush(self, function: ir.Function) -> None:
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+        length: ir.Value = builder.load(self._length())
+
+        with builder.if_then(builder.icmp_unsigned("!=", length, ir.Constant(INT64_T, 0))):
+            builder.call(
+                self._write_all(),
+                [self._buffer().gep([ir.Constant(INT32_T, 0), ir.Constant(INT32_T, 0)]), length],
+            )
+            builder.store(ir.Constant(INT64_T, 0), self._length())
+
+        builder.ret_void()
+
+    def _define_write(self, function: ir.Function) -> None:
+        memcpy: ir.Function = self._module.declare_intrinsic(
+            "llvm.memcpy", [_CHAR_PTR_T, _CHAR_PTR_T, INT64_T]
+        )
+        capacity = ir.Constant(INT64_T, STDOUT_BUFFER_SIZE)
+        data, size = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        full: ir.Block = function.append_basic_block(name="full")
+        direct: ir.Block = function.append_basic_block(name="direct")
+        copy: ir.Block = function.append_basic_block(name="copy")
+        builder = ir.IRBuilder(entry)
+        length: ir.Value = builder.load(self._length())
+        fits: ir.Value = builder.icmp_unsigned("<=", builder.add(length, size), capacity)
+        builder.cbranch(fits, copy, full)
+
+        # Make room, and write what can never fit straight through
+        builder.position_at_end(full)
+        builder.call(self.flush(), [])
+        builder.cbranch(builder.icmp_unsigned(">", size, capacity), direct, copy)
+
+        builder.position_at_end(direct)
+        builder.call(self._write_all(), [data, size])
+        builder.ret_void()
+
+        builder.position_at_end(copy)
+        offset: ir.Value = builder.load(self._length())
+        destination: ir.Value = builder.gep(self._buffer(), [ir.Constant(INT64_T, 0), offset])
+        builder.call(memcpy, [destination, data, size, ir.Constant(INT1_T, False)])
+        builder.store(builder.add(offset, size), self._length())
+        builder.ret_void()
+
+    def _define_end_line(self, function: ir.Function) -> None:
+        isatty: ir.Function = self._libc(
+            name="isatty", func_type=ir.FunctionType(INT32_T, [INT32_T])
+        )
+        # -1 until stdout has been checked
+        is_tty: ir.GlobalVariable = self._global(
+            name="__sw_stdout_is_tty", ir_type=INT8_T, initializer=ir.Constant(INT8_T, -1)
+        )
+
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+
+        with builder.if_then(
+            builder.icmp_signed("<", builder.load(is_tty), ir.Constant(INT8_T, 0)), likely=False
+        ):
+            result: ir.Value = builder.call(isatty, [ir.Constant(INT32_T, _STDOUT_FILENO)])
+            builder.store(
+                builder.zext(builder.icmp_signed("!=", result, ir.Constant(INT32_T, 0)), INT8_T),
+                is_tty,
+            )
+
+        with builder.if_then(
+            builder.icmp_signed(">", builder.load(is_tty), ir.Constant(INT8_T, 0))
+        ):
+            builder.call(self.flush(), [])
+
+        builder.ret_void()
+
+    def _define_print_int(self, function: ir.Function) -> None:
+        # Digits are written backwards from the end of a stack buffer
+        buffer_type = ir.ArrayType(INT8_T, _MAX_INT_LENGTH)
+        end = ir.Constant(INT64_T, _MAX_INT_LENGTH)
+        ten = ir.Constant(INT64_T, 10)
+        (value,) = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        digits: ir.Block = function.append_basic_block(name="digits")
+        done: ir.Block = function.append_basic_block(name="done")
+        builder = ir.IRBuilder(entry)
+        buffer: ir.Value = builder.alloca(buffer_type)
+        is_negative: ir.Value = builder.icmp_signed("<", value, ir.Constant(INT32_T, 0))
+        wide: ir.Value = builder.sext(value, INT64_T)
+        magnitude: ir.Value = builder.select(is_negative, builder.neg(wide), wide)
+        builder.branch(digits)
+
+        builder.position_at_end(digits)
+        position: ir.PhiInstr = builder.phi(INT64_T)
+        remaining: ir.PhiInstr = builder.phi(INT64_T)
+        digit_position: ir.Value = builder.sub(position, ir.Constant(INT64_T, 1))
+        digit: ir.Value = builder.trunc(builder.urem(remaining, ten), INT8_T)
+        builder.store(
+            builder.add(digit, ir.Constant(INT8_T, ord("0"))),
+            builder.gep(buffer, [ir.Constant(INT64_T, 0), digit_position]),
+        )
+        quotient: ir.Value = builder.udiv(remaining, ten)
+        position.add_incoming(end, entry)
+        position.add_incoming(digit_position, digits)
+        remaining.add_incoming(magnitude, entry)
+        remaining.add_incoming(quotient, digits)
+        builder.cbranch(
+            builder.icmp_unsigned("==", quotient, ir.Constant(INT64_T, 0)), done, digits
+        )
+
+        builder.position_at_end(done)
+        # The sign goes before the digits, and is only written out when negative
+        sign_position: ir.Value = builder.sub(digit_position, ir.Constant(INT64_T, 1))
+        builder.store(
+            ir.Constant(INT8_T, ord("-")),
+            builder.gep(buffer, [ir.Constant(INT64_T, 0), sign_position]),
+        )
+        start: ir.Value = builder.select(is_negative, sign_position, digit_position)
+        builder.call(
+            self.write(),
+            [builder.gep(buffer, [ir.Constant(INT64_T, 0), start]), builder.sub(end, start)],
+        )
+        builder.ret_void()
+
+    def _define_print_float(self, function: ir.Function) -> None:
+        # See format_float(), which must produce the same text
+        snprintf: ir.Function = self._libc(
+            name="snprintf",
+            func_type=ir.FunctionType(INT32_T, [_CHAR_PTR_T, INT64_T, _CHAR_PTR_T], var_arg=True),
+        )
+        strtof: ir.Function = self._libc(
+            name="strtof", func_type=ir.FunctionType(FLOAT32_T, [_CHAR_PTR_T, PTR_T(_CHAR_PTR_T)])
+        )
+        strtol: ir.Function = self._libc(
+            name="strtol",
+            func_type=ir.FunctionType(INT64_T, [_CHAR_PTR_T, PTR_T(_CHAR_PTR_T), INT32_T]),
+        )
+        fabs: ir.Function = self._module.declare_intrinsic("llvm.fabs", [FLOAT32_T])
+        buffer_size: int = 32
+        buffer_type = ir.ArrayType(INT8_T, buffer_size)
+        zero = ir.Constant(INT64_T, 0)
+        one = ir.Constant(INT64_T, 1)
+        (value,) = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        not_nan: ir.Block = function.append_basic_block(name="not_nan")
+        nan: ir.Block = function.append_basic_block(name="nan")
+        infinite: ir.Block = function.append_basic_block(name="infinite")
+        loop: ir.Block = function.append_basic_block(name="loop")
+        done: ir.Block = function.append_basic_block(name="done")
+        exponent_form: ir.Block = function.append_basic_block(name="exponent_form")
+        places: ir.Block = function.append_basic_block(name="places")
+        fixed_done: ir.Block = function.append_basic_block(name="fixed_done")
+        builder = ir.IRBuilder(entry)
+        buffer: ir.Value = builder.gep(
+            builder.alloca(buffer_type), [ir.Constant(INT32_T, 0), ir.Constant(INT32_T, 0)]
+        )
+        output: ir.Value = builder.gep(
+            builder.alloca(buffer_type), [ir.Constant(INT32_T, 0), ir.Constant(INT32_T, 0)]
+        )
+        double: ir.Value = builder.fpext(value, FLOAT64_T)
+        builder.cbranch(builder.fcmp_unordered("uno", value, value), nan, not_nan)
+
+        builder.position_at_end(nan)
+        builder.call(
+            self.write(),
+            [self._string(name="__sw_float_nan", value="nan"), ir.Constant(INT64_T, 3)],
+        )
+        builder.ret_void()
+
+        builder.position_at_end(not_nan)
+        builder.cbranch(
+            builder.fcmp_ordered(
+                "==", builder.call(fabs, [value]), ir.Constant(FLOAT32_T, math.inf)
+            ),
+            infinite,
+            loop,
+        )
+
+        builder.position_at_end(infinite)
+        is_positive: ir.Value = builder.fcmp_ordered(">", value, ir.Constant(FLOAT32_T, 0))
+        builder.call(
+            self.write(),
+            [
+                builder.select(
+                    is_positive,
+                    self._string(name="__sw_float_inf", value="inf"),
+                    self._string(name="__sw_float_negative_inf", value="-inf"),
+                ),
+                builder.select(is_positive, ir.Constant(INT64_T, 3), ir.Constant(INT64_T, 4)),
+            ],
+        )
+        builder.ret_void()
+
+        # Find the fewest significant digits that read back as the same value
+        builder.position_at_end(loop)
+        precision: ir.PhiInstr = builder.phi(INT32_T)
+        length: ir.Value = builder.call(
+            snprintf,
+            [
+                buffer,
+                ir.Constant(INT64_T, buffer_size),
+                self._string(name="__sw_float_format", value="%.*e"),
+                builder.sub(precision, ir.Constant(INT32_T, 1)),
+                double,
+            ],
+        )
+        read_back: ir.Value = builder.call(strtof, [buffer, ir.Constant(PTR_T(_CHAR_PTR_T), None)])
+        precision.add_incoming(ir.Constant(INT32_T, 1), not_nan)
+        precision.add_incoming(builder.add(precision, ir.Constant(INT32_T, 1)), loop)
+        builder.cbranch(
+            builder.or_(
+                builder.fcmp_ordered("==", read_back, value),
+                builder.icmp_signed(">=", precision, ir.Constant(INT32_T, _MAX_FLOAT_PRECISION)),
+            ),
+            done,
+            loop,
+        )
+
+        # The buffer holds [-]d[.ddd]e(+|-)dd, with as many digits as the precision
+        builder.position_at_end(done)
+        digit_count: ir.Value = builder.sext(precision, INT64_T)
+        sign: ir.Value = builder.zext(
+            builder.icmp_signed("==", builder.load(buffer), ir.Constant(INT8_T, ord("-"))),
+            INT64_T,
+        )
+        exponent_position: ir.Value = builder.add(
+            builder.add(sign, one),
+            builder.select(builder.icmp_signed(">", digit_count, one), digit_count, zero),
+        )
+        exponent: ir.Value = builder.call(
+            strtol,
+            [
+                builder.gep(buffer, [builder.add(exponent_position, one)]),
+                ir.Constant(PTR_T(_CHAR_PTR_T), None),
+                ir.Constant(INT32_T, 10),
+            ],
+        )
+        is_fixed: ir.Value = builder.and_(
+            builder.icmp_signed(">=", exponent, ir.Constant(INT64_T, _MIN_FIXED_EXPONENT)),
+            builder.icmp_signed("<", exponent, ir.Constant(INT64_T, _MAX_FIXED_EXPONENT)),
+        )
+        builder.store(ir.Constant(INT8_T, ord("-")), output)
+        highest_place: ir.Value = builder.select(
+            builder.icmp_signed(">", exponent, zero), exponent, zero
+        )
+        last_digit_place: ir.Value = builder.add(builder.sub(exponent, digit_count), one)
+        lowest_place: ir.Value = builder.select(
+            builder.icmp_signed("<", last_digit_place, ir.Constant(INT64_T, -1)),
+            last_digit_place,
+            ir.Constant(INT64_T, -1),
+        )
+        builder.cbranch(is_fixed, places, exponent_form)
+
+        builder.position_at_end(exponent_form)
+        builder.call(self.write(), [buffer, builder.sext(length, INT64_T)])
+        builder.ret_void()
+
+        # Lay the digits out from the highest place down, as in Python's repr():
+        # digit i is worth 10 ** (exponent - i), and missing ones are zeros
+        builder.position_at_end(places)
+        place: ir.PhiInstr = builder.phi(INT64_T)
+        position: ir.PhiInstr = builder.phi(INT64_T)
+        digit_index: ir.Value = builder.sub(exponent, place)
+        is_digit: ir.Value = builder.and_(
+            builder.icmp_signed(">=", digit_index, zero),
+            builder.icmp_signed("<", digit_index, digit_count),
+        )
+        # The first digit is followed by the decimal point
+        digit_position: ir.Value = builder.add(
+            builder.add(sign, digit_index),
+            builder.zext(builder.icmp_signed(">", digit_index, zero), INT64_T),
+        )
+        digit: ir.Value = builder.load(
+            builder.gep(buffer, [builder.select(is_digit, digit_position, zero)])
+        )
+        builder.store(
+            builder.select(is_digit, digit, ir.Constant(INT8_T, ord("0"))),
+            builder.gep(output, [position]),
+        )
+        after_digit: ir.Value = builder.add(position, one)
+        # Overwritten by the next digit unless this one is the units
+        builder.store(ir.Constant(INT8_T, ord(".")), builder.gep(output, [after_digit]))
+        next_position: ir.Value = builder.add(
+            after_digit, builder.zext(builder.icmp_signed("==", place, zero), INT64_T)
+        )
+        place.add_incoming(highest_place, done)
+        place.add_incoming(builder.sub(place, one), places)
+        position.add_incoming(sign, done)
+        position.add_incoming(next_position, places)
+        builder.cbranch(builder.icmp_signed("==", place, lowest_place), fixed_done, places)
+
+        builder.position_at_end(fixed_done)
+        builder.call(self.write(), [output, next_position])
+        builder.ret_void()
+
+    def _define_print_bool(self, function: ir.Function) -> None:
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+        (value,) = function.args
+        builder.call(
+            self.write(),
+            [
+                builder.select(
+                    value,
+                    self._string(name="__sw_true", value="True"),
+                    self._string(name="__sw_false", value="False"),
+                ),
+                builder.select(value, ir.Constant(INT64_T, 4), ir.Constant(INT64_T, 5)),
+            ],
+        )
+        builder.ret_void()
+
+    def _define_print_str(self, function: ir.Function) -> None:
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+        (value,) = function.args
+        zero = ir.Constant(INT32_T, 0)
+        # The length is in the header, so there is no need to scan for the NUL
+        length: ir.Value = builder.load(
+            builder.gep(value, [zero, ir.Constant(INT32_T, STR_LENGTH)])
+        )
+        data: ir.Value = builder.gep(value, [zero, ir.Constant(INT32_T, STR_DATA), zero])
+        builder.call(self.write(), [data, length])
+        builder.ret_void()
+
+
+class AllocatorRuntime(Runtime):
+    """
+    Allocation for objects of the generated code. Blocks of up to the largest
+    of ALLOCATION_SIZE_CLASSES bytes are recycled through per-class free
+    lists, larger blocks come from malloc. Between __sw_arena_enter and
+    __sw_arena_exit, which lower `with arena():`, blocks that cannot outlive
+    the arena can instead be bump-allocated from ARENA_CHUNK_SIZE chunks that
+    are all freed at once on exit, and freeing them individually does
+    nothing. The runtime is single-threaded, like the rest of the generated
+    code.
+    """
+
+    def allocate(self) -> ir.Function:
+        """
+        i8* __sw_alloc(i64 size)
+        """
+        return self._function(
+            name="__sw_alloc",
+            func_type=ir.FunctionType(_CHAR_PTR_T, [INT64_T]),
+            define=self._define_allocate,
+        )
+
+    def release(self) -> ir.Function:
+        """
+        void __sw_free(i8* block), for blocks of __sw_alloc or null
+        """
+        return self._function(
+            name="__sw_free",
+            func_type=ir.FunctionType(VOID_T, [_CHAR_PTR_T]),
+            define=self._define_release,
+        )
+
+    def allocate_in_arena(self) -> ir.Function:
+        """
+        i8* __sw_alloc_in_arena(i64 size), from the innermost arena, which must
+        have been entered
+        """
+        return self._function(
+            name="__sw_alloc_in_arena",
+            func_type=ir.FunctionType(_CHAR_PTR_T, [INT64_T]),
+            define=self._define_allocate_in_arena,
+        )
+
+    def allocate_like(self) -> ir.Function:
+        """
+        i8* __sw_alloc_like(i8* block, i64 size), from the arena of `block` if
+        it is the innermost one, and like __sw_alloc otherwise
+        """
+        return self._function(
+            name="__sw_alloc_like",
+            func_type=ir.FunctionType(_CHAR_PTR_T, [_CHAR_PTR_T, INT64_T]),
+            define=self._define_allocate_like,
+        )
+
+    def arena_enter(self) -> ir.Function:
+        """
+        mark __sw_arena_enter(), whose result is passed to the matching exit
+        """
+        return self._function(
+            name="__sw_arena_enter",
+            func_type=ir.FunctionType(_ARENA_MARK_T, []),
+            define=self._define_arena_enter,
+        )
+
+    def arena_exit(self) -> ir.Function:
+        """
+        void __sw_arena_exit(mark), freeing what was allocated since the mark
+        """
+        return self._function(
+            name="__sw_arena_exit",
+            func_type=ir.FunctionType(VOID_T, [_ARENA_MARK_T]),
+            define=self._define_arena_exit,
+        )
+
+    def _free_lists(self) -> ir.GlobalVariable:
+        lists_type = ir.ArrayType(_CHAR_PTR_T, len(ALLOCATION_SIZE_CLASSES))
+
+        return self._global(
+            name="__sw_free_lists", ir_type=lists_type, initializer=ir.Constant(lists_type, None)
+        )
+
+    def _arena_depth(self) -> ir.GlobalVariable:
+        return self._global(
+            name="__sw_arena_depth", ir_type=INT32_T, initializer=ir.Constant(INT32_T, 0)
+        )
+
+    def _arena_pointer(self, name: str) -> ir.GlobalVariable:
+        # The chunk being allocated from, and its free range [top, limit)
+        return self._global(
+            name=f"__sw_arena_{name}",
+            ir_type=_CHAR_PTR_T,
+            initializer=ir.Constant(_CHAR_PTR_T, None),
+        )
+
+    def _malloc(self) -> ir.Function:
+        return self._libc(name="malloc", func_type=ir.FunctionType(_CHAR_PTR_T, [INT64_T]))
+
+    def _free(self) -> ir.Function:
+        return self._libc(name="free", func_type=ir.FunctionType(VOID_T, [_CHAR_PTR_T]))
+
+    def _tag_block(self, builder: ir.IRBuilder, block: ir.Value, tag: ir.Value) -> ir.Value:
+        builder.store(tag, builder.bitcast(block, PTR_T(INT64_T)))
+
+        return builder.gep(block, [ir.Constant(INT64_T, _BLOCK_HEADER_SIZE)])
+
+    def _define_allocate(self, function: ir.Function) -> None:
+        header_size = ir.Constant(INT64_T, _BLOCK_HEADER_SIZE)
+        (size,) = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        small: ir.Block = function.append_basic_block(name="small")
+        reuse: ir.Block = function.append_basic_block(name="reuse")
+        refill: ir.Block = function.append_basic_block(name="refill")
+        large: ir.Block = function.append_basic_block(name="large")
+        builder = ir.IRBuilder(entry)
+        largest = ir.Constant(INT64_T, ALLOCATION_SIZE_CLASSES[-1])
+        builder.cbranch(builder.icmp_unsigned("<=", size, largest), small, large)
+
+        # The class of a size is ceil(log2(size)) - log2(smallest class),
+        # or 0 for sizes up to the smallest class
+        builder.position_at_end(small)
+        smallest: int = ALLOCATION_SIZE_CLASSES[0]
+        nonzero: ir.Value = builder.select(
+            builder.icmp_unsigned("==", size, ir.Constant(INT64_T, 0)),
+            ir.Constant(INT64_T, 1),
+            size,
+        )
+        rounded: ir.Value = builder.or_(
+            builder.sub(nonzero, ir.Constant(INT64_T, 1)), ir.Constant(INT64_T, smallest - 1)
+        )
+        index: ir.Value = builder.sub(
+            ir.Constant(INT64_T, 64 - (smallest.bit_length() - 1)),
+            builder.ctlz(rounded, ir.Constant(INT1_T, False)),
+        )
+        head_slot: ir.Value = builder.gep(self._free_lists(), [ir.Constant(INT64_T, 0), index])
+        head: ir.Value = builder.load(head_slot)
+        builder.cbranch(
+            builder.icmp_unsigned("==", head, ir.Constant(_CHAR_PTR_T, None)), refill, reuse
+        )
+
+        # Free blocks hold the next free block of their class, and keep their tag
+        builder.position_at_end(reuse)
+        builder.store(builder.load(builder.bitcast(head, PTR_T(_CHAR_PTR_T))), head_slot)
+        builder.ret(head)
+
+        builder.position_at_end(refill)
+        class_size: ir.Value = builder.shl(ir.Constant(INT64_T, smallest), index)
+        block: ir.Value = builder.call(self._malloc(), [builder.add(class_size, header_size)])
+        builder.ret(self._tag_block(builder, block, index))
+
+        builder.position_at_end(large)
+        block = builder.call(self._malloc(), [builder.add(size, header_size)])
+        builder.ret(self._tag_block(builder, block, ir.Constant(INT64_T, _LARGE_BLOCK_TAG)))
+
+    def _arena_tag(self, builder: ir.IRBuilder) -> ir.Value:
+        # That of blocks of the innermost arena
+        depth: ir.Value = builder.sext(builder.load(self._arena_depth()), INT64_T)
+
+        return builder.sub(ir.Constant(INT64_T, _ARENA_BLOCK_TAG), depth)
+
+    def _define_allocate_in_arena(self, function: ir.Function) -> None:
+        header_size = ir.Constant(INT64_T, _BLOCK_HEADER_SIZE)
+        (size,) = function.args
+
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+        block: ir.Value = builder.call(self._arena_allocate(), [builder.add(size, header_size)])
+        builder.ret(self._tag_block(builder, block, self._arena_tag(builder)))
+
+    def _define_allocate_like(self, function: ir.Function) -> None:
+        payload, size = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        arena: ir.Block = function.append_basic_block(name="arena")
+        pooled: ir.Block = function.append_basic_block(name="pooled")
+        builder = ir.IRBuilder(entry)
+        block: ir.Value = builder.gep(payload, [ir.Constant(INT64_T, -_BLOCK_HEADER_SIZE)])
+        tag: ir.Value = builder.load(builder.bitcast(block, PTR_T(INT64_T)))
+        # Blocks of outer arenas cannot be allocated from, and outlive the
+        # innermost one
+        builder.cbranch(builder.icmp_signed("==", tag, self._arena_tag(builder)), arena, pooled)
+
+        builder.position_at_end(arena)
+        builder.ret(builder.call(self.allocate_in_arena(), [size]))
+
+        builder.position_at_end(pooled)
+        builder.ret(builder.call(self.allocate(), [size]))
+
+    def _define_release(self, function: ir.Function) -> None:
+        (payload,) = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        tagged: ir.Block = function.append_basic_block(name="tagged")
+        pooled: ir.Block = function.append_basic_block(name="pooled")
+        unpooled: ir.Block = function.append_basic_block(name="unpooled")
+        large: ir.Block = function.append_basic_block(name="large")
+        done: ir.Block = function.append_basic_block(name="done")
+        builder = ir.IRBuilder(entry)
+        builder.cbranch(
+            builder.icmp_unsigned("==", payload, ir.Constant(_CHAR_PTR_T, None)), done, tagged
+        )
+
+        builder.position_at_end(tagged)
+        block: ir.Value = builder.gep(payload, [ir.Constant(INT64_T, -_BLOCK_HEADER_SIZE)])
+        tag: ir.Value = builder.load(builder.bitcast(block, PTR_T(INT64_T)))
+        builder.cbranch(builder.icmp_signed(">=", tag, ir.Constant(INT64_T, 0)), pooled, unpooled)
+
+        builder.position_at_end(pooled)
+        head_slot: ir.Value = builder.gep(self._free_lists(), [ir.Constant(INT64_T, 0), tag])
+        builder.store(builder.load(head_slot), builder.bitcast(payload, PTR_T(_CHAR_PTR_T)))
+        builder.store(payload, head_slot)
+        builder.ret_void()
+
+        # Arena blocks are freed with their chunk
+        builder.position_at_end(unpooled)
+        builder.cbranch(
+            builder.icmp_signed("==", tag, ir.Constant(INT64_T, _LARGE_BLOCK_TAG)), large, done
+        )
+
+        builder.position_at_end(large)
+        builder.call(self._free(), [block])
+        builder.ret_void()
+
+        builder.position_at_end(done)
+        builder.ret_void()
+
+    def _arena_allocate(self) -> ir.Function:
+        """
+        i8* __sw_arena_alloc(i64 size), bumping the top of the current chunk
+        """
+        return self._function(
+            name="__sw_arena_alloc",
+            func_type=ir.FunctionType(_CHAR_PTR_T, [INT64_T]),
+            define=self._define_arena_allocate,
+        )
+
+    def _define_arena_allocate(self, function: ir.Function) -> None:
+        alignment: int = _BLOCK_HEADER_SIZE
+        (size,) = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        bump: ir.Block = function.append_basic_block(name="bump")
+        grow: ir.Block = function.append_basic_block(name="grow")
+        builder = ir.IRBuilder(entry)
+        aligned: ir.Value = builder.and_(
+            builder.add(size, ir.Constant(INT64_T, alignment - 1)),
+            ir.Constant(INT64_T, -alignment),
+        )
+        top: ir.Value = builder.load(self._arena_pointer(name="top"))
+        limit: ir.Value = builder.load(self._arena_pointer(name="limit"))
+        # Without a chunk, top and limit are null and nothing fits
+        available: ir.Value = builder.sub(
+            builder.ptrtoint(limit, INT64_T), builder.ptrtoint(top, INT64_T)
+        )
+        builder.cbranch(builder.icmp_unsigned("<=", aligned, available), bump, grow)
+
+        builder.position_at_end(bump)
+        builder.store(builder.gep(top, [aligned]), self._arena_pointer(name="top"))
+        builder.ret(top)
+
+        # Chunks start with a pointer to the previous one, in a header that
+        # keeps blocks aligned
+        builder.position_at_end(grow)
+        needed: ir.Value = builder.add(aligned, ir.Constant(INT64_T, alignment))
+        capacity: ir.Value = builder.select(
+            builder.icmp_unsigned(">", needed, ir.Constant(INT64_T, ARENA_CHUNK_SIZE)),
+            needed,
+            ir.Constant(INT64_T, ARENA_CHUNK_SIZE),
+        )
+        chunk: ir.Value = builder.call(self._malloc(), [capacity])
+        builder.store(
+            builder.load(self._arena_pointer(name="chunk")),
+            builder.bitcast(chunk, PTR_T(_CHAR_PTR_T)),
+        )
+        builder.store(chunk, self._arena_pointer(name="chunk"))
+        start: ir.Value = builder.gep(chunk, [ir.Constant(INT64_T, alignment)])
+        builder.store(builder.gep(start, [aligned]), self._arena_pointer(name="top"))
+        builder.store(builder.gep(chunk, [capacity]), self._arena_pointer(name="limit"))
+        builder.ret(start)
+
+    def _define_arena_enter(self, function: ir.Function) -> None:
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+        depth: ir.Value = builder.load(self._arena_depth())
+        builder.store(builder.add(depth, ir.Constant(INT32_T, 1)), self._arena_depth())
+
+        mark: ir.Value = ir.Constant(_ARENA_MARK_T, None)
+
+        for i, name in enumerate(("chunk", "top", "limit")):
+            mark = builder.insert_value(mark, builder.load(self._arena_pointer(name=name)), i)
+
+        builder.ret(mark)
+
+    def _define_arena_exit(self, function: ir.Function) -> None:
+        (mark,) = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        check: ir.Block = function.append_basic_block(name="check")
+        release: ir.Block = function.append_basic_block(name="release")
+        done: ir.Block = function.append_basic_block(name="done")
+        builder = ir.IRBuilder(entry)
+        depth: ir.Value = builder.load(self._arena_depth())
+        builder.store(builder.sub(depth, ir.Constant(INT32_T, 1)), self._arena_depth())
+        saved_chunk: ir.Value = builder.extract_value(mark, 0)
+        first: ir.Value = builder.load(self._arena_pointer(name="chunk"))
+        builder.branch(check)
+
+        # Free the chunks added since the mark, newest first
+        builder.position_at_end(check)
+        chunk: ir.PhiInstr = builder.phi(_CHAR_PTR_T)
+        builder.cbranch(builder.icmp_unsigned("==", chunk, saved_chunk), done, release)
+
+        builder.position_at_end(release)
+        previous: ir.Value = builder.load(builder.bitcast(chunk, PTR_T(_CHAR_PTR_T)))
+        builder.call(self._free(), [chunk])
+        builder.branch(check)
+        chunk.add_incoming(first, entry)
+        chunk.add_incoming(previous, release)
+
+        builder.position_at_end(done)
+
+        for i, name in enumerate(("chunk", "top", "limit")):
+            builder.store(builder.extract_value(mark, i), self._arena_pointer(name=name))
+
+        builder.ret_void()
+
+
+class ListRuntime(Runtime):
+    """
+    Lists, monomorphized per element type. A list is a handle to a header
+    (see list_header_type) whose elements are stored unboxed and
+    contiguously in a buffer, which doubles in size when it is full so that
+    appending takes amortized constant time. list[bool] packs its elements
+    into the bits of words. Headers and buffers come from the
+    AllocatorRuntime, from the innermost arena for lists that cannot outlive
+    it, and a buffer that grows stays in the arena of the one it replaces
+    unless that is no longer the innermost one. Reading elements is emitted
+    inline by emit_list_get().
+    """
+
+    def __init__(self, module: ir.Module, allocator: AllocatorRuntime):
+        super().__init__(module=module)
+        self._allocator: AllocatorRuntime = allocator
+
+    def new(self, element_type: ir.Type, in_arena: bool = False) -> ir.Function:
+        """
+        list* __sw_list_new.T(i64 capacity), an empty list with room for at
+        least `capacity` elements, or __sw_list_new_in_arena.T for one
+        allocated in the innermost arena
+        """
+        prefix: str = "__sw_list_new_in_arena" if in_arena else "__sw_list_new"
+
+        return self._function(
+            name=f"{prefix}.{_type_suffix(element_type)}",
+            func_type=ir.FunctionType(PTR_T(list_header_type(element_type)), [INT64_T]),
+            define=lambda function: self._define_new(function, element_type, in_arena),
+        )
+
+    def append(self, element_type: ir.Type) -> ir.Function:
+        """
+        void __sw_list_append.T(list* list, T value)
+        """
+        return self._function(
+            name=f"__sw_list_append.{_type_suffix(element_type)}",
+            func_type=ir.FunctionType(
+                VOID_T, [PTR_T(list_header_type(element_type)), element_type]
+            ),
+            define=lambda function: self._define_append(function, element_type),
+        )
+
+    def _define_new(self, function: ir.Function, element_type: ir.Type, in_arena: bool) -> None:
+        header_type: ir.Type = list_header_type(element_type)
+        allocate: ir.Function = (
+            self._allocator.allocate_in_arena() if in_arena else self._allocator.allocate()
+        )
+        (capacity,) = function.args
+
+        builder = ir.IRBuilder(function.append_basic_block(name="entry"))
+        header: ir.Value = builder.bitcast(
+            builder.call(allocate, [_size_of(header_type)]), PTR_T(header_type)
+        )
+
+        if element_type == INT1_T:
+            # Whole words
+            capacity = builder.and_(
+                builder.add(capacity, ir.Constant(INT64_T, LIST_BITS_PER_WORD - 1)),
+                ir.Constant(INT64_T, -LIST_BITS_PER_WORD),
+            )
+
+        builder.store(ir.Constant(INT64_T, 0), list_field(builder, header, LIST_LENGTH))
+        builder.store(capacity, list_field(builder, header, LIST_CAPACITY))
+        buffer: ir.Value = builder.call(allocate, [_buffer_size(builder, element_type, capacity)])
+        builder.store(
+            builder.bitcast(buffer, PTR_T(list_storage_type(element_type))),
+            list_field(builder, header, LIST_DATA),
+        )
+        builder.ret(header)
+
+    def _define_append(self, function: ir.Function, element_type: ir.Type) -> None:
+        memcpy: ir.Function = self._module.declare_intrinsic(
+            "llvm.memcpy", [_CHAR_PTR_T, _CHAR_PTR_T, INT64_T]
+        )
+        header, value = function.args
+
+        entry: ir.Block = function.append_basic_block(name="entry")
+        grow: ir.Block = function.append_basic_block(name="grow")
+        store: ir.Block = function.append_basic_block(name="store")
+        builder = ir.IRBuilder(entry)
+        length: ir.Value = builder.load(list_field(builder, header, LIST_LENGTH))
+        capacity: ir.Value = builder.load(list_field(builder, header, LIST_CAPACITY))
+        builder.cbranch(builder.icmp_unsigned("<", length, capacity), store, grow)
+
+        builder.position_at_end(grow)
+        initial_capacity: int = (
+            LIST_BITS_PER_WORD if element_type == INT1_T else LIST_INITIAL_CAPACITY
+        )
+        new_capacity: ir.Value = builder.select(
+            builder.icmp_unsigned("==", capacity, ir.Constant(INT64_T, 0)),
+            ir.Constant(INT64_T, initial_capacity),
+            builder.shl(capacity, ir.Constant(INT64_T, 1)),
+        )
+        old_buffer: ir.Value = builder.bitcast(
+            builder.load(list_field(builder, header, LIST_DATA)), _CHAR_PTR_T
+        )
+        new_buffer: ir.Value = builder.call(
+            self._allocator.allocate_like(),
+            [old_buffer, _buffer_size(builder, element_type, new_capacity)],
+        )
+        builder.call(
+            memcpy,
+            [
+                new_buffer,
+                old_buffer,
+                _buffer_size(builder, element_type, length),
+                ir.Constant(INT1_T, False),
+            ],
+        )
+        builder.call(self._allocator.release(), [old_buffer])
+        builder.store(
+            builder.bitcast(new_buffer, PTR_T(list_storage_type(element_type))),
+            list_field(builder, header, LIST_DATA),
+        )
+        builder.store(new_capacity, list_field(builder, header, LIST_CAPACITY))
+        builder.branch(store)
+
+        builder.position_at_end(store)
+        buffer: ir.Value = builder.load(list_field(builder, header, LIST_DATA))
+
+        if element_type == INT1_T:
+            word_slot, bit = _bit_position(builder, buffer, length)
+            word: ir.Value = builder.and_(
+                builder.load(word_slot), builder.not_(builder.shl(ir.Constant(bit.type, 1), bit))
+            )
+            word = builder.or_(word, builder.shl(builder.zext(value, bit.type), bit))
+            builder.store(word, word_slot)
+        else:
+            builder.store(value, builder.gep(buffer, [length]))
+
+        builder.store(
+            builder.add(length, ir.Constant(INT64_T, 1)), list_field(builder, header, LIST_LENGTH)
+        )
+        builder.ret_void()
+
+
+def list_field(builder: ir.IRBuilder, header: ir.Value, field: int) -> ir.Value:
+    """
+    Pointer to the LIST_LENGTH, LIST_CAPACITY or LIST_DATA field of a list.
+    """
+    return builder.gep(header, [ir.Constant(INT32_T, 0), ir.Constant(INT32_T, field)])
+
+
+def emit_list_length(builder: ir.IRBuilder, header: ir.Value) -> ir.Value:
+    return builder.load(list_field(builder, header, LIST_LENGTH))
+
+
+def emit_list_get(
+    builder: ir.IRBuilder,
+    header: ir.Value,
+    index: ir.Value,
+    element_type: ir.Type,
+    flush: Optional[Callable[[], ir.Function]] = None,
+) -> ir.Value:
+    """
+    The element of a list at the i64 `index`, which counts from the end if
+    it is negative, as in Python. There is no IndexError, so indices out of
+    range trap, after calling `flush` as in `emit_trap`.
+    """
+    length: ir.Value = emit_list_length(builder, header)
+    index = builder.select(
+        builder.icmp_signed("<", index, ir.Constant(INT64_T, 0)),
+        builder.add(index, length),
+        index,
+    )
+
+    # Indices that are still negative are out of range as unsigned
+    with builder.if_then(builder.icmp_unsigned(">=", index, length), likely=False):
+        emit_trap(builder=builder, flush=flush)
+
+    buffer: ir.Value = builder.load(list_field(builder, header, LIST_DATA))
+
+    if element_type != INT1_T:
+        return builder.load(builder.gep(buffer, [index]))
+
+    word_slot, bit = _bit_position(builder, buffer, index)
+
+    return builder.trunc(builder.lshr(builder.load(word_slot), bit), INT1_T)
+
+
+def _bit_position(
+    builder: ir.IRBuilder, buffer: ir.Value, index: ir.Value
+) -> Tuple[ir.Value, ir.Value]:
+    # The word holding the bit of a list[bool] element, and the bit within it
+    shift = ir.Constant(INT64_T, LIST_BITS_PER_WORD.bit_length() - 1)
+    word_slot: ir.Value = builder.gep(buffer, [builder.lshr(index, shift)])
+    bit: ir.Value = builder.and_(index, ir.Constant(INT64_T, LIST_BITS_PER_WORD - 1))
+
+    return word_slot, bit
+
+
+def _buffer_size(builder: ir.IRBuilder, element_type: ir.Type, capacity: ir.Value) -> ir.Value:
+    storage_type: ir.Type = list_storage_type(element_type)
+
+    if storage_type != element_type:
+        # Bits, rounded up to whole words
+        capacity = builder.lshr(
+            builder.add(capacity, ir.Constant(INT64_T, LIST_BITS_PER_WORD - 1)),
+            ir.Constant(INT64_T, LIST_BITS_PER_WORD.bit_length() - 1),
+        )
+
+    return builder.mul(capacity, _size_of(storage_type))
+
+
+def _size_of(ir_type: ir.Type) -> ir.Constant:
+    # The offset of the second element of an array at null, which LLVM folds
+    return ir.Constant(PTR_T(ir_type), None).gep([ir.Constant(INT32_T, 1)]).ptrtoint(INT64_T)
+
+
+def _type_suffix(ir_type: ir.Type) -> str:
+    # Monomorphized routines are named after their element type
+    return str(ir_type).replace(" ", "")
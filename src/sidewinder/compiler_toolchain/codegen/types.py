@@ -1,8 +1,11 @@
 from dataclasses import dataclass
-from typing import Any, Callable, TypeAlias, Union
+from typing import AbstractSet, Any, Callable, Mapping, MutableMapping, Optional, TypeAlias, Union
 
 from llvmlite import ir
 
+from sidewinder.compiler_toolchain.ast import DataType, DataTypeName
+
+INT1_T: ir.Type = ir.IntType(1)
 INT8_T: ir.Type = ir.IntType(8)
 INT32_T: ir.Type = ir.IntType(32)
 INT64_T: ir.Type = ir.IntType(64)
@@ -15,6 +18,117 @@ def PTR_T(pointee: ir.Type) -> ir.PointerType:
     return ir.PointerType(pointee=pointee)
 
 
+# Primitive Sidewinder types are lowered to unboxed IR values
+_data_type_name_to_ir_type_mapping: Mapping[DataTypeName, ir.Type] = {
+    DataTypeName.NONE: VOID_T,
+    DataTypeName.BOOL: INT1_T,
+    DataTypeName.INT: INT32_T,
+    DataTypeName.FLOAT: FLOAT32_T,
+}
+
+# Objects are passed around as opaque handles to their runtime representation
+OBJECT_T: ir.Type = PTR_T(INT8_T)
+
+_object_data_type_names: AbstractSet[DataTypeName] = frozenset(
+    (DataTypeName.SET, DataTypeName.DICT)
+)
+
+# Fields of the header of a str, which its UTF-8 bytes follow
+STR_HASH: int = 0
+STR_LENGTH: int = 1
+STR_DATA: int = 2
+
+
+def str_header_type(length: int = 0) -> ir.LiteralStructType:
+    """
+    {i64 hash, i64 length, [length x i8] data}. str values point to headers
+    of any length, as this type with a length of 0.
+    """
+    return ir.LiteralStructType([INT64_T, INT64_T, ir.ArrayType(INT8_T, length)])
+
+
+STR_T: ir.Type = PTR_T(str_header_type())
+
+# Fields of the header of a list
+LIST_LENGTH: int = 0
+LIST_CAPACITY: int = 1
+LIST_DATA: int = 2
+# list[bool] packs its elements into the bits of words of this many bits
+LIST_BITS_PER_WORD: int = 64
+
+
+def list_storage_type(element_type: ir.Type) -> ir.Type:
+    """
+    The type of the buffer slots of a list of `element_type` elements: the
+    element itself, unboxed, except that bools are packed into words.
+    """
+    if element_type == INT1_T:
+        return ir.IntType(LIST_BITS_PER_WORD)
+
+    return element_type
+
+
+def list_header_type(element_type: ir.Type) -> ir.LiteralStructType:
+    """
+    {i64 length, i64 capacity, T* data}, where the capacity of a list[bool]
+    is in bits.
+    """
+    return ir.LiteralStructType([INT64_T, INT64_T, PTR_T(list_storage_type(element_type))])
+
+
+# Data types are interned, so the cache is keyed by identity
+_ir_type_cache: MutableMapping[DataType, ir.Type] = {}
+
+
+def ir_type_for(data_type: DataType) -> ir.Type:
+    ir_type: Optional[ir.Type] = _ir_type_cache.get(data_type)
+
+    if ir_type is None:
+        ir_type = _lower_data_type(data_type=data_type)
+        _ir_type_cache[data_type] = ir_type
+
+    return ir_type
+
+
+def _lower_data_type(data_type: DataType) -> ir.Type:
+    name: DataTypeName = data_type.name()
+
+    if name in _data_type_name_to_ir_type_mapping:
+        return _data_type_name_to_ir_type_mapping[name]
+    elif name == DataTypeName.STR:
+        return STR_T
+    elif name in _object_data_type_names:
+        return OBJECT_T
+    elif name == DataTypeName.LIST:
+        # Monomorphized, so that elements are stored unboxed and contiguously
+        return PTR_T(list_header_type(_value_ir_type_for(data_type=data_type.parameters()[0])))
+    elif name in (DataTypeName.TUPLE, DataTypeName.STRUCT):
+        # Aggregates of values, which are stored inline and passed and
+        # returned by value, so they are never allocated
+        return ir.LiteralStructType(
+            [_value_ir_type_for(data_type=param) for param in data_type.parameters()]
+        )
+    elif name == DataTypeName.OPTIONAL:
+        value_type: ir.Type = _value_ir_type_for(data_type=data_type.parameters()[0])
+
+        # Object handles are nullable, primitives get a presence flag
+        if isinstance(value_type, ir.PointerType):
+            return value_type
+
+        return ir.LiteralStructType([INT1_T, value_type])
+
+    raise ValueError(f"No IR type for {data_type}")
+
+
+def _value_ir_type_for(data_type: DataType) -> ir.Type:
+    ir_type: ir.Type = ir_type_for(data_type=data_type)
+
+    if ir_type == VOID_T:
+        raise ValueError(f"{data_type} cannot be stored in a value")
+
+    return ir_type
+
+
 GlobalVariableInitializerFunc: TypeAlias = Callable[[], ir.Constant]
 
 
@@ -1,4 +1,16 @@
-import sidewinder.compiler_toolchain.antlr.ast_builder
+from sidewinder.compiler_toolchain.frontend import Frontend
 
-# Export
-DefaultASTBuilder = sidewinder.compiler_toolchain.antlr.ast_builder.AntlrASTBuilder
+if Frontend.from_env() == Frontend.RECURSIVE_DESCENT:
+    import sidewinder.compiler_toolchain.recursive_descent.ast_builder
+
+    # Export
+    DefaultASTBuilder = (
+        sidewinder.compiler_toolchain.recursive_descent.ast_builder.RecursiveDescentASTBuilder
+    )
+else:
+    import sidewinder.compiler_toolchain.antlr.visitor_ast_builder
+
+    # Export
+    DefaultASTBuilder = (
+        sidewinder.compiler_toolchain.antlr.visitor_ast_builder.AntlrVisitorASTBuilder
+    )
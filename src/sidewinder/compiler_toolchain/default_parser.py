@@ -1,4 +1,12 @@
-import sidewinder.compiler_toolchain.antlr.parser
+from sidewinder.compiler_toolchain.frontend import Frontend
 
-# Export
-DefaultParser = sidewinder.compiler_toolchain.antlr.parser.AntlrParser
+if Frontend.from_env() == Frontend.RECURSIVE_DESCENT:
+    import sidewinder.compiler_toolchain.recursive_descent.parser
+
+    # Export
+    DefaultParser = sidewinder.compiler_toolchain.recursive_descent.parser.RecursiveDescentParser
+else:
+    import sidewinder.compiler_toolchain.antlr.parser
+
+    # Export
+    DefaultParser = sidewinder.compiler_toolchain.antlr.parser.AntlrParser
@@ -0,0 +1,18 @@
+import os
+from enum import Enum
+
+FRONTEND_ENV_VAR: str = "SIDEWINDER_FRONTEND"
+
+
+class Frontend(Enum):
+    ANTLR = "antlr"
+    RECURSIVE_DESCENT = "recursive_descent"
+
+    @classmethod
+    def from_env(cls) -> "Frontend":
+        value: str = os.environ.get(FRONTEND_ENV_VAR, Frontend.ANTLR.value)
+
+        try:
+            return Frontend(value)
+        except ValueError:
+            raise ValueError(f"Unknown frontend {value} in {FRONTEND_ENV_VAR}")
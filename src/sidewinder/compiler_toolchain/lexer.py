@@ -0,0 +1,316 @@
+import re
+from array import array
+from io import TextIOBase
+from typing import Mapping, MutableSequence, Optional, Pattern, Sequence
+
+from sidewinder.compiler_toolchain.token_type import TokenType
+
+# Indexable by TokenType.value, which starts at 1 for auto()
+_token_types_by_value: Sequence[Optional[TokenType]] = [None] + list(TokenType)
+
+_operator_to_token_type_map: Mapping[str, TokenType] = {
+    "->": TokenType.ARROW,
+    "**": TokenType.EXPONENT,
+    "<<": TokenType.BITWISE_LEFT_SHIFT,
+    ">>": TokenType.BITWISE_RIGHT_SHIFT,
+    "==": TokenType.EQUALITY,
+    "!=": TokenType.INEQUALITY,
+    "<=": TokenType.LESS_THAN_OR_EQUAL,
+    ">=": TokenType.GREATER_THAN_OR_EQUAL,
+    "(": TokenType.LEFT_PARENS,
+    ")": TokenType.RIGHT_PARENS,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ":": TokenType.COLON,
+    ".": TokenType.DOT,
+    "@": TokenType.AT,
+    "+": TokenType.PLUS,
+    "-": TokenType.HYPHEN,
+    "*": TokenType.ASTERISK,
+    "/": TokenType.SLASH,
+    "|": TokenType.PIPE,
+    "^": TokenType.CARET,
+    "%": TokenType.MODULUS,
+    "=": TokenType.EQUAL,
+    "<": TokenType.LESS_THAN,
+    ">": TokenType.GREATER_THAN,
+    "?": TokenType.QUESTION_MARK,
+}
+
+_opening_brackets: str = "([{"
+_closing_brackets: str = ")]}"
+
+# Alternatives are tried in order, so longer operators must come first. Names
+# and numbers must not be directly followed by a name character or a quote,
+# which rules out string prefixes (f"", b"") and numbers like 1_000 or 1j.
+_token_pattern: Pattern = re.compile(
+    r"""
+    (?P<ws>[ \t]+)
+    |(?P<comment>\#[^\r\n]*)
+    |(?P<newline>\r?\n)
+    |(?P<float>(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?(?![_A-Za-z0-9.])
+        |[0-9]+[eE][+-]?[0-9]+(?![_A-Za-z0-9.]))
+    |(?P<int>(?:0[xX][0-9a-fA-F]+|0[oO][0-7]+|0[bB][01]+|[0-9]+)(?![_A-Za-z0-9.]))
+    |(?P<str>(?!'''|\"\"\")(?:'(?:[^'\\\r\n]|\\.)*'|"(?:[^"\\\r\n]|\\.)*"))
+    |(?P<name>[_A-Za-z][_A-Za-z0-9]*(?![_A-Za-z0-9'"]))
+    |(?P<unsupported>\.\.\.|\*\*=|//=?|<<=|>>=|:=|[-+*/%@&|^]=|[&~;\\]|!(?!=))
+    |(?P<op>"""
+    + "|".join(re.escape(op) for op in sorted(_operator_to_token_type_map, key=len, reverse=True))
+    + r"""
+    )""",
+    re.VERBOSE,
+)
+
+# Consumes blank and comment-only lines, capturing the indentation of the next
+# line that has tokens
+_blank_lines_pattern: Pattern = re.compile(r"(?:[ \t]*(?:\#[^\r\n]*)?\r?\n)*([ \t]*)")
+
+
+class UnsupportedSyntaxError(Exception):
+    """
+    Raised by the fast lexer when it encounters a construct outside of the
+    subset of Python that it handles.
+    """
+
+    def __init__(self, line: int, text: str):
+        super().__init__(f"Unsupported syntax on line {line}: {text!r}")
+        self.line: int = line
+        self.text: str = text
+
+
+class TokenArray:
+    """
+    Compact, column-oriented storage of tokens. Each token is a token type, a
+    [start, end) character span into the source text and a 1-based line number.
+    """
+
+    def __init__(self, source: str):
+        self._source: str = source
+        self._types: array = array("B")
+        self._starts: array = array("L")
+        self._ends: array = array("L")
+        self._lines: array = array("L")
+
+    def source(self) -> str:
+        return self._source
+
+    def append(self, token_type: TokenType, start: int, end: int, line: int) -> None:
+        self._types.append(token_type.value)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._lines.append(line)
+
+    def token_type(self, i: int) -> TokenType:
+        return _token_types_by_value[self._types[i]]
+
+    def token_types(self) -> Sequence[TokenType]:
+        return [_token_types_by_value[value] for value in self._types]
+
+    def text(self, i: int) -> str:
+        return self._source[self._starts[i] : self._ends[i]]
+
+    def start(self, i: int) -> int:
+        return self._starts[i]
+
+    def end(self, i: int) -> int:
+        return self._ends[i]
+
+    def line(self, i: int) -> int:
+        return self._lines[i]
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __repr__(self):
+        tokens: Sequence[str] = [
+            f"{self.token_type(i).name} {self.text(i)!r}" for i in range(len(self))
+        ]
+
+        return f"TokenArray([{', '.join(tokens)}])"
+
+
+class Lexer:
+    """
+    Regex-table driven lexer for the Sidewinder subset of Python. Anything that
+    it does not support is lexed with the ANTLR PythonLexer instead, unless
+    fallback is disabled, in which case UnsupportedSyntaxError is raised.
+    """
+
+    def __init__(self, allow_fallback: bool = True):
+        self._allow_fallback: bool = allow_fallback
+        self._used_fallback: bool = False
+
+    def used_fallback(self) -> bool:
+        return self._used_fallback
+
+    def lex(self, input: TextIOBase) -> TokenArray:
+        return self.lex_str(source=input.read())
+
+    def lex_str(self, source: str) -> TokenArray:
+        self._used_fallback = False
+
+        try:
+            return self._lex_fast(source=source)
+        except UnsupportedSyntaxError:
+            if not self._allow_fallback:
+                raise
+
+        self._used_fallback = True
+
+        return self._lex_with_antlr(source=source)
+
+    def _lex_fast(self, source: str) -> TokenArray:
+        tokens = TokenArray(source=source)
+        append = tokens.append
+        from_str = TokenType.from_str
+        operators = _operator_to_token_type_map
+        match = _token_pattern.match
+
+        indents: MutableSequence[int] = [0]
+        line: int = 1
+        bracket_depth: int = 0
+        line_has_tokens: bool = False
+
+        # Leading blank lines and the first line's indentation
+        pos: int = self._handle_indentation(
+            tokens=tokens, source=source, pos=0, line=line, indents=indents
+        )
+        line += source.count("\n", 0, pos)
+        end: int = len(source)
+
+        if len(indents) > 1:
+            raise UnsupportedSyntaxError(line=line, text="<unexpected indent>")
+
+        while pos < end:
+            m = match(source, pos)
+
+            if not m:
+                raise UnsupportedSyntaxError(line=line, text=source[pos : pos + 16])
+
+            kind: str = m.lastgroup
+            start: int = pos
+            pos = m.end()
+
+            if kind == "ws" or kind == "comment":
+                continue
+            elif kind == "name":
+                append(from_str(m.group()), start, pos, line)
+            elif kind == "op":
+                text: str = m.group()
+
+                if text in _opening_brackets:
+                    bracket_depth += 1
+                elif text in _closing_brackets:
+                    bracket_depth -= 1
+
+                append(operators[text], start, pos, line)
+            elif kind == "int" or kind == "float":
+                append(TokenType.LITERAL_NUMBER, start, pos, line)
+            elif kind == "str":
+                append(TokenType.LITERAL_STRING, start, pos, line)
+            elif kind == "newline":
+                line += 1
+
+                if bracket_depth > 0:
+                    # Implicit line joining inside brackets
+                    continue
+
+                if line_has_tokens:
+                    append(TokenType.NEWLINE, start, pos, line - 1)
+
+                line_has_tokens = False
+                new_pos: int = self._handle_indentation(
+                    tokens=tokens, source=source, pos=pos, line=line, indents=indents
+                )
+                line += source.count("\n", pos, new_pos)
+                pos = new_pos
+                continue
+            else:
+                raise UnsupportedSyntaxError(line=line, text=m.group())
+
+            line_has_tokens = True
+
+        if bracket_depth != 0:
+            raise UnsupportedSyntaxError(line=line, text="<unbalanced brackets>")
+
+        if line_has_tokens:
+            append(TokenType.NEWLINE, end, end, line)
+
+        for _ in indents[1:]:
+            append(TokenType.DEDENT, end, end, line)
+
+        append(TokenType.EOF, end, end, line)
+
+        return tokens
+
+    def _handle_indentation(
+        self, tokens: TokenArray, source: str, pos: int, line: int, indents: MutableSequence[int]
+    ) -> int:
+        m = _blank_lines_pattern.match(source, pos)
+        indentation: str = m.group(1)
+        new_pos: int = m.end()
+
+        if new_pos >= len(source):
+            # Only blank lines remain, dedenting is handled at EOF
+            return new_pos
+
+        if "\t" in indentation:
+            raise UnsupportedSyntaxError(line=line, text="<tab indentation>")
+
+        width: int = len(indentation)
+        line += source.count("\n", pos, new_pos)
+
+        if width > indents[-1]:
+            indents.append(width)
+            tokens.append(TokenType.INDENT, m.start(1), new_pos, line)
+        else:
+            while width < indents[-1]:
+                indents.pop()
+                tokens.append(TokenType.DEDENT, new_pos, new_pos, line)
+
+            if width != indents[-1]:
+                raise UnsupportedSyntaxError(line=line, text="<inconsistent dedent>")
+
+        return new_pos
+
+    def _lex_with_antlr(self, source: str) -> TokenArray:
+        from antlr4 import InputStream, Token
+        from PythonLexer import PythonLexer
+
+        lexer = PythonLexer(input=InputStream(data=source))
+        tokens = TokenArray(source=source)
+        special_token_types: Mapping[str, TokenType] = {
+            "NEWLINE": TokenType.NEWLINE,
+            "INDENT": TokenType.INDENT,
+            "DEDENT": TokenType.DEDENT,
+            "NUMBER": TokenType.LITERAL_NUMBER,
+            "STRING": TokenType.LITERAL_STRING,
+        }
+
+        for token in lexer.getAllTokens():
+            if token.channel != Token.DEFAULT_CHANNEL:
+                continue
+
+            symbolic_name: str = lexer.symbolicNames[token.type]
+            text: str = token.text or ""
+            start: int = max(token.start, 0)
+            end: int = max(token.stop + 1, start)
+
+            if symbolic_name in special_token_types:
+                token_type: TokenType = special_token_types[symbolic_name]
+            elif text in _operator_to_token_type_map:
+                token_type = _operator_to_token_type_map[text]
+            elif text.isidentifier():
+                token_type = TokenType.from_str(text)
+            else:
+                token_type = TokenType.UNK
+
+            tokens.append(token_type, start, end, token.line)
+
+        end: int = len(source)
+        tokens.append(TokenType.EOF, end, end, source.count("\n", 0, end) + 1)
+
+        return tokens
@@ -0,0 +1,332 @@
+import math
+import operator
+import struct
+from collections import Counter
+from typing import AbstractSet, Callable, Mapping, MutableMapping, MutableSequence, Optional
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomPool,
+    AtomType,
+    AtomValue,
+    BinaryOperation,
+    BinaryOperator,
+    DataType,
+    DataTypeName,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    Module,
+    Return,
+    Statement,
+    Subscript,
+    UnaryOperation,
+    UnaryOperator,
+    With,
+    block_statements,
+)
+from sidewinder.compiler_toolchain.codegen.arithmetic import OverflowMode
+
+_literal_atom_types: AbstractSet[AtomType] = frozenset((AtomType.INT, AtomType.FLOAT, AtomType.STR))
+
+_data_type_name_to_atom_type_mapping: Mapping[DataTypeName, AtomType] = {
+    DataTypeName.INT: AtomType.INT,
+    DataTypeName.FLOAT: AtomType.FLOAT,
+    DataTypeName.STR: AtomType.STR,
+}
+
+_foldable_operations: Mapping[BinaryOperator, Callable[[AtomValue, AtomValue], AtomValue]] = {
+    BinaryOperator.ADD: operator.add,
+    BinaryOperator.SUBTRACT: operator.sub,
+    BinaryOperator.MULTIPLY: operator.mul,
+}
+
+_int32_min: int = -(2**31)
+_int32_max: int = 2**31 - 1
+
+
+def wrap_int32(value: int) -> int:
+    return (value + 2**31) % 2**32 - 2**31
+
+
+def round_float32(value: float) -> float:
+    try:
+        return struct.unpack("f", struct.pack("f", value))[0]
+    except OverflowError:
+        return math.copysign(math.inf, value)
+
+
+class ConstantFolder:
+    """
+    Folds arithmetic on literals, propagates literals through variables that
+    are assigned exactly once in their scope, and removes additions of zero.
+    Runs on a type-checked module and evaluates with int32 and float32
+    semantics, so that folded results match what the generated code computes.
+    Int results that overflow are only folded when `overflow_mode` wraps,
+    otherwise the generated code decides what happens.
+    """
+
+    def __init__(self, overflow_mode: OverflowMode = OverflowMode.WRAP):
+        self._overflow_mode: OverflowMode = overflow_mode
+        self._atom_pool: Optional[AtomPool] = None
+
+    def fold(self, module: Module) -> Module:
+        self._atom_pool = module.atom_pool()
+        self._fold_block(statements=module.statements(), parameter_names=frozenset())
+
+        return module
+
+    def _fold_block(
+        self, statements: MutableSequence[Statement], parameter_names: AbstractSet[str]
+    ) -> None:
+        # With blocks share the scope of the block they are in
+        assignment_counts: Counter = Counter(
+            statement.left().name()
+            for statement in block_statements(statements=statements)
+            if isinstance(statement, Assignment)
+        )
+        # Single-assignment variables whose value is a literal, in the order
+        # they are assigned so that earlier reads are left alone
+        constants: MutableMapping[str, Atom] = {}
+
+        self._fold_statements(
+            statements=statements,
+            parameter_names=parameter_names,
+            assignment_counts=assignment_counts,
+            constants=constants,
+        )
+
+    def _fold_statements(
+        self,
+        statements: MutableSequence[Statement],
+        parameter_names: AbstractSet[str],
+        assignment_counts: Counter,
+        constants: MutableMapping[str, Atom],
+    ) -> None:
+        for i, statement in enumerate(statements):
+            if isinstance(statement, FunctionDef):
+                for param in statement.parameters():
+                    if param.default_value() is not None:
+                        param.set_default_value(
+                            self._fold_expression(
+                                expression=param.default_value(), constants=constants
+                            )
+                        )
+
+                self._fold_block(
+                    statements=statement.statements(),
+                    parameter_names=frozenset(param.name() for param in statement.parameters()),
+                )
+            elif isinstance(statement, Assignment):
+                right: Expression = self._fold_expression(
+                    expression=statement.right(), constants=constants
+                )
+                statement.set_right(right)
+                name: str = statement.left().name()
+
+                if (
+                    assignment_counts[name] == 1
+                    and name not in parameter_names
+                    and self._is_literal(expression=right)
+                ):
+                    constant: Optional[Atom] = self._convert(
+                        atom=right, data_type=statement.left().data_type()
+                    )
+
+                    if constant is not None:
+                        constants[name] = constant
+            elif isinstance(statement, Return):
+                expressions: MutableSequence[Expression] = statement.expressions()
+                expressions[:] = [
+                    self._fold_expression(expression=expression, constants=constants)
+                    for expression in expressions
+                ]
+            elif isinstance(statement, With):
+                self._fold_statements(
+                    statements=statement.statements(),
+                    parameter_names=parameter_names,
+                    assignment_counts=assignment_counts,
+                    constants=constants,
+                )
+            elif isinstance(statement, Expression):
+                statements[i] = self._fold_expression(expression=statement, constants=constants)
+
+    def _fold_expression(self, expression: Expression, constants: Mapping[str, Atom]) -> Expression:
+        if isinstance(expression, Atom):
+            constant: Optional[Atom] = (
+                constants.get(expression.name())
+                if expression.atom_type() == AtomType.IDENTIFIER
+                else None
+            )
+
+            if constant is not None:
+                # Every use gets its own node
+                return Atom(pool=constant.pool(), index=constant.index()).set_data_type(
+                    constant.data_type()
+                )
+        elif isinstance(expression, BinaryOperation):
+            expression.set_left(
+                self._fold_expression(expression=expression.left(), constants=constants)
+            )
+            expression.set_right(
+                self._fold_expression(expression=expression.right(), constants=constants)
+            )
+
+            return self._fold_binary_operation(node=expression)
+        elif isinstance(expression, UnaryOperation):
+            expression.set_operand(
+                self._fold_expression(expression=expression.operand(), constants=constants)
+            )
+
+            return self._fold_unary_operation(node=expression)
+        elif isinstance(expression, FunctionCall):
+            arguments: MutableSequence[Expression] = expression.arguments()
+            arguments[:] = [
+                self._fold_expression(expression=argument, constants=constants)
+                for argument in arguments
+            ]
+        elif isinstance(expression, FieldAccess):
+            expression.set_value(
+                self._fold_expression(expression=expression.value(), constants=constants)
+            )
+        elif isinstance(expression, ListLiteral):
+            expression.elements()[:] = [
+                self._fold_expression(expression=element, constants=constants)
+                for element in expression.elements()
+            ]
+        elif isinstance(expression, Subscript):
+            expression.set_value(
+                self._fold_expression(expression=expression.value(), constants=constants)
+            )
+            expression.set_index(
+                self._fold_expression(expression=expression.index(), constants=constants)
+            )
+
+        return expression
+
+    def _fold_binary_operation(self, node: BinaryOperation) -> Expression:
+        data_type: DataType = node.data_type()
+        left: Expression = node.left()
+        right: Expression = node.right()
+        operation: Optional[Callable[[AtomValue, AtomValue], AtomValue]] = _foldable_operations.get(
+            node.operator()
+        )
+
+        if (
+            operation is not None
+            and self._is_literal(expression=left)
+            and self._is_literal(expression=right)
+        ):
+            left_value: Optional[AtomValue] = self._value_as(atom=left, data_type=data_type)
+            right_value: Optional[AtomValue] = self._value_as(atom=right, data_type=data_type)
+
+            if left_value is not None and right_value is not None:
+                folded: Optional[Atom] = self._make_constant(
+                    value=operation(left_value, right_value), data_type=data_type
+                )
+
+                if folded is not None:
+                    return folded
+
+        # x + 0 and x - 0 are x for int32, but not for float32 where
+        # -0.0 + 0.0 is 0.0
+        if data_type.name() == DataTypeName.INT and node.operator() in (
+            BinaryOperator.ADD,
+            BinaryOperator.SUBTRACT,
+        ):
+            if self._is_zero(expression=right) and left.data_type() is data_type:
+                return left
+
+            if (
+                node.operator() == BinaryOperator.ADD
+                and self._is_zero(expression=left)
+                and right.data_type() is data_type
+            ):
+                return right
+
+        return node
+
+    def _fold_unary_operation(self, node: UnaryOperation) -> Expression:
+        operand: Expression = node.operand()
+
+        if node.operator() == UnaryOperator.NEGATE and self._is_literal(expression=operand):
+            value: Optional[AtomValue] = self._value_as(atom=operand, data_type=node.data_type())
+
+            if value is not None:
+                folded: Optional[Atom] = self._make_constant(
+                    value=-value, data_type=node.data_type()
+                )
+
+                if folded is not None:
+                    return folded
+
+        return node
+
+    def _is_literal(self, expression: Expression) -> bool:
+        return isinstance(expression, Atom) and expression.atom_type() in _literal_atom_types
+
+    def _is_zero(self, expression: Expression) -> bool:
+        return (
+            isinstance(expression, Atom)
+            and expression.atom_type() == AtomType.INT
+            and expression.int_value() == 0
+        )
+
+    def _value_as(self, atom: Atom, data_type: DataType) -> Optional[AtomValue]:
+        value: AtomValue = atom.pool().value(atom.index())
+
+        if atom.atom_type() == AtomType.INT:
+            value = wrap_int32(value)
+
+        if data_type.name() == DataTypeName.INT and atom.atom_type() == AtomType.INT:
+            return value
+        elif data_type.name() == DataTypeName.FLOAT and atom.atom_type() in (
+            AtomType.INT,
+            AtomType.FLOAT,
+        ):
+            return round_float32(float(value))
+        elif data_type.name() == DataTypeName.STR and atom.atom_type() == AtomType.STR:
+            return value
+
+        return None
+
+    def _convert(self, atom: Atom, data_type: DataType) -> Optional[Atom]:
+        if atom.data_type() is data_type:
+            return atom
+
+        value: Optional[AtomValue] = self._value_as(atom=atom, data_type=data_type)
+
+        if value is None:
+            return None
+
+        return self._make_constant(value=value, data_type=data_type)
+
+    def _make_constant(self, value: AtomValue, data_type: DataType) -> Optional[Atom]:
+        atom_type: Optional[AtomType] = _data_type_name_to_atom_type_mapping.get(data_type.name())
+
+        if atom_type == AtomType.INT:
+            if not _int32_min <= value <= _int32_max and self._overflow_mode != OverflowMode.WRAP:
+                return None
+
+            text: str = str(wrap_int32(value))
+        elif atom_type == AtomType.FLOAT:
+            value = round_float32(value)
+
+            # inf and nan have no literal syntax
+            if not math.isfinite(value):
+                return None
+
+            text = repr(value)
+        elif atom_type == AtomType.STR:
+            text = repr(value)
+        else:
+            return None
+
+        index: int = self._atom_pool.intern(text=text, atom_type=atom_type)
+        atom = Atom(pool=self._atom_pool, index=index)
+        atom.set_data_type(data_type)
+
+        return atom
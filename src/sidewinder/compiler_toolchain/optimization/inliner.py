@@ -0,0 +1,405 @@
+from typing import (
+    AbstractSet,
+    Hashable,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomType,
+    BinaryOperation,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    MethodCall,
+    Module,
+    Node,
+    Parameter,
+    Return,
+    Statement,
+    StructDef,
+    Subscript,
+    UnaryOperation,
+    Variable,
+    With,
+)
+from sidewinder.compiler_toolchain.semantic.purity import PurityAnalyzer
+
+DEFAULT_MAX_INLINE_SIZE = 24
+DEFAULT_MAX_SPECIALIZATIONS = 4
+
+_constant_names: AbstractSet[str] = frozenset(("True", "False"))
+
+
+class Inliner:
+    """
+    Replaces calls to small pure functions by their return expression, with
+    arguments substituted for parameters, when the result has at most
+    `max_inline_size` nodes. Calls that are not inlined but pass constants,
+    or rely on default values, go to a clone of the function in which those
+    parameters are locals bound to the constants, which constant folding can
+    then propagate. At most `max_specializations` clones are made per
+    function.
+
+    Runs on a type-checked module, before constant folding.
+    """
+
+    def __init__(
+        self,
+        max_inline_size: int = DEFAULT_MAX_INLINE_SIZE,
+        max_specializations: int = DEFAULT_MAX_SPECIALIZATIONS,
+    ):
+        self._max_inline_size: int = max_inline_size
+        self._max_specializations: int = max_specializations
+
+        self._func_defs: MutableMapping[str, FunctionDef] = {}
+        self._pure_functions: AbstractSet[str] = frozenset()
+        # Return expression of each inlinable function with its locals
+        # substituted, so that it only refers to parameters
+        self._bodies: MutableMapping[str, Optional[Expression]] = {}
+        self._specializations: MutableMapping[Tuple[str, Hashable], FunctionDef] = {}
+        self._num_specializations: MutableMapping[str, int] = {}
+
+    def inline(self, module: Module) -> Module:
+        self._func_defs = {
+            statement.name(): statement
+            for statement in module.statements()
+            if isinstance(statement, FunctionDef)
+        }
+        self._pure_functions = PurityAnalyzer().pure_functions(module=module)
+        self._bodies = {}
+        self._specializations = {}
+        self._num_specializations = {}
+
+        for func_def in list(self._func_defs.values()):
+            self._inline_statements(statements=func_def.statements())
+
+        self._inline_statements(statements=module.statements())
+
+        module.statements().extend(self._specializations.values())
+
+        return module
+
+    def _inline_statements(self, statements: MutableSequence[Statement]) -> None:
+        for i, statement in enumerate(statements):
+            if isinstance(statement, Assignment):
+                statement.set_right(self._inline_expression(expression=statement.right()))
+            elif isinstance(statement, Return):
+                statement.expressions()[:] = [
+                    self._inline_expression(expression=expression)
+                    for expression in statement.expressions()
+                ]
+            elif isinstance(statement, With):
+                self._inline_statements(statements=statement.statements())
+            elif isinstance(statement, Expression):
+                statements[i] = self._inline_expression(expression=statement)
+
+    def _inline_expression(self, expression: Expression) -> Expression:
+        if isinstance(expression, BinaryOperation):
+            expression.set_left(self._inline_expression(expression=expression.left()))
+            expression.set_right(self._inline_expression(expression=expression.right()))
+        elif isinstance(expression, UnaryOperation):
+            expression.set_operand(self._inline_expression(expression=expression.operand()))
+        elif isinstance(expression, FunctionCall):
+            expression.arguments()[:] = [
+                self._inline_expression(expression=arg) for arg in expression.arguments()
+            ]
+
+            inlined: Optional[Expression] = self._try_inline(call=expression)
+
+            if inlined is not None:
+                return inlined
+
+            return self._specialize(call=expression)
+        elif isinstance(expression, FieldAccess):
+            expression.set_value(self._inline_expression(expression=expression.value()))
+        elif isinstance(expression, ListLiteral):
+            expression.elements()[:] = [
+                self._inline_expression(expression=element) for element in expression.elements()
+            ]
+        elif isinstance(expression, Subscript):
+            expression.set_value(self._inline_expression(expression=expression.value()))
+            expression.set_index(self._inline_expression(expression=expression.index()))
+
+        return expression
+
+    def _try_inline(self, call: FunctionCall) -> Optional[Expression]:
+        func_def: Optional[FunctionDef] = self._func_defs.get(call.name())
+
+        if func_def is None or call.name() not in self._pure_functions:
+            return None
+
+        body: Optional[Expression] = self._body(func_def=func_def)
+
+        if body is None:
+            return None
+
+        args: Optional[Sequence[Expression]] = self._arguments(call=call, func_def=func_def)
+
+        # Arguments may be duplicated or dropped, so they must be pure too.
+        # Coercions happen at calls and returns, so types must match exactly.
+        if args is None or any(
+            not self._is_pure(expression=arg) or arg.data_type() is not param.data_type()
+            for arg, param in zip(args, func_def.parameters())
+        ):
+            return None
+
+        env: Mapping[str, Expression] = {
+            param.name(): arg for param, arg in zip(func_def.parameters(), args)
+        }
+        inlined: Expression = _substitute(expression=body, env=env)
+
+        if _size(inlined) > self._max_inline_size:
+            return None
+
+        # Inlined calls of other functions can be inlined in turn, which
+        # terminates because pure functions are not recursive
+        return self._inline_expression(expression=inlined)
+
+    def _body(self, func_def: FunctionDef) -> Optional[Expression]:
+        if func_def.name() not in self._bodies:
+            env: MutableMapping[str, Expression] = {}
+            body: Optional[Expression] = None
+
+            for statement in func_def.statements():
+                if (
+                    isinstance(statement, Assignment)
+                    # Substituting the value would skip its coercion
+                    and statement.right().data_type() is statement.left().data_type()
+                ):
+                    env[statement.left().name()] = _substitute(
+                        expression=statement.right(), env=env
+                    )
+                elif (
+                    isinstance(statement, Return)
+                    and len(statement.expressions()) == 1
+                    and statement.expressions()[0].data_type() is func_def.return_type()
+                ):
+                    body = _substitute(expression=statement.expressions()[0], env=env)
+                    break
+                else:
+                    break
+
+            self._bodies[func_def.name()] = body
+
+        return self._bodies[func_def.name()]
+
+    def _arguments(
+        self, call: FunctionCall, func_def: FunctionDef
+    ) -> Optional[Sequence[Expression]]:
+        """
+        The argument for every parameter, with defaults filled in. Only
+        constant defaults are used, because other defaults must not be
+        evaluated in the caller's scope.
+        """
+        args: MutableSequence[Expression] = list(call.arguments())
+
+        for param in func_def.parameters()[len(args) :]:
+            if param.default_value() is None or not _is_constant(expression=param.default_value()):
+                return None
+
+            args.append(param.default_value())
+
+        return args
+
+    def _is_pure(self, expression: Expression) -> bool:
+        if isinstance(expression, Atom):
+            return True
+        elif isinstance(expression, BinaryOperation):
+            return self._is_pure(expression=expression.left()) and self._is_pure(
+                expression=expression.right()
+            )
+        elif isinstance(expression, UnaryOperation):
+            return self._is_pure(expression=expression.operand())
+        elif isinstance(expression, FunctionCall):
+            return expression.name() in self._pure_functions and all(
+                self._is_pure(expression=arg) for arg in expression.arguments()
+            )
+        elif isinstance(expression, FieldAccess):
+            return self._is_pure(expression=expression.value())
+
+        return False
+
+    def _specialize(self, call: FunctionCall) -> FunctionCall:
+        func_def: Optional[FunctionDef] = self._func_defs.get(call.name())
+
+        if func_def is None:
+            return call
+
+        args: Optional[Sequence[Expression]] = self._arguments(call=call, func_def=func_def)
+
+        if args is None:
+            return call
+
+        bound: Sequence[int] = [i for i, arg in enumerate(args) if _is_constant(expression=arg)]
+
+        if not bound:
+            return call
+
+        key: Tuple[str, Hashable] = (
+            func_def.name(),
+            tuple((i, args[i].pool().value(args[i].index()), args[i].name()) for i in bound),
+        )
+        specialization: Optional[FunctionDef] = self._specializations.get(key)
+
+        if specialization is None:
+            num_specializations: int = self._num_specializations.get(func_def.name(), 0)
+
+            if num_specializations >= self._max_specializations:
+                return call
+
+            specialization = _clone_function_def(
+                func_def=func_def,
+                name=f"{func_def.name()}.{num_specializations}",
+                bound_args={i: args[i] for i in bound},
+            )
+            self._num_specializations[func_def.name()] = num_specializations + 1
+            self._specializations[key] = specialization
+
+        specialized_call = FunctionCall()
+        specialized_call.set_name(specialization.name())
+        specialized_call.set_data_type(call.data_type())
+        specialized_call.arguments().extend(arg for i, arg in enumerate(args) if i not in bound)
+
+        return specialized_call
+
+
+def _is_constant(expression: Expression) -> bool:
+    return isinstance(expression, Atom) and (
+        expression.atom_type() in (AtomType.INT, AtomType.FLOAT, AtomType.STR)
+        or expression.name() in _constant_names
+    )
+
+
+def _size(expression: Expression) -> int:
+    if isinstance(expression, BinaryOperation):
+        return 1 + _size(expression.left()) + _size(expression.right())
+    elif isinstance(expression, UnaryOperation):
+        return 1 + _size(expression.operand())
+    elif isinstance(expression, FunctionCall):
+        return 1 + sum(_size(arg) for arg in expression.arguments())
+    elif isinstance(expression, FieldAccess):
+        return 1 + _size(expression.value())
+    elif isinstance(expression, ListLiteral):
+        return 1 + sum(_size(element) for element in expression.elements())
+    elif isinstance(expression, Subscript):
+        return 1 + _size(expression.value()) + _size(expression.index())
+
+    return 1
+
+
+def _substitute(expression: Expression, env: Mapping[str, Expression]) -> Expression:
+    """
+    Copy of `expression` in which identifiers bound in `env` are replaced by
+    copies of their values.
+    """
+    if isinstance(expression, Atom):
+        if expression.atom_type() == AtomType.IDENTIFIER and expression.name() in env:
+            return _substitute(expression=env[expression.name()], env={})
+
+        copy = Atom(pool=expression.pool(), index=expression.index())
+    elif isinstance(expression, BinaryOperation):
+        copy = BinaryOperation.for_operator(expression.operator())
+        copy.set_left(_substitute(expression=expression.left(), env=env))
+        copy.set_right(_substitute(expression=expression.right(), env=env))
+    elif isinstance(expression, UnaryOperation):
+        copy = UnaryOperation(operator=expression.operator())
+        copy.set_operand(_substitute(expression=expression.operand(), env=env))
+    elif isinstance(expression, FunctionCall):
+        copy = MethodCall() if isinstance(expression, MethodCall) else FunctionCall()
+        copy.set_name(expression.name())
+        copy.arguments().extend(
+            _substitute(expression=arg, env=env) for arg in expression.arguments()
+        )
+    elif isinstance(expression, FieldAccess):
+        copy = FieldAccess()
+        copy.set_name(expression.name())
+        copy.set_value(_substitute(expression=expression.value(), env=env))
+    elif isinstance(expression, ListLiteral):
+        copy = ListLiteral()
+        copy.elements().extend(
+            _substitute(expression=element, env=env) for element in expression.elements()
+        )
+    elif isinstance(expression, Subscript):
+        copy = Subscript()
+        copy.set_value(_substitute(expression=expression.value(), env=env))
+        copy.set_index(_substitute(expression=expression.index(), env=env))
+    else:
+        raise ValueError(f"Unsupported expression {expression}")
+
+    copy.set_data_type(expression.data_type())
+
+    return copy
+
+
+def _clone_statement(statement: Node) -> Node:
+    if isinstance(statement, Assignment):
+        variable = Variable()
+        variable.set_name(statement.left().name())
+        variable.set_data_type(statement.left().data_type())
+
+        copy = Assignment()
+        copy.set_left(variable)
+        copy.set_right(_substitute(expression=statement.right(), env={}))
+
+        return copy
+    elif isinstance(statement, Return):
+        copy = Return()
+        copy.expressions().extend(
+            _substitute(expression=expression, env={}) for expression in statement.expressions()
+        )
+
+        return copy
+    elif isinstance(statement, With):
+        copy = With()
+        copy.set_context(_substitute(expression=statement.context(), env={}))
+        copy.statements().extend(_clone_statement(nested) for nested in statement.statements())
+
+        return copy
+    elif isinstance(statement, StructDef):
+        # Immutable once type checked, so clones can share it
+        return statement
+    elif isinstance(statement, Expression):
+        return _substitute(expression=statement, env={})
+
+    raise ValueError(f"Unsupported statement {statement}")
+
+
+def _clone_function_def(
+    func_def: FunctionDef, name: str, bound_args: Mapping[int, Expression]
+) -> FunctionDef:
+    """
+    Copy of `func_def` without the parameters in `bound_args`, which become
+    locals assigned their argument at the start of the body.
+    """
+    clone = FunctionDef()
+    clone.set_name(name)
+    clone.set_return_type(func_def.return_type())
+
+    for i, param in enumerate(func_def.parameters()):
+        if i in bound_args:
+            variable = Variable()
+            variable.set_name(param.name())
+            variable.set_data_type(param.data_type())
+
+            assignment = Assignment()
+            assignment.set_left(variable)
+            assignment.set_right(_substitute(expression=bound_args[i], env={}))
+            clone.statements().append(assignment)
+        else:
+            copy = Parameter()
+            copy.set_name(param.name())
+            copy.set_data_type(param.data_type())
+            clone.parameters().append(copy)
+
+    clone.statements().extend(_clone_statement(statement) for statement in func_def.statements())
+
+    return clone
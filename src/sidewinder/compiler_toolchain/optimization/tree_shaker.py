@@ -0,0 +1,170 @@
+from typing import AbstractSet, Mapping, MutableSequence, MutableSet, Optional, Sequence
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomType,
+    BinaryOperation,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    Module,
+    Node,
+    Return,
+    Statement,
+    StructDef,
+    Subscript,
+    UnaryOperation,
+    With,
+    block_statements,
+)
+from sidewinder.compiler_toolchain.semantic.purity import PurityAnalyzer
+
+
+class TreeShaker:
+    """
+    Removes what main() can never reach: functions that are not called from
+    module-level statements, directly or through other reachable functions,
+    and module variables that are never read. Assignments to removed
+    variables keep their right-hand side if it may have side effects. The
+    builtins that remain in use are available from used_builtins().
+    """
+
+    def __init__(self):
+        self._used_builtins: AbstractSet[str] = frozenset()
+
+    def used_builtins(self) -> AbstractSet[str]:
+        return self._used_builtins
+
+    def shake(self, module: Module) -> Module:
+        # Dropping an assignment may make what it called unreachable
+        while self._shake_once(module=module):
+            pass
+
+        return module
+
+    def _shake_once(self, module: Module) -> bool:
+        func_defs: Mapping[str, FunctionDef] = {
+            statement.name(): statement
+            for statement in module.statements()
+            if isinstance(statement, FunctionDef)
+        }
+        pure_functions: AbstractSet[str] = PurityAnalyzer().pure_functions(module=module)
+
+        called: MutableSet[str] = set()
+        read: MutableSet[str] = set()
+        pending: MutableSequence[Expression] = [
+            expression
+            for statement in module.statements()
+            if not isinstance(statement, FunctionDef)
+            for expression in _expressions_of(statement=statement)
+        ]
+
+        while pending:
+            expression: Expression = pending.pop()
+
+            if isinstance(expression, Atom):
+                if expression.atom_type() == AtomType.IDENTIFIER:
+                    read.add(expression.name())
+            elif isinstance(expression, BinaryOperation):
+                pending.extend((expression.left(), expression.right()))
+            elif isinstance(expression, UnaryOperation):
+                pending.append(expression.operand())
+            elif isinstance(expression, FieldAccess):
+                pending.append(expression.value())
+            elif isinstance(expression, ListLiteral):
+                pending.extend(expression.elements())
+            elif isinstance(expression, Subscript):
+                pending.extend((expression.value(), expression.index()))
+            elif isinstance(expression, FunctionCall):
+                pending.extend(expression.arguments())
+
+                if expression.name() not in called:
+                    called.add(expression.name())
+                    func_def: Optional[FunctionDef] = func_defs.get(expression.name())
+
+                    if func_def is not None:
+                        # Default values are evaluated by the caller
+                        pending.extend(
+                            param.default_value()
+                            for param in func_def.parameters()
+                            if param.default_value() is not None
+                        )
+                        pending.extend(
+                            expression
+                            for statement in func_def.statements()
+                            for expression in _expressions_of(statement=statement)
+                        )
+
+        # Struct constructors are calls too
+        struct_names: AbstractSet[str] = {
+            statement.name()
+            for statement in block_statements(statements=module.statements())
+            if isinstance(statement, StructDef)
+        }
+        self._used_builtins = frozenset(called - func_defs.keys() - struct_names)
+
+        statements: MutableSequence[Statement] = []
+
+        for statement in module.statements():
+            if isinstance(statement, FunctionDef):
+                if statement.name() in called:
+                    statements.append(statement)
+            elif isinstance(statement, Assignment) and statement.left().name() not in read:
+                if not _is_pure(expression=statement.right(), pure_functions=pure_functions):
+                    statements.append(statement.right())
+            else:
+                statements.append(statement)
+
+        changed: bool = len(statements) != len(module.statements()) or any(
+            statement is not original
+            for statement, original in zip(statements, module.statements())
+        )
+        module.statements()[:] = statements
+
+        return changed
+
+
+def _expressions_of(statement: Node) -> Sequence[Expression]:
+    if isinstance(statement, Assignment):
+        return [statement.right()]
+    elif isinstance(statement, Return):
+        return statement.expressions()
+    elif isinstance(statement, With):
+        return [
+            expression
+            for nested in statement.statements()
+            for expression in _expressions_of(statement=nested)
+        ]
+    elif isinstance(statement, Expression):
+        return [statement]
+
+    return []
+
+
+def _is_pure(expression: Expression, pure_functions: AbstractSet[str]) -> bool:
+    if isinstance(expression, BinaryOperation):
+        return _is_pure(expression=expression.left(), pure_functions=pure_functions) and _is_pure(
+            expression=expression.right(), pure_functions=pure_functions
+        )
+    elif isinstance(expression, UnaryOperation):
+        return _is_pure(expression=expression.operand(), pure_functions=pure_functions)
+    elif isinstance(expression, FieldAccess):
+        return _is_pure(expression=expression.value(), pure_functions=pure_functions)
+    elif isinstance(expression, ListLiteral):
+        return all(
+            _is_pure(expression=element, pure_functions=pure_functions)
+            for element in expression.elements()
+        )
+    elif isinstance(expression, Subscript):
+        # Indices out of range trap
+        return False
+    elif isinstance(expression, FunctionCall):
+        return expression.name() in pure_functions and all(
+            _is_pure(expression=arg, pure_functions=pure_functions)
+            for arg in expression.arguments()
+        )
+
+    return True
@@ -1,9 +1,15 @@
 from io import TextIOBase
+from typing import Any
 
-from PythonParser import PythonParser
+try:
+    from PythonParser import PythonParser
 
-# Export
-ParseTreeNode = PythonParser.File_inputContext
+    # Export
+    ParseTreeNode = PythonParser.File_inputContext
+except ImportError:
+    # PythonParser is generated by `build_sidewinder setup` and is only needed
+    # by the ANTLR front end
+    ParseTreeNode = Any
 
 
 class ParserBase:
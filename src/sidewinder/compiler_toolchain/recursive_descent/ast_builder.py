@@ -0,0 +1,452 @@
+from typing import AbstractSet, Callable, Mapping, MutableSequence, Optional, Sequence
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomPool,
+    BinaryOperation,
+    BinaryOperator,
+    DataType,
+    DataTypeName,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    MethodCall,
+    Module,
+    Node,
+    Parameter,
+    Return,
+    Statement,
+    StructDef,
+    Subscript,
+    UnaryOperation,
+    UnaryOperator,
+    Variable,
+    With,
+)
+from sidewinder.compiler_toolchain.ast_builder import ASTBuilderBase
+from sidewinder.compiler_toolchain.lexer import TokenArray
+from sidewinder.compiler_toolchain.token_type import TokenType
+
+_data_type_names: Mapping[TokenType, DataTypeName] = {
+    TokenType.NONE: DataTypeName.NONE,
+    TokenType.BOOL: DataTypeName.BOOL,
+    TokenType.INT: DataTypeName.INT,
+    TokenType.FLOAT: DataTypeName.FLOAT,
+    TokenType.STR: DataTypeName.STR,
+    TokenType.LIST: DataTypeName.LIST,
+    TokenType.SET: DataTypeName.SET,
+    TokenType.DICT: DataTypeName.DICT,
+    TokenType.TUPLE: DataTypeName.TUPLE,
+    TokenType.OPTIONAL: DataTypeName.OPTIONAL,
+}
+
+# Tokens that may be used as an atom. Type names are included so that
+# conversions like int(x) parse as function calls.
+_atom_token_types: AbstractSet[TokenType] = {
+    TokenType.IDENTIFIER,
+    TokenType.LITERAL_NUMBER,
+    TokenType.LITERAL_STRING,
+    TokenType.TRUE,
+    TokenType.FALSE,
+    TokenType.NONE,
+    *_data_type_names,
+}
+
+_binary_operators: Mapping[TokenType, BinaryOperator] = {
+    TokenType.OR: BinaryOperator.OR,
+    TokenType.AND: BinaryOperator.AND,
+    TokenType.EQUALITY: BinaryOperator.EQUAL,
+    TokenType.INEQUALITY: BinaryOperator.NOT_EQUAL,
+    TokenType.LESS_THAN: BinaryOperator.LESS_THAN,
+    TokenType.LESS_THAN_OR_EQUAL: BinaryOperator.LESS_THAN_OR_EQUAL,
+    TokenType.GREATER_THAN: BinaryOperator.GREATER_THAN,
+    TokenType.GREATER_THAN_OR_EQUAL: BinaryOperator.GREATER_THAN_OR_EQUAL,
+    TokenType.PLUS: BinaryOperator.ADD,
+    TokenType.HYPHEN: BinaryOperator.SUBTRACT,
+    TokenType.ASTERISK: BinaryOperator.MULTIPLY,
+    TokenType.SLASH: BinaryOperator.DIVIDE,
+}
+
+# Left binding powers of infix and postfix operators, higher binds tighter
+_binding_powers: Mapping[TokenType, int] = {
+    TokenType.OR: 2,
+    TokenType.AND: 3,
+    TokenType.EQUALITY: 5,
+    TokenType.INEQUALITY: 5,
+    TokenType.LESS_THAN: 5,
+    TokenType.LESS_THAN_OR_EQUAL: 5,
+    TokenType.GREATER_THAN: 5,
+    TokenType.GREATER_THAN_OR_EQUAL: 5,
+    TokenType.PLUS: 10,
+    TokenType.HYPHEN: 10,
+    TokenType.ASTERISK: 20,
+    TokenType.SLASH: 20,
+    TokenType.LEFT_PARENS: 100,
+    TokenType.LEFT_BRACKET: 100,
+    TokenType.DOT: 100,
+}
+
+# Binding powers of the operands of prefix operators
+_not_binding_power: int = 4
+_negate_binding_power: int = 30
+
+
+class RecursiveDescentASTBuilder(ASTBuilderBase):
+    """
+    Builds AST nodes directly from the tokens produced by
+    RecursiveDescentParser. Statements are parsed by recursive descent and
+    expressions by Pratt (precedence climbing) parsing.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tokens: Optional[TokenArray] = None
+        self._types: Sequence[TokenType] = []
+        self._pos: int = 0
+        self._atom_pool: Optional[AtomPool] = None
+
+        self._infix_parsers: Mapping[TokenType, Callable[[Expression], Expression]] = {
+            **{token_type: self._parse_binary_operation for token_type in _binary_operators},
+            TokenType.LEFT_PARENS: self._parse_call,
+            TokenType.LEFT_BRACKET: self._parse_subscript,
+            TokenType.DOT: self._parse_field_access,
+        }
+
+    def generate_ast(self, parse_tree: TokenArray) -> Node:
+        self._tokens = parse_tree
+        self._types = parse_tree.token_types()
+        self._pos = 0
+
+        module = Module()
+        self._atom_pool = module.atom_pool()
+        statements: MutableSequence[Statement] = module.statements()
+
+        while not self._at(TokenType.EOF):
+            if self._accept(TokenType.NEWLINE):
+                continue
+
+            self._parse_statement(dest=statements)
+
+        return module
+
+    # Token helpers
+
+    def _peek(self) -> TokenType:
+        return self._types[self._pos]
+
+    def _at(self, token_type: TokenType) -> bool:
+        return self._types[self._pos] == token_type
+
+    def _text(self) -> str:
+        return self._tokens.text(self._pos)
+
+    def _advance(self) -> str:
+        text: str = self._tokens.text(self._pos)
+        self._pos += 1
+
+        return text
+
+    def _accept(self, token_type: TokenType) -> bool:
+        if self._types[self._pos] != token_type:
+            return False
+
+        self._pos += 1
+        return True
+
+    def _expect(self, token_type: TokenType) -> str:
+        if self._types[self._pos] != token_type:
+            self._raise_unexpected(expected=token_type.name)
+
+        return self._advance()
+
+    def _raise_unexpected(self, expected: str) -> None:
+        raise ValueError(
+            f"Line {self._tokens.line(self._pos)}: expected {expected}, "
+            f"got {self._peek().name} {self._text()!r}"
+        )
+
+    # Statements
+
+    def _parse_statement(self, dest: MutableSequence[Statement]) -> None:
+        token_type: TokenType = self._peek()
+
+        if token_type == TokenType.DEF:
+            dest.append(self._parse_function_def())
+            return
+        elif token_type == TokenType.WITH:
+            dest.append(self._parse_with())
+            return
+        elif token_type == TokenType.STRUCT:
+            dest.append(self._parse_struct_def())
+            return
+        elif token_type == TokenType.RETURN:
+            dest.append(self._parse_return())
+        elif token_type == TokenType.PASS:
+            self._advance()
+        elif token_type == TokenType.IDENTIFIER and self._types[self._pos + 1] in (
+            TokenType.COLON,
+            TokenType.EQUAL,
+        ):
+            dest.append(self._parse_assignment())
+        else:
+            dest.append(self._parse_expression())
+
+        if not self._accept(TokenType.NEWLINE) and not self._at(TokenType.EOF):
+            self._raise_unexpected(expected="end of statement")
+
+    def _parse_block(self, dest: MutableSequence[Statement]) -> None:
+        self._expect(TokenType.COLON)
+        self._expect(TokenType.NEWLINE)
+        self._expect(TokenType.INDENT)
+
+        while not self._accept(TokenType.DEDENT):
+            if self._at(TokenType.EOF):
+                self._raise_unexpected(expected=TokenType.DEDENT.name)
+
+            self._parse_statement(dest=dest)
+
+    def _parse_function_def(self) -> FunctionDef:
+        self._expect(TokenType.DEF)
+
+        node = FunctionDef()
+        node.set_name(self._expect(TokenType.IDENTIFIER))
+
+        self._expect(TokenType.LEFT_PARENS)
+
+        while not self._accept(TokenType.RIGHT_PARENS):
+            node.parameters().append(self._parse_parameter())
+
+            if not self._at(TokenType.RIGHT_PARENS):
+                self._expect(TokenType.COMMA)
+
+        if self._accept(TokenType.ARROW):
+            node.set_return_type(self._parse_data_type())
+
+        self._parse_block(dest=node.statements())
+
+        return node
+
+    def _parse_with(self) -> With:
+        self._expect(TokenType.WITH)
+
+        node = With()
+        node.set_context(self._parse_expression())
+        self._parse_block(dest=node.statements())
+
+        return node
+
+    def _parse_struct_def(self) -> StructDef:
+        self._expect(TokenType.STRUCT)
+
+        node = StructDef()
+        node.set_name(self._expect(TokenType.IDENTIFIER))
+
+        self._expect(TokenType.COLON)
+        self._expect(TokenType.NEWLINE)
+        self._expect(TokenType.INDENT)
+
+        # One field per line, or pass if there are none
+        while not self._accept(TokenType.DEDENT):
+            if not self._accept(TokenType.PASS):
+                node.fields().append(self._parse_parameter())
+
+            self._expect(TokenType.NEWLINE)
+
+        return node
+
+    def _parse_parameter(self) -> Parameter:
+        node = Parameter()
+        node.set_name(self._expect(TokenType.IDENTIFIER))
+
+        self._expect(TokenType.COLON)
+        node.set_data_type(self._parse_data_type())
+
+        if self._accept(TokenType.EQUAL):
+            node.set_default_value(self._parse_expression())
+
+        return node
+
+    def _parse_data_type(self) -> DataType:
+        name: Optional[DataTypeName] = _data_type_names.get(self._peek())
+
+        # Other names refer to structs
+        if name is None and not self._at(TokenType.IDENTIFIER):
+            self._raise_unexpected(expected="type")
+
+        text: str = self._advance()
+        parameters: MutableSequence[DataType] = []
+
+        if name is not None and self._accept(TokenType.LEFT_BRACKET):
+            parameters.append(self._parse_data_type())
+
+            while self._accept(TokenType.COMMA):
+                parameters.append(self._parse_data_type())
+
+            self._expect(TokenType.RIGHT_BRACKET)
+
+        data_type = (
+            DataType(name=name, parameters=parameters)
+            if name is not None
+            else DataType.struct_reference(name=text)
+        )
+
+        # T? is shorthand for Optional[T]
+        while self._accept(TokenType.QUESTION_MARK):
+            data_type = DataType(name=DataTypeName.OPTIONAL, parameters=(data_type,))
+
+        return data_type
+
+    def _parse_return(self) -> Return:
+        self._expect(TokenType.RETURN)
+
+        node = Return()
+
+        if self._at(TokenType.NEWLINE) or self._at(TokenType.EOF):
+            return node
+
+        node.expressions().append(self._parse_expression())
+
+        while self._accept(TokenType.COMMA):
+            node.expressions().append(self._parse_expression())
+
+        return node
+
+    def _parse_assignment(self) -> Assignment:
+        variable = Variable()
+        variable.set_name(self._expect(TokenType.IDENTIFIER))
+
+        if self._accept(TokenType.COLON):
+            variable.set_data_type(self._parse_data_type())
+
+        self._expect(TokenType.EQUAL)
+
+        node = Assignment()
+        node.set_left(variable)
+        node.set_right(self._parse_expression())
+
+        return node
+
+    # Expressions
+
+    def _parse_expression(self, min_binding_power: int = 0) -> Expression:
+        left: Expression = self._parse_prefix()
+
+        while True:
+            binding_power: int = _binding_powers.get(self._peek(), -1)
+
+            if binding_power <= min_binding_power:
+                return left
+
+            left = self._infix_parsers[self._peek()](left)
+
+    def _parse_prefix(self) -> Expression:
+        token_type: TokenType = self._peek()
+
+        if token_type in _atom_token_types:
+            index: int = self._atom_pool.intern_token(text=self._advance(), token_type=token_type)
+
+            return Atom(pool=self._atom_pool, index=index)
+        elif token_type == TokenType.HYPHEN and self._types[self._pos + 1] == (
+            TokenType.LITERAL_NUMBER
+        ):
+            # Negative literals are a single atom
+            self._advance()
+            index = self._atom_pool.intern_token(
+                text="-" + self._advance(), token_type=TokenType.LITERAL_NUMBER
+            )
+
+            return Atom(pool=self._atom_pool, index=index)
+        elif token_type == TokenType.HYPHEN:
+            self._advance()
+            node = UnaryOperation(operator=UnaryOperator.NEGATE)
+            node.set_operand(self._parse_expression(min_binding_power=_negate_binding_power))
+
+            return node
+        elif token_type == TokenType.NOT:
+            self._advance()
+            node = UnaryOperation(operator=UnaryOperator.NOT)
+            node.set_operand(self._parse_expression(min_binding_power=_not_binding_power))
+
+            return node
+        elif token_type == TokenType.LEFT_PARENS:
+            self._advance()
+            expression: Expression = self._parse_expression()
+            self._expect(TokenType.RIGHT_PARENS)
+
+            return expression
+        elif token_type == TokenType.LEFT_BRACKET:
+            self._advance()
+            node = ListLiteral()
+
+            while not self._accept(TokenType.RIGHT_BRACKET):
+                node.elements().append(self._parse_expression())
+
+                if not self._at(TokenType.RIGHT_BRACKET):
+                    self._expect(TokenType.COMMA)
+
+            return node
+
+        self._raise_unexpected(expected="expression")
+
+    def _parse_binary_operation(self, left: Expression) -> Expression:
+        token_type: TokenType = self._peek()
+        binding_power: int = _binding_powers[token_type]
+        self._advance()
+
+        node: BinaryOperation = BinaryOperation.for_operator(_binary_operators[token_type])
+        node.set_left(left)
+        node.set_right(self._parse_expression(min_binding_power=binding_power))
+
+        # Chained comparisons like a < b < c are not supported, as in the
+        # ANTLR front end, rather than parsed as (a < b) < c
+        if node.operator().is_comparison() and self._peek() in _binary_operators:
+            if _binary_operators[self._peek()].is_comparison():
+                raise ValueError(
+                    f"Line {self._tokens.line(self._pos)}: Unsupported chained comparison"
+                )
+
+        return node
+
+    def _parse_call(self, left: Expression) -> Expression:
+        if isinstance(left, FieldAccess):
+            node: FunctionCall = MethodCall()
+            node.set_name(left.name())
+            node.arguments().append(left.value())
+        elif isinstance(left, Atom) and left.name()[:1].isidentifier():
+            node = FunctionCall()
+            node.set_name(left.name())
+        else:
+            self._raise_unexpected(expected="end of expression")
+
+        self._expect(TokenType.LEFT_PARENS)
+
+        while not self._accept(TokenType.RIGHT_PARENS):
+            node.arguments().append(self._parse_expression())
+
+            if not self._at(TokenType.RIGHT_PARENS):
+                self._expect(TokenType.COMMA)
+
+        return node
+
+    def _parse_field_access(self, left: Expression) -> Expression:
+        self._expect(TokenType.DOT)
+
+        node = FieldAccess()
+        node.set_value(left)
+        node.set_name(self._expect(TokenType.IDENTIFIER))
+
+        return node
+
+    def _parse_subscript(self, left: Expression) -> Expression:
+        self._expect(TokenType.LEFT_BRACKET)
+
+        node = Subscript()
+        node.set_value(left)
+        node.set_index(self._parse_expression())
+
+        self._expect(TokenType.RIGHT_BRACKET)
+
+        return node
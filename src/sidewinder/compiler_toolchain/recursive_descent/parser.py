@@ -0,0 +1,20 @@
+from io import TextIOBase
+from typing import Optional
+
+from sidewinder.compiler_toolchain.lexer import Lexer, TokenArray
+from sidewinder.compiler_toolchain.parser import ParserBase
+
+
+class RecursiveDescentParser(ParserBase):
+    """
+    Front half of the recursive-descent front end. There is no parse tree, so
+    parsing only lexes the input and RecursiveDescentASTBuilder builds AST
+    nodes straight from the resulting tokens.
+    """
+
+    def __init__(self, lexer: Optional[Lexer] = None):
+        super().__init__()
+        self._lexer: Lexer = lexer if lexer is not None else Lexer()
+
+    def parse(self, input: TextIOBase) -> TokenArray:
+        return self._lexer.lex(input=input)
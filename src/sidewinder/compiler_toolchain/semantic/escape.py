@@ -0,0 +1,435 @@
+from collections import defaultdict
+from typing import (
+    AbstractSet,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Optional,
+    Sequence,
+)
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomType,
+    BinaryOperation,
+    DataType,
+    DataTypeName,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    Module,
+    Node,
+    Return,
+    Statement,
+    Subscript,
+    UnaryOperation,
+    With,
+    block_statements,
+)
+
+# Types whose values are references to objects rather than plain values
+_object_data_type_names: AbstractSet[DataTypeName] = frozenset(
+    (DataTypeName.STR, DataTypeName.LIST, DataTypeName.SET, DataTypeName.DICT)
+)
+
+# Builtins that only read their arguments while they run
+_non_capturing_builtins: AbstractSet[str] = frozenset(("print", "len"))
+# Builtin methods that store their second argument in their receiver
+_storing_methods: AbstractSet[str] = frozenset(("list.append",))
+
+
+def is_object_type(data_type: DataType) -> bool:
+    if data_type.name() == DataTypeName.OPTIONAL:
+        return is_object_type(data_type=data_type.parameters()[0])
+
+    return data_type.name() in _object_data_type_names
+
+
+class EscapeAnalyzer:
+    """
+    Finds the object parameters and locals of each module-level function that
+    do not escape it: they are never returned, passed to a function that lets
+    them escape, stored in a list that escapes, or read by a nested function,
+    and neither is any variable they were assigned to. Module variables are
+    globals, so they always escape. Objects that do not escape need neither a
+    heap allocation nor reference counting, and can be kept in SSA values or
+    on the stack.
+    """
+
+    def non_escaping_variables(self, module: Module) -> Mapping[str, AbstractSet[str]]:
+        func_defs: Mapping[str, FunctionDef] = _func_defs(module=module)
+        escaping: Mapping[str, AbstractSet[str]] = self._escaping_in_functions(func_defs=func_defs)
+
+        return {
+            name: frozenset(_object_variables(func_def=func_def) - escaping[name])
+            for name, func_def in func_defs.items()
+        }
+
+    def arena_list_literals(self, module: Module) -> AbstractSet[ListLiteral]:
+        """
+        The list literals in `with arena():` blocks whose lists cannot outlive
+        the innermost block they are created in, so that they can be allocated
+        in its arena. A list qualifies if it is assigned to a variable that
+        does not escape the function, or main(), and that, like every variable
+        it is assigned to, is not mentioned after the block, or if it is
+        passed to a call that does not let it escape.
+        """
+        func_defs: Mapping[str, FunctionDef] = _func_defs(module=module)
+        escaping: Mapping[str, AbstractSet[str]] = self._escaping_in_functions(func_defs=func_defs)
+        result: MutableSet[ListLiteral] = set()
+
+        for statements, local_names in [
+            *(
+                (func_def.statements(), _local_names(func_def=func_def))
+                for func_def in func_defs.values()
+            ),
+            (module.statements(), None),
+        ]:
+            aliases: MutableMapping[str, MutableSet[str]] = defaultdict(set)
+            scope_escaping: AbstractSet[str] = self._escaping_variables(
+                statements=statements,
+                local_names=local_names,
+                func_defs=func_defs,
+                escaping=escaping,
+                aliases=aliases,
+            )
+
+            for statement in block_statements(statements=statements):
+                if isinstance(statement, With):
+                    result |= self._arena_list_literals(
+                        block=statement,
+                        statements=statements,
+                        func_defs=func_defs,
+                        escaping=escaping,
+                        scope_escaping=scope_escaping,
+                        aliases=aliases,
+                    )
+
+        return frozenset(result)
+
+    def _escaping_in_functions(
+        self, func_defs: Mapping[str, FunctionDef]
+    ) -> Mapping[str, AbstractSet[str]]:
+        escaping: MutableMapping[str, AbstractSet[str]] = {name: frozenset() for name in func_defs}
+
+        # An argument escapes if its parameter does, so iterate until no more
+        # parameters escape. Escaping sets only grow, which bounds the loop.
+        changed: bool = True
+
+        while changed:
+            changed = False
+
+            for name, func_def in func_defs.items():
+                func_escaping: AbstractSet[str] = self._escaping_variables(
+                    statements=func_def.statements(),
+                    local_names=_local_names(func_def=func_def),
+                    func_defs=func_defs,
+                    escaping=escaping,
+                    aliases=defaultdict(set),
+                )
+
+                if func_escaping != escaping[name]:
+                    escaping[name] = func_escaping
+                    changed = True
+
+        return escaping
+
+    def _escaping_variables(
+        self,
+        statements: Sequence[Statement],
+        local_names: Optional[AbstractSet[str]],
+        func_defs: Mapping[str, FunctionDef],
+        escaping: Mapping[str, AbstractSet[str]],
+        aliases: MutableMapping[str, MutableSet[str]],
+    ) -> AbstractSet[str]:
+        """
+        The variables of a function body, or of the module if `local_names` is
+        None, that escape it. Variables that may refer to the same object are
+        added to `aliases`, in both directions.
+        """
+        result: MutableSet[str] = set()
+        calls: MutableSequence[FunctionCall] = []
+
+        for statement in block_statements(statements=statements):
+            if isinstance(statement, Assignment):
+                _add_aliases(
+                    names={statement.left().name()},
+                    others=_referenced_variables(expression=statement.right()),
+                    aliases=aliases,
+                )
+                _collect_calls(node=statement.right(), dest=calls)
+            elif isinstance(statement, Return):
+                for expression in statement.expressions():
+                    result |= _referenced_variables(expression=expression)
+                    _collect_calls(node=expression, dest=calls)
+            elif isinstance(statement, FunctionDef):
+                # Captured by the nested function, which may outlive the call
+                result |= _read_identifiers(node=statement)
+            elif isinstance(statement, Expression):
+                _collect_calls(node=statement, dest=calls)
+
+        for call in calls:
+            if _is_storing_method(call=call, func_defs=func_defs):
+                # The value lives as long as the list it is stored in, which
+                # escapes if it is a global
+                receiver, value = call.arguments()
+                receivers: AbstractSet[str] = _referenced_variables(expression=receiver)
+                _add_aliases(
+                    names=receivers, others=_referenced_variables(expression=value), aliases=aliases
+                )
+
+                if local_names is not None:
+                    result |= receivers - local_names
+
+                continue
+
+            for i, arg in enumerate(call.arguments()):
+                if _captures(call=call, index=i, func_defs=func_defs, escaping=escaping):
+                    result |= _referenced_variables(expression=arg)
+
+        return _alias_closure(names=result, aliases=aliases)
+
+    def _arena_list_literals(
+        self,
+        block: With,
+        statements: Sequence[Statement],
+        func_defs: Mapping[str, FunctionDef],
+        escaping: Mapping[str, AbstractSet[str]],
+        scope_escaping: AbstractSet[str],
+        aliases: Mapping[str, AbstractSet[str]],
+    ) -> AbstractSet[ListLiteral]:
+        inside: AbstractSet[int] = {
+            id(statement) for statement in block_statements(statements=block.statements())
+        }
+        # Nested with blocks are walked through their statements
+        mentioned_outside: AbstractSet[str] = frozenset().union(
+            *(
+                _mentioned_variables(statement=statement)
+                for statement in block_statements(statements=statements)
+                if id(statement) not in inside and not isinstance(statement, With)
+            )
+        )
+        result: MutableSet[ListLiteral] = set()
+        calls: MutableSequence[FunctionCall] = []
+
+        # Lists created in nested with blocks belong to their arenas
+        for statement in block.statements():
+            if isinstance(statement, Assignment):
+                name: str = statement.left().name()
+
+                if name not in scope_escaping and not (
+                    _alias_closure(names={name}, aliases=aliases) & mentioned_outside
+                ):
+                    result |= _owned_list_literals(expression=statement.right())
+
+                _collect_calls(node=statement.right(), dest=calls)
+            elif isinstance(statement, Return):
+                for expression in statement.expressions():
+                    _collect_calls(node=expression, dest=calls)
+            elif isinstance(statement, Expression):
+                _collect_calls(node=statement, dest=calls)
+
+        for call in calls:
+            if _is_storing_method(call=call, func_defs=func_defs):
+                continue
+
+            for i, arg in enumerate(call.arguments()):
+                if not _captures(call=call, index=i, func_defs=func_defs, escaping=escaping):
+                    result |= _owned_list_literals(expression=arg)
+
+        return frozenset(result)
+
+
+def _func_defs(module: Module) -> Mapping[str, FunctionDef]:
+    return {
+        statement.name(): statement
+        for statement in module.statements()
+        if isinstance(statement, FunctionDef)
+    }
+
+
+def _local_names(func_def: FunctionDef) -> AbstractSet[str]:
+    names: MutableSet[str] = {param.name() for param in func_def.parameters()}
+    names.update(
+        statement.left().name()
+        for statement in block_statements(statements=func_def.statements())
+        if isinstance(statement, Assignment)
+    )
+
+    return names
+
+
+def _is_storing_method(call: FunctionCall, func_defs: Mapping[str, FunctionDef]) -> bool:
+    return call.name() not in func_defs and call.name() in _storing_methods
+
+
+def _captures(
+    call: FunctionCall,
+    index: int,
+    func_defs: Mapping[str, FunctionDef],
+    escaping: Mapping[str, AbstractSet[str]],
+) -> bool:
+    """
+    Whether the object passed as argument `index` of `call` may outlive it.
+    """
+    callee: Optional[FunctionDef] = func_defs.get(call.name())
+
+    if callee is None:
+        return call.name() not in _non_capturing_builtins
+
+    return (
+        index >= len(callee.parameters())
+        or callee.parameters()[index].name() in escaping[callee.name()]
+    )
+
+
+def _add_aliases(
+    names: AbstractSet[str], others: AbstractSet[str], aliases: MutableMapping[str, MutableSet[str]]
+) -> None:
+    for name in names:
+        for other in others:
+            aliases[name].add(other)
+            aliases[other].add(name)
+
+
+def _alias_closure(
+    names: AbstractSet[str], aliases: Mapping[str, AbstractSet[str]]
+) -> AbstractSet[str]:
+    result: MutableSet[str] = set(names)
+    pending: MutableSequence[str] = list(result)
+
+    while pending:
+        for alias in aliases.get(pending.pop(), ()):
+            if alias not in result:
+                result.add(alias)
+                pending.append(alias)
+
+    return frozenset(result)
+
+
+def _owned_list_literals(expression: Expression) -> AbstractSet[ListLiteral]:
+    """
+    The list literals that `expression` evaluates to, and those stored in
+    them, which live exactly as long as its value.
+    """
+    if not isinstance(expression, ListLiteral):
+        return frozenset()
+
+    return frozenset((expression,)).union(
+        *(_owned_list_literals(expression=element) for element in expression.elements())
+    )
+
+
+def _mentioned_variables(statement: Statement) -> AbstractSet[str]:
+    if isinstance(statement, Assignment):
+        return _read_identifiers(node=statement) | {statement.left().name()}
+
+    return _read_identifiers(node=statement)
+
+
+def _object_variables(func_def: FunctionDef) -> AbstractSet[str]:
+    names: MutableSet[str] = {
+        param.name() for param in func_def.parameters() if is_object_type(param.data_type())
+    }
+    names.update(
+        statement.left().name()
+        for statement in block_statements(statements=func_def.statements())
+        if isinstance(statement, Assignment) and is_object_type(statement.left().data_type())
+    )
+
+    return names
+
+
+def _referenced_variables(expression: Expression) -> AbstractSet[str]:
+    """
+    Variables whose object `expression` may evaluate to. Calls return objects
+    of their own, which alias an argument only if the callee let it escape.
+    """
+    if isinstance(expression, Atom):
+        if expression.atom_type() == AtomType.IDENTIFIER:
+            return frozenset((expression.name(),))
+    elif isinstance(expression, BinaryOperation):
+        return _referenced_variables(expression=expression.left()) | _referenced_variables(
+            expression=expression.right()
+        )
+    elif isinstance(expression, UnaryOperation):
+        return _referenced_variables(expression=expression.operand())
+    elif isinstance(expression, FieldAccess):
+        return _referenced_variables(expression=expression.value())
+    elif isinstance(expression, ListLiteral):
+        # Elements stored in a list live as long as it does
+        return frozenset().union(
+            *(_referenced_variables(expression=element) for element in expression.elements())
+        )
+    elif isinstance(expression, Subscript):
+        # Elements that are plain values are copied out of the list
+        if is_object_type(expression.data_type()) or expression.data_type().struct_name():
+            return _referenced_variables(expression=expression.value())
+
+    return frozenset()
+
+
+def _collect_calls(node: Expression, dest: MutableSequence[FunctionCall]) -> None:
+    if isinstance(node, BinaryOperation):
+        _collect_calls(node=node.left(), dest=dest)
+        _collect_calls(node=node.right(), dest=dest)
+    elif isinstance(node, UnaryOperation):
+        _collect_calls(node=node.operand(), dest=dest)
+    elif isinstance(node, FieldAccess):
+        _collect_calls(node=node.value(), dest=dest)
+    elif isinstance(node, ListLiteral):
+        for element in node.elements():
+            _collect_calls(node=element, dest=dest)
+    elif isinstance(node, Subscript):
+        _collect_calls(node=node.value(), dest=dest)
+        _collect_calls(node=node.index(), dest=dest)
+    elif isinstance(node, FunctionCall):
+        dest.append(node)
+
+        for arg in node.arguments():
+            _collect_calls(node=arg, dest=dest)
+
+
+def _read_identifiers(node: Node) -> AbstractSet[str]:
+    if isinstance(node, Atom):
+        return _referenced_variables(expression=node)
+    elif isinstance(node, BinaryOperation):
+        return _read_identifiers(node=node.left()) | _read_identifiers(node=node.right())
+    elif isinstance(node, UnaryOperation):
+        return _read_identifiers(node=node.operand())
+    elif isinstance(node, FieldAccess):
+        return _read_identifiers(node=node.value())
+    elif isinstance(node, ListLiteral):
+        return frozenset().union(*(_read_identifiers(node=element) for element in node.elements()))
+    elif isinstance(node, Subscript):
+        return _read_identifiers(node=node.value()) | _read_identifiers(node=node.index())
+    elif isinstance(node, FunctionCall):
+        return frozenset().union(*(_read_identifiers(node=arg) for arg in node.arguments()))
+    elif isinstance(node, Assignment):
+        return _read_identifiers(node=node.right())
+    elif isinstance(node, Return):
+        return frozenset().union(
+            *(_read_identifiers(node=expression) for expression in node.expressions())
+        )
+    elif isinstance(node, With):
+        return frozenset().union(
+            *(_read_identifiers(node=statement) for statement in node.statements())
+        )
+    elif isinstance(node, FunctionDef):
+        defaults: AbstractSet[str] = frozenset().union(
+            *(
+                _read_identifiers(node=param.default_value())
+                for param in node.parameters()
+                if param.default_value() is not None
+            )
+        )
+
+        return defaults.union(
+            *(_read_identifiers(node=statement) for statement in node.statements())
+        )
+
+    return frozenset()
@@ -0,0 +1,156 @@
+from typing import (
+    AbstractSet,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Optional,
+    Sequence,
+)
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomType,
+    BinaryOperation,
+    DataTypeName,
+    Expression,
+    FunctionCall,
+    FunctionDef,
+    Module,
+    Return,
+    UnaryOperation,
+)
+
+# Values that can cross the boundary of a compile-time call
+_evaluable_data_type_names: AbstractSet[DataTypeName] = frozenset(
+    (DataTypeName.BOOL, DataTypeName.INT, DataTypeName.FLOAT)
+)
+
+_constant_names: AbstractSet[str] = frozenset(("True", "False", "None"))
+
+
+class PurityAnalyzer:
+    """
+    Finds the module-level functions that can be evaluated at compile time:
+    they only read their parameters and locals, only call other such
+    functions, are not recursive (so evaluation always terminates), and take
+    and return primitive values.
+    """
+
+    def __init__(self):
+        self._func_defs: Mapping[str, FunctionDef] = {}
+
+    def pure_functions(self, module: Module) -> AbstractSet[str]:
+        func_defs: Mapping[str, FunctionDef] = {
+            statement.name(): statement
+            for statement in module.statements()
+            if isinstance(statement, FunctionDef)
+        }
+        self._func_defs = func_defs
+        callees: MutableMapping[str, AbstractSet[str]] = {}
+
+        for name, func_def in func_defs.items():
+            func_callees: Optional[AbstractSet[str]] = self._local_callees(func_def=func_def)
+
+            if func_callees is not None:
+                callees[name] = func_callees
+
+        # Drop functions that call impure functions, until nothing changes
+        changed: bool = True
+
+        while changed:
+            changed = False
+
+            for name in list(callees):
+                if not callees[name] <= callees.keys():
+                    del callees[name]
+                    changed = True
+
+        return frozenset(
+            name for name in callees if not self._is_recursive(name=name, callees=callees)
+        )
+
+    def _local_callees(self, func_def: FunctionDef) -> Optional[AbstractSet[str]]:
+        """
+        Functions called by `func_def`, or None if its body has side effects
+        or reads non-local state.
+        """
+        if func_def.return_type().name() not in _evaluable_data_type_names or any(
+            param.data_type().name() not in _evaluable_data_type_names
+            for param in func_def.parameters()
+        ):
+            return None
+
+        local_names: MutableSet[str] = {param.name() for param in func_def.parameters()}
+        func_callees: MutableSet[str] = set()
+
+        for statement in func_def.statements():
+            if isinstance(statement, Assignment):
+                if not self._collect_callees(
+                    node=statement.right(), local_names=local_names, dest=func_callees
+                ):
+                    return None
+
+                local_names.add(statement.left().name())
+            elif isinstance(statement, Return):
+                for expression in statement.expressions():
+                    if not self._collect_callees(
+                        node=expression, local_names=local_names, dest=func_callees
+                    ):
+                        return None
+            else:
+                # Expression statements are only useful for their side effects
+                return None
+
+        return func_callees
+
+    def _collect_callees(
+        self, node: Expression, local_names: AbstractSet[str], dest: MutableSet[str]
+    ) -> bool:
+        if isinstance(node, Atom):
+            return node.atom_type() != AtomType.IDENTIFIER or (
+                node.name() in local_names or node.name() in _constant_names
+            )
+        elif isinstance(node, BinaryOperation):
+            return self._collect_callees(
+                node=node.left(), local_names=local_names, dest=dest
+            ) and self._collect_callees(node=node.right(), local_names=local_names, dest=dest)
+        elif isinstance(node, UnaryOperation):
+            return self._collect_callees(node=node.operand(), local_names=local_names, dest=dest)
+        elif isinstance(node, FunctionCall):
+            dest.add(node.name())
+            func_def: Optional[FunctionDef] = self._func_defs.get(node.name())
+            # The caller evaluates the defaults of missing arguments, in the
+            # module scope, where there are no locals
+            defaults: Sequence[Expression] = (
+                [param.default_value() for param in func_def.parameters()[len(node.arguments()) :]]
+                if func_def is not None
+                else []
+            )
+
+            return all(
+                self._collect_callees(node=arg, local_names=local_names, dest=dest)
+                for arg in node.arguments()
+            ) and all(
+                self._collect_callees(node=default, local_names=frozenset(), dest=dest)
+                for default in defaults
+            )
+
+        return False
+
+    def _is_recursive(self, name: str, callees: Mapping[str, AbstractSet[str]]) -> bool:
+        visited: MutableSet[str] = set()
+        stack: MutableSequence[str] = list(callees[name])
+
+        while stack:
+            callee: str = stack.pop()
+
+            if callee == name:
+                return True
+
+            if callee not in visited:
+                visited.add(callee)
+                stack.extend(callees[callee])
+
+        return False
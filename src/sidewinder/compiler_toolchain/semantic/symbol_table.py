@@ -0,0 +1,85 @@
+from enum import Enum, auto
+from typing import MutableMapping, Optional
+
+from sidewinder.compiler_toolchain.ast import DataType, FunctionDef, StructDef
+
+
+class SymbolKind(Enum):
+    VARIABLE = auto()
+    FUNCTION = auto()
+    BUILTIN_FUNCTION = auto()
+    STRUCT = auto()
+
+
+class Symbol:
+    def __init__(
+        self,
+        name: str,
+        kind: SymbolKind,
+        data_type: Optional[DataType] = None,
+        func_def: Optional[FunctionDef] = None,
+        struct_def: Optional[StructDef] = None,
+    ):
+        self._name: str = name
+        self._kind: SymbolKind = kind
+        self._data_type: Optional[DataType] = data_type
+        self._func_def: Optional[FunctionDef] = func_def
+        self._struct_def: Optional[StructDef] = struct_def
+
+    def name(self) -> str:
+        return self._name
+
+    def kind(self) -> SymbolKind:
+        return self._kind
+
+    def data_type(self) -> Optional[DataType]:
+        return self._data_type
+
+    def func_def(self) -> Optional[FunctionDef]:
+        return self._func_def
+
+    def struct_def(self) -> Optional[StructDef]:
+        return self._struct_def
+
+
+class Scope:
+    """
+    A lexical scope. Lookups that miss fall through to the parent scope.
+    """
+
+    def __init__(self, parent: Optional["Scope"] = None, func_def: Optional[FunctionDef] = None):
+        self._parent: Optional[Scope] = parent
+        self._func_def: Optional[FunctionDef] = func_def
+        self._symbols: MutableMapping[str, Symbol] = {}
+
+    def parent(self) -> Optional["Scope"]:
+        return self._parent
+
+    def enclosing_function(self) -> Optional[FunctionDef]:
+        """
+        The function whose body this scope is, if any.
+        """
+        return self._func_def
+
+    def declare(self, symbol: Symbol) -> Symbol:
+        if symbol.name() in self._symbols:
+            raise ValueError(f"{symbol.name()} is already defined in this scope")
+
+        self._symbols[symbol.name()] = symbol
+        return symbol
+
+    def lookup_local(self, name: str) -> Optional[Symbol]:
+        return self._symbols.get(name)
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        scope: Optional[Scope] = self
+
+        while scope is not None:
+            symbol: Optional[Symbol] = scope._symbols.get(name)
+
+            if symbol is not None:
+                return symbol
+
+            scope = scope._parent
+
+        return None
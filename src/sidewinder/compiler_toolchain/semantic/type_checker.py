@@ -0,0 +1,631 @@
+from dataclasses import dataclass
+from typing import AbstractSet, Mapping, MutableMapping, MutableSet, Optional, Sequence
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    Atom,
+    AtomType,
+    BinaryOperation,
+    BinaryOperator,
+    DataType,
+    DataTypeName,
+    Expression,
+    FieldAccess,
+    FunctionCall,
+    FunctionDef,
+    ListLiteral,
+    MethodCall,
+    Module,
+    Node,
+    Return,
+    Statement,
+    StructDef,
+    Subscript,
+    UnaryOperation,
+    UnaryOperator,
+    With,
+)
+from sidewinder.compiler_toolchain.semantic.symbol_table import Scope, Symbol, SymbolKind
+
+
+@dataclass(frozen=True)
+class FunctionSignature:
+    name: str
+    parameter_types: Sequence[DataType]
+    # Parameters after this many have default values
+    num_required: int
+    return_type: DataType
+    variadic: bool = False
+
+
+_builtin_signatures: Mapping[str, FunctionSignature] = {
+    "print": FunctionSignature(
+        name="print",
+        parameter_types=(),
+        num_required=0,
+        return_type=DataType.none_type(),
+        variadic=True,
+    ),
+}
+
+# Builtins that take a list, whose signatures depend on its element type
+_list_builtin_names: AbstractSet[str] = frozenset(("len",))
+
+# Builtin methods, by receiver type
+_method_names: Mapping[DataTypeName, AbstractSet[str]] = {
+    DataTypeName.LIST: frozenset(("append",)),
+}
+
+# Only usable as the context of a with statement, and take no arguments
+_builtin_context_managers: AbstractSet[str] = frozenset(("arena",))
+
+_builtin_constants: Mapping[str, DataTypeName] = {
+    "True": DataTypeName.BOOL,
+    "False": DataTypeName.BOOL,
+    "None": DataTypeName.NONE,
+}
+
+_numeric_type_names = (DataTypeName.INT, DataTypeName.FLOAT)
+
+
+def _list_builtin_signature(name: str, arg_types: Sequence[DataType]) -> FunctionSignature:
+    """
+    The signature of len() or of a method of lists, such as list.append, for
+    a call whose first argument is of type `arg_types[0]`.
+    """
+    if not arg_types or arg_types[0].name() != DataTypeName.LIST:
+        raise ValueError(f"{name} takes a list")
+
+    list_type: DataType = arg_types[0]
+
+    if name == "len":
+        return FunctionSignature(
+            name=name,
+            parameter_types=(list_type,),
+            num_required=1,
+            return_type=DataType(name=DataTypeName.INT),
+        )
+
+    # list.append
+    return FunctionSignature(
+        name=name,
+        parameter_types=(list_type, list_type.parameters()[0]),
+        num_required=2,
+        return_type=DataType.none_type(),
+    )
+
+
+def is_assignable(source: DataType, target: DataType) -> bool:
+    """
+    Whether a value of type `source` can be stored in a `target`. The implicit
+    conversions are int to float and T or None to Optional[T].
+    """
+    # Data types are interned, so equality is identity
+    if source is target:
+        return True
+
+    if target.name() == DataTypeName.OPTIONAL:
+        return source.name() == DataTypeName.NONE or is_assignable(
+            source=source, target=target.parameters()[0]
+        )
+
+    return source.name() == DataTypeName.INT and target.name() == DataTypeName.FLOAT
+
+
+class TypeChecker:
+    """
+    Resolves the DataType of every expression and variable in a module and
+    checks that calls, assignments and returns are well typed. Function
+    signatures are resolved once and memoized. Type annotations that name a
+    struct are replaced by its type, which has the types of its fields.
+    """
+
+    def __init__(self):
+        self._signatures: MutableMapping[FunctionDef, FunctionSignature] = {}
+        self._struct_types: MutableMapping[StructDef, DataType] = {}
+        # Structs whose fields are being resolved, to reject recursive ones
+        self._resolving: MutableSet[StructDef] = set()
+
+    def check(self, module: Module) -> Module:
+        scope = Scope()
+
+        for name in (*_builtin_signatures, *_list_builtin_names):
+            scope.declare(Symbol(name=name, kind=SymbolKind.BUILTIN_FUNCTION))
+
+        for name, type_name in _builtin_constants.items():
+            scope.declare(
+                Symbol(name=name, kind=SymbolKind.VARIABLE, data_type=DataType(name=type_name))
+            )
+
+        self._check_block(statements=module.statements(), scope=Scope(parent=scope))
+
+        return module
+
+    def signature(self, func_def: FunctionDef) -> FunctionSignature:
+        signature: Optional[FunctionSignature] = self._signatures.get(func_def)
+
+        if signature is None:
+            num_required: int = 0
+
+            for i, param in enumerate(func_def.parameters()):
+                if param.default_value() is None:
+                    if num_required != i:
+                        raise ValueError(
+                            f"Parameter {param.name()} of {func_def.name()} without a "
+                            "default follows one with a default"
+                        )
+
+                    num_required += 1
+
+            signature = FunctionSignature(
+                name=func_def.name(),
+                parameter_types=tuple(param.data_type() for param in func_def.parameters()),
+                num_required=num_required,
+                return_type=func_def.return_type(),
+            )
+            self._signatures[func_def] = signature
+
+        return signature
+
+    def _check_block(self, statements: Sequence[Statement], scope: Scope) -> None:
+        # Functions and structs are visible to the whole block, so that they
+        # can be used before they are defined
+        for statement in statements:
+            if isinstance(statement, FunctionDef):
+                scope.declare(
+                    Symbol(name=statement.name(), kind=SymbolKind.FUNCTION, func_def=statement)
+                )
+            elif isinstance(statement, StructDef):
+                scope.declare(
+                    Symbol(name=statement.name(), kind=SymbolKind.STRUCT, struct_def=statement)
+                )
+
+        # Signatures are memoized, so their structs are resolved first
+        for statement in statements:
+            if isinstance(statement, StructDef):
+                self._resolve_struct(struct_def=statement, scope=scope)
+            elif isinstance(statement, FunctionDef):
+                for param in statement.parameters():
+                    if param.is_complete():
+                        param.set_data_type(
+                            self._resolve_data_type(data_type=param.data_type(), scope=scope)
+                        )
+
+                if statement.is_complete():
+                    statement.set_return_type(
+                        self._resolve_data_type(data_type=statement.return_type(), scope=scope)
+                    )
+
+        for statement in statements:
+            self._check_statement(statement=statement, scope=scope)
+
+        # Bodies are checked last, so that they can use variables of the block
+        # that are assigned after the function is defined
+        for statement in statements:
+            if isinstance(statement, FunctionDef):
+                self._check_function_body(func_def=statement, scope=scope)
+
+    def _check_statement(self, statement: Node, scope: Scope) -> None:
+        if isinstance(statement, FunctionDef):
+            self._check_function_defaults(func_def=statement, scope=scope)
+        elif isinstance(statement, StructDef):
+            # Resolved along with the other definitions of the block
+            pass
+        elif isinstance(statement, Assignment):
+            self._check_assignment(assignment=statement, scope=scope)
+        elif isinstance(statement, Return):
+            self._check_return(statement=statement, scope=scope)
+        elif isinstance(statement, With):
+            self._check_with(statement=statement, scope=scope)
+        elif isinstance(statement, Expression):
+            self._check_expression(expression=statement, scope=scope)
+        else:
+            raise ValueError(f"Unsupported statement {statement}")
+
+    def _resolve_struct(self, struct_def: StructDef, scope: Scope) -> DataType:
+        data_type: Optional[DataType] = self._struct_types.get(struct_def)
+
+        if data_type is not None:
+            return data_type
+
+        if struct_def in self._resolving:
+            raise ValueError(f"Struct {struct_def.name()} cannot contain itself")
+
+        self._resolving.add(struct_def)
+        field_names: MutableSet[str] = set()
+
+        for field in struct_def.fields():
+            if field.name() in field_names:
+                raise ValueError(f"Struct {struct_def.name()} has two fields {field.name()}")
+
+            if field.default_value() is not None:
+                raise ValueError(
+                    f"Field {field.name()} of struct {struct_def.name()} cannot have a default"
+                )
+
+            field_type: DataType = self._resolve_data_type(data_type=field.data_type(), scope=scope)
+
+            if field_type is DataType.none_type():
+                raise ValueError(f"Field {field.name()} of struct {struct_def.name()} is None")
+
+            field.set_data_type(field_type)
+            field_names.add(field.name())
+
+        self._resolving.discard(struct_def)
+
+        data_type = DataType(
+            name=DataTypeName.STRUCT,
+            parameters=tuple(field.data_type() for field in struct_def.fields()),
+            struct_name=struct_def.name(),
+            field_names=tuple(field.name() for field in struct_def.fields()),
+        )
+        struct_def.set_data_type(data_type)
+        self._struct_types[struct_def] = data_type
+
+        return data_type
+
+    def _resolve_data_type(self, data_type: DataType, scope: Scope) -> DataType:
+        """
+        `data_type` with the structs it refers to by name resolved.
+        """
+        if data_type.name() == DataTypeName.STRUCT:
+            symbol: Optional[Symbol] = scope.lookup(data_type.struct_name())
+
+            if symbol is None or symbol.kind() != SymbolKind.STRUCT:
+                raise ValueError(f"Undefined type {data_type.struct_name()}")
+
+            return self._resolve_struct(struct_def=symbol.struct_def(), scope=scope)
+
+        if not data_type.parameters():
+            return data_type
+
+        return DataType(
+            name=data_type.name(),
+            parameters=[
+                self._resolve_data_type(data_type=param, scope=scope)
+                for param in data_type.parameters()
+            ],
+        )
+
+    def _check_function_defaults(self, func_def: FunctionDef, scope: Scope) -> None:
+        signature: FunctionSignature = self.signature(func_def=func_def)
+
+        for param, param_type in zip(func_def.parameters(), signature.parameter_types):
+            default_value: Optional[Expression] = param.default_value()
+
+            if default_value is not None:
+                # Defaults are evaluated in the enclosing scope when the
+                # function is defined
+                default_type: DataType = self._check_expression(
+                    expression=default_value, scope=scope
+                )
+                self._assert_assignable(
+                    source=default_type,
+                    target=param_type,
+                    what=f"default value of parameter {param.name()}",
+                )
+
+    def _check_function_body(self, func_def: FunctionDef, scope: Scope) -> None:
+        signature: FunctionSignature = self.signature(func_def=func_def)
+        body_scope = Scope(parent=scope, func_def=func_def)
+
+        for param, param_type in zip(func_def.parameters(), signature.parameter_types):
+            body_scope.declare(
+                Symbol(name=param.name(), kind=SymbolKind.VARIABLE, data_type=param_type)
+            )
+
+        self._check_block(statements=func_def.statements(), scope=body_scope)
+
+        if signature.return_type.name() != DataTypeName.NONE and not _ends_with_return(
+            statements=func_def.statements()
+        ):
+            raise ValueError(f"Function {func_def.name()} must end with a return statement")
+
+    def _check_assignment(self, assignment: Assignment, scope: Scope) -> None:
+        variable = assignment.left()
+
+        if variable.is_complete():
+            variable.set_data_type(
+                self._resolve_data_type(data_type=variable.data_type(), scope=scope)
+            )
+
+        symbol: Optional[Symbol] = scope.lookup_local(variable.name())
+        expected: Optional[DataType] = (
+            variable.data_type()
+            if variable.is_complete()
+            else symbol.data_type() if symbol is not None else None
+        )
+        value_type: DataType = self._check_expression(
+            expression=assignment.right(), scope=scope, expected=expected
+        )
+
+        if symbol is not None:
+            if symbol.kind() != SymbolKind.VARIABLE:
+                raise ValueError(f"Cannot assign to function {variable.name()}")
+
+            declared_type: DataType = symbol.data_type()
+
+            if variable.is_complete() and variable.data_type() != declared_type:
+                raise ValueError(
+                    f"Cannot redeclare {variable.name()} of type {declared_type} "
+                    f"as {variable.data_type()}"
+                )
+        elif variable.is_complete():
+            declared_type = variable.data_type()
+            scope.declare(
+                Symbol(name=variable.name(), kind=SymbolKind.VARIABLE, data_type=declared_type)
+            )
+        else:
+            # Inferred from the first assignment
+            declared_type = value_type
+            scope.declare(
+                Symbol(name=variable.name(), kind=SymbolKind.VARIABLE, data_type=declared_type)
+            )
+
+        self._assert_assignable(
+            source=value_type, target=declared_type, what=f"variable {variable.name()}"
+        )
+        variable.set_data_type(declared_type)
+
+    def _check_return(self, statement: Return, scope: Scope) -> None:
+        func_def: Optional[FunctionDef] = self._enclosing_function(scope=scope)
+
+        if func_def is None:
+            raise ValueError("Return statement outside of a function")
+
+        signature: FunctionSignature = self.signature(func_def=func_def)
+
+        for expression in statement.expressions():
+            self._check_expression(
+                expression=expression, scope=scope, expected=signature.return_type
+            )
+
+        return_type: Optional[DataType] = statement.return_type()
+
+        if return_type is None:
+            raise ValueError(f"Returning multiple values from {func_def.name()} is not supported")
+
+        self._assert_assignable(
+            source=return_type,
+            target=signature.return_type,
+            what=f"return value of {func_def.name()}",
+        )
+
+    def _check_with(self, statement: With, scope: Scope) -> None:
+        context: Expression = statement.context()
+
+        if (
+            not isinstance(context, FunctionCall)
+            or context.name() not in _builtin_context_managers
+            or scope.lookup(context.name()) is not None
+        ):
+            raise ValueError(f"Unsupported context manager {context.name()}")
+
+        if context.arguments():
+            raise ValueError(f"{context.name()} takes no arguments")
+
+        context.set_data_type(DataType.none_type())
+
+        # The block does not open a scope of its own
+        self._check_block(statements=statement.statements(), scope=scope)
+
+    def _check_expression(
+        self, expression: Expression, scope: Scope, expected: Optional[DataType] = None
+    ) -> DataType:
+        """
+        The type of `expression`. The `expected` type, that of the variable or
+        return value it is for, if any, types list literals.
+        """
+        if isinstance(expression, Atom):
+            data_type: DataType = self._check_atom(atom=expression, scope=scope)
+        elif isinstance(expression, BinaryOperation):
+            data_type = self._check_binary_operation(node=expression, scope=scope)
+        elif isinstance(expression, UnaryOperation):
+            data_type = self._check_unary_operation(node=expression, scope=scope)
+        elif isinstance(expression, FunctionCall):
+            data_type = self._check_function_call(call=expression, scope=scope)
+        elif isinstance(expression, FieldAccess):
+            data_type = self._check_field_access(node=expression, scope=scope)
+        elif isinstance(expression, ListLiteral):
+            data_type = self._check_list_literal(node=expression, scope=scope, expected=expected)
+        elif isinstance(expression, Subscript):
+            data_type = self._check_subscript(node=expression, scope=scope)
+        else:
+            raise ValueError(f"Unsupported expression {expression}")
+
+        expression.set_data_type(data_type)
+
+        return data_type
+
+    def _check_atom(self, atom: Atom, scope: Scope) -> DataType:
+        atom_type: AtomType = atom.atom_type()
+
+        if atom_type == AtomType.INT:
+            return DataType(name=DataTypeName.INT)
+        elif atom_type == AtomType.FLOAT:
+            return DataType(name=DataTypeName.FLOAT)
+        elif atom_type == AtomType.STR:
+            return DataType(name=DataTypeName.STR)
+        elif atom_type == AtomType.IDENTIFIER:
+            symbol: Optional[Symbol] = scope.lookup(atom.name())
+
+            if symbol is None:
+                raise ValueError(f"Undefined name {atom.name()}")
+
+            if symbol.kind() != SymbolKind.VARIABLE:
+                raise ValueError(f"Function {atom.name()} cannot be used as a value")
+
+            return symbol.data_type()
+
+        raise ValueError(f"Unable to determine the type of {atom.name()}")
+
+    def _check_binary_operation(self, node: BinaryOperation, scope: Scope) -> DataType:
+        left: DataType = self._check_expression(expression=node.left(), scope=scope)
+        right: DataType = self._check_expression(expression=node.right(), scope=scope)
+        operator: BinaryOperator = node.operator()
+        numeric: bool = left.name() in _numeric_type_names and right.name() in _numeric_type_names
+        boolean: bool = left.name() == DataTypeName.BOOL and right.name() == DataTypeName.BOOL
+
+        if operator.is_arithmetic():
+            if numeric:
+                # Division is true division, as in Python
+                if DataTypeName.FLOAT in (left.name(), right.name()) or (
+                    operator == BinaryOperator.DIVIDE
+                ):
+                    return DataType(name=DataTypeName.FLOAT)
+
+                return DataType(name=DataTypeName.INT)
+
+            if operator == BinaryOperator.ADD and left.name() == right.name() == DataTypeName.STR:
+                return left
+        elif operator.is_comparison():
+            if numeric or (
+                boolean and operator in (BinaryOperator.EQUAL, BinaryOperator.NOT_EQUAL)
+            ):
+                return DataType(name=DataTypeName.BOOL)
+        elif boolean:
+            return left
+
+        raise ValueError(f"Unsupported operand types for {operator.value}: {left} and {right}")
+
+    def _check_unary_operation(self, node: UnaryOperation, scope: Scope) -> DataType:
+        operand: DataType = self._check_expression(expression=node.operand(), scope=scope)
+
+        if node.operator() == UnaryOperator.NEGATE and operand.name() in _numeric_type_names:
+            return operand
+
+        if node.operator() == UnaryOperator.NOT and operand.name() == DataTypeName.BOOL:
+            return operand
+
+        raise ValueError(f"Unsupported operand type for {node.operator().value}: {operand}")
+
+    def _check_function_call(self, call: FunctionCall, scope: Scope) -> DataType:
+        arg_types: Sequence[DataType] = [
+            self._check_expression(expression=arg, scope=scope) for arg in call.arguments()
+        ]
+
+        if isinstance(call, MethodCall):
+            return self._check_method_call(call=call, arg_types=arg_types)
+
+        symbol: Optional[Symbol] = scope.lookup(call.name())
+
+        if symbol is None:
+            raise ValueError(f"Undefined function {call.name()}")
+
+        if symbol.kind() == SymbolKind.FUNCTION:
+            signature: FunctionSignature = self.signature(func_def=symbol.func_def())
+        elif symbol.kind() == SymbolKind.BUILTIN_FUNCTION:
+            signature = _builtin_signatures.get(call.name()) or _list_builtin_signature(
+                name=call.name(), arg_types=arg_types
+            )
+        elif symbol.kind() == SymbolKind.STRUCT:
+            # Structs are constructed from a value for each field
+            struct_type: DataType = self._resolve_struct(
+                struct_def=symbol.struct_def(), scope=scope
+            )
+            signature = FunctionSignature(
+                name=call.name(),
+                parameter_types=struct_type.parameters(),
+                num_required=len(struct_type.parameters()),
+                return_type=struct_type,
+            )
+        else:
+            raise ValueError(f"{call.name()} is not callable")
+
+        return self._check_arguments(call=call, arg_types=arg_types, signature=signature)
+
+    def _check_method_call(self, call: MethodCall, arg_types: Sequence[DataType]) -> DataType:
+        receiver_type: DataType = arg_types[0]
+
+        if call.name() not in _method_names.get(receiver_type.name(), frozenset()):
+            raise ValueError(f"{receiver_type} has no method {call.name()}")
+
+        call.set_name(f"{receiver_type.name().value}.{call.name()}")
+        signature: FunctionSignature = _list_builtin_signature(
+            name=call.name(), arg_types=arg_types
+        )
+
+        return self._check_arguments(call=call, arg_types=arg_types, signature=signature)
+
+    def _check_arguments(
+        self, call: FunctionCall, arg_types: Sequence[DataType], signature: FunctionSignature
+    ) -> DataType:
+        if not signature.variadic:
+            num_params: int = len(signature.parameter_types)
+
+            if not signature.num_required <= len(arg_types) <= num_params:
+                raise ValueError(
+                    f"{call.name()} takes {signature.num_required} to {num_params} "
+                    f"arguments but {len(arg_types)} were given"
+                )
+
+            for i, (arg_type, param_type) in enumerate(zip(arg_types, signature.parameter_types)):
+                self._assert_assignable(
+                    source=arg_type, target=param_type, what=f"argument {i} of {call.name()}"
+                )
+
+        return signature.return_type
+
+    def _check_list_literal(
+        self, node: ListLiteral, scope: Scope, expected: Optional[DataType]
+    ) -> DataType:
+        element_types: Sequence[DataType] = [
+            self._check_expression(expression=element, scope=scope) for element in node.elements()
+        ]
+
+        if expected is not None and expected.name() == DataTypeName.LIST:
+            element_type: DataType = expected.parameters()[0]
+        elif not element_types:
+            raise ValueError("The type of an empty list must be annotated")
+        elif DataType(name=DataTypeName.FLOAT) in element_types:
+            # Ints are widened, as in arithmetic
+            element_type = DataType(name=DataTypeName.FLOAT)
+        else:
+            element_type = element_types[0]
+
+        for i, source in enumerate(element_types):
+            self._assert_assignable(source=source, target=element_type, what=f"list element {i}")
+
+        return DataType(name=DataTypeName.LIST, parameters=(element_type,))
+
+    def _check_subscript(self, node: Subscript, scope: Scope) -> DataType:
+        value_type: DataType = self._check_expression(expression=node.value(), scope=scope)
+        index_type: DataType = self._check_expression(expression=node.index(), scope=scope)
+
+        if value_type.name() != DataTypeName.LIST or index_type.name() != DataTypeName.INT:
+            raise ValueError(f"Cannot index a value of type {value_type} with {index_type}")
+
+        return value_type.parameters()[0]
+
+    def _check_field_access(self, node: FieldAccess, scope: Scope) -> DataType:
+        value_type: DataType = self._check_expression(expression=node.value(), scope=scope)
+
+        if node.name() not in value_type.field_names():
+            raise ValueError(f"{value_type} has no field {node.name()}")
+
+        return value_type.parameters()[node.index()]
+
+    def _enclosing_function(self, scope: Scope) -> Optional[FunctionDef]:
+        current: Optional[Scope] = scope
+
+        while current is not None:
+            if current.enclosing_function() is not None:
+                return current.enclosing_function()
+
+            current = current.parent()
+
+        return None
+
+    def _assert_assignable(self, source: DataType, target: DataType, what: str) -> None:
+        if not is_assignable(source=source, target=target):
+            raise ValueError(f"Cannot use a value of type {source} as {what} of type {target}")
+
+
+def _ends_with_return(statements: Sequence[Statement]) -> bool:
+    if not statements:
+        return False
+
+    if isinstance(statements[-1], With):
+        return _ends_with_return(statements=statements[-1].statements())
+
+    return isinstance(statements[-1], Return)
@@ -1,41 +1,94 @@
 #!/usr/bin/env python3
 import argparse
+import tempfile
 from io import StringIO
 from pathlib import Path
-from typing import Sequence
+from typing import MutableSequence, Optional, Sequence
 
-from sidewinder.compiler_toolchain.ast import Node
+from llvmlite import binding
+
+from sidewinder.compiler_toolchain.ast import Module, Node
+from sidewinder.compiler_toolchain.codegen.arithmetic import OverflowMode
+from sidewinder.compiler_toolchain.codegen.code_generator import (
+    CodeGenerator,
+    CodeGeneratorASTVisitor,
+)
+from sidewinder.compiler_toolchain.compiler import Compiler
 from sidewinder.compiler_toolchain.default_ast_builder import DefaultASTBuilder
+from sidewinder.compiler_toolchain.default_linker import DefaultLinker
 from sidewinder.compiler_toolchain.default_parser import DefaultParser
+from sidewinder.compiler_toolchain.optimization.constant_folder import ConstantFolder
+from sidewinder.compiler_toolchain.optimization.inliner import Inliner
+from sidewinder.compiler_toolchain.optimization.tree_shaker import TreeShaker
 from sidewinder.compiler_toolchain.parser import ParseTreeNode
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
 
 
 def main() -> None:
     args: argparse.Namespace = parse_args()
 
     input_paths: Sequence[Path] = args.input_paths
+
+    if args.profile_parser:
+        profile_parser(input_paths=input_paths, limit=args.profile_limit)
+        return
+
     output_path: Path = args.output
 
-    compile(input_paths=input_paths, output_path=output_path)
+    compile(
+        input_paths=input_paths,
+        output_path=output_path,
+        overflow_mode=OverflowMode(args.overflow),
+    )
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="swc: the Sidewinder compiler")
     parser.add_argument(
-        "input",
+        "input_paths",
+        metavar="input",
         type=Path,
-        dest="input_paths",
         nargs="+",
         help="Paths to the input Sidewinder *.sw source files",
     )
+    parser.add_argument("-o", "--output", type=Path, help="Path to the output binary file.")
+    parser.add_argument(
+        "--overflow",
+        choices=[mode.value for mode in OverflowMode],
+        default=OverflowMode.WRAP.value,
+        help=(
+            "What int arithmetic does on overflow: wrap around, trap, or promote "
+            "intermediate results to 64 bits (default: wrap)"
+        ),
+    )
     parser.add_argument(
-        "-o", "--output", type=Path, required=True, help="Path to the output binary file."
+        "--profile-parser",
+        action="store_true",
+        help=(
+            "Instead of compiling, parse the inputs (or every *.sw file in input "
+            "directories) with ANTLR decision profiling and print a report"
+        ),
     )
+    parser.add_argument(
+        "--profile-limit",
+        type=int,
+        default=None,
+        help="Only report this many of the most expensive decisions",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
 
-    return parser.parse_args()
+    if not args.profile_parser and args.output is None:
+        parser.error("the following arguments are required: -o/--output")
 
+    return args
 
-def compile(input_paths: Sequence[Path], output_path: Path) -> None:
+
+def compile(
+    input_paths: Sequence[Path],
+    output_path: Path,
+    overflow_mode: OverflowMode = OverflowMode.WRAP,
+) -> None:
     input_path: Path = input_paths[0]
     input_buffer = StringIO(input_path.read_text())
 
@@ -44,6 +97,53 @@ def compile(input_paths: Sequence[Path], output_path: Path) -> None:
     ast_builder = DefaultASTBuilder()
     node: Node = ast_builder.generate_ast(parse_tree=parse_tree)
 
+    if not isinstance(node, Module):
+        raise ValueError(f"Expected a module from {input_path}")
+
+    TypeChecker().check(module=node)
+    Inliner().inline(module=node)
+    ConstantFolder(overflow_mode=overflow_mode).fold(module=node)
+    TreeShaker().shake(module=node)
+
+    triple: str = binding.get_default_triple()
+    generator = CodeGenerator(triple=triple)
+    module_ir: str = CodeGeneratorASTVisitor(
+        generator=generator, overflow_mode=overflow_mode
+    ).generate_module(name=input_path.stem, node=node)
+    object_code: bytes = Compiler(triple=triple).compile(module=module_ir)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        object_path: Path = Path(temp_dir) / f"{input_path.stem}.o"
+        object_path.write_bytes(object_code)
+
+        DefaultLinker(clang_path=None).link(objects=[object_path], output=output_path)
+
+
+def profile_parser(input_paths: Sequence[Path], limit: Optional[int]) -> None:
+    # Profiling always uses the ANTLR front end, whichever is the default
+    from sidewinder.compiler_toolchain.antlr.parser import AntlrParser
+    from sidewinder.compiler_toolchain.antlr.profiling import ParserProfile
+
+    profile = ParserProfile()
+    parser = AntlrParser(profile=profile)
+
+    for input_path in expand_input_paths(input_paths=input_paths):
+        parser._generate_parse_tree(input=StringIO(input_path.read_text()))
+
+    print(profile.report(limit=limit), end="")
+
+
+def expand_input_paths(input_paths: Sequence[Path]) -> Sequence[Path]:
+    expanded: MutableSequence[Path] = []
+
+    for input_path in input_paths:
+        if input_path.is_dir():
+            expanded.extend(sorted(input_path.rglob("*.sw")))
+        else:
+            expanded.append(input_path)
+
+    return expanded
+
 
 if __name__ == "__main__":
     main()
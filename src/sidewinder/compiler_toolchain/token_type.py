@@ -34,6 +34,10 @@ class TokenType(Enum):
     LEFT_BRACE = auto()
     RIGHT_BRACE = auto()
     AT = auto()
+    DOT = auto()
+    NEWLINE = auto()
+    INDENT = auto()
+    DEDENT = auto()
 
     # Values
     ANNOTATION = auto()
@@ -153,4 +157,9 @@ _string_to_token_type_map: Mapping[str, TokenType] = {
     "async": TokenType.ASYNC,
     "await": TokenType.AWAIT,
     "type": TokenType.TYPE,
+    "return": TokenType.RETURN,
+    "as": TokenType.AS,
+    "assert": TokenType.ASSERT,
+    "break": TokenType.BREAK,
+    "continue": TokenType.CONTINUE,
 }
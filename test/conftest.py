@@ -1,5 +1,85 @@
+import ctypes
 import sys
+from io import StringIO
 from pathlib import Path
+from typing import Callable
+
+import pytest
+from llvmlite import binding
 
 src_directory: Path = Path(__file__).parent.parent / "src"
 sys.path.append(str(src_directory))
+
+from sidewinder.compiler_toolchain.ast import Module
+from sidewinder.compiler_toolchain.codegen.code_generator import (
+    CodeGenerator,
+    CodeGeneratorASTVisitor,
+)
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
+
+
+def _check(source: str) -> Module:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+
+    return TypeChecker().check(module=RecursiveDescentASTBuilder().generate_ast(tokens))
+
+
+def _generate(source: str, **kwargs) -> str:
+    generator = CodeGenerator(triple=binding.get_default_triple())
+
+    return CodeGeneratorASTVisitor(generator=generator, **kwargs).generate_module(
+        name="test", node=_check(source)
+    )
+
+
+def _jit(module_ir: str) -> binding.ExecutionEngine:
+    module_ref = binding.parse_assembly(module_ir)
+    module_ref.verify()
+
+    target_machine = binding.Target.from_default_triple().create_target_machine()
+    engine = binding.create_mcjit_compiler(module_ref, target_machine)
+    engine.finalize_object()
+
+    return engine
+
+
+def _run_main(module_ir: str) -> None:
+    engine = _jit(module_ir)
+
+    ctypes.CFUNCTYPE(ctypes.c_int32)(engine.get_function_address("main"))()
+
+
+@pytest.fixture
+def check() -> Callable[[str], Module]:
+    """
+    Parses and type checks Sidewinder source.
+    """
+    return _check
+
+
+@pytest.fixture
+def generate() -> Callable[..., str]:
+    """
+    The IR of Sidewinder source, generated with CodeGeneratorASTVisitor
+    keyword arguments.
+    """
+    return _generate
+
+
+@pytest.fixture
+def jit() -> Callable[[str], binding.ExecutionEngine]:
+    """
+    An MCJIT engine with IR verified and compiled. Keep it alive while
+    calling into it.
+    """
+    return _jit
+
+
+@pytest.fixture
+def run_main() -> Callable[[str], None]:
+    """
+    JIT compiles IR and runs its main().
+    """
+    return _run_main
@@ -0,0 +1,45 @@
+import re
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PythonParser")
+
+from sidewinder.compiler_toolchain.antlr.ast_builder import AntlrASTBuilder
+from sidewinder.compiler_toolchain.antlr.parser import AntlrParser
+from sidewinder.compiler_toolchain.antlr.visitor_ast_builder import AntlrVisitorASTBuilder
+from sidewinder.compiler_toolchain.ast import Node
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+
+TOOLS_DIR: Path = Path(__file__).parent.parent / "tools"
+
+
+def without_ids(node: Node) -> str:
+    return re.sub(r" (?:@|at) (?:0x)?[0-9a-f]+", "", repr(node))
+
+
+def build_ast(source: str) -> Node:
+    parse_tree = AntlrParser().parse(input=StringIO(source))
+    return AntlrVisitorASTBuilder().generate_ast(parse_tree=parse_tree)
+
+
+def test_matches_listener_ast_builder():
+    source: str = (TOOLS_DIR / "primary.sw").read_text()
+    parse_tree = AntlrParser().parse(input=StringIO(source))
+    expected: Node = AntlrASTBuilder().generate_ast(parse_tree=parse_tree)
+
+    assert without_ids(build_ast(source)) == without_ids(expected)
+    # Atoms are interned into the pool of their own module
+    for call in expected.statements():
+        assert all(arg.pool() is expected.atom_pool() for arg in call.arguments())
+    assert [expected.atom_pool().value(i) for i in expected.atom_pool().constants()] == [5, 7]
+
+
+def test_matches_recursive_descent_ast_builder():
+    source: str = (TOOLS_DIR / "test_input.sw").read_text()
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    expected: Node = RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+
+    assert without_ids(build_ast(source)) == without_ids(expected)
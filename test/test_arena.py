@@ -0,0 +1,214 @@
+import ctypes
+import re
+from types import SimpleNamespace
+
+import pytest
+from llvmlite import binding, ir
+
+from sidewinder.compiler_toolchain.ast import With
+from sidewinder.compiler_toolchain.codegen.runtime import ARENA_CHUNK_SIZE, AllocatorRuntime
+from sidewinder.compiler_toolchain.codegen.types import INT64_T, PTR_T, VOID_T
+
+SOURCE = (
+    "def scaled(n: int) -> int:\n"
+    "    with arena():\n"
+    "        doubled = n * 2\n"
+    "        print('inside', doubled)\n"
+    "        return doubled + 1\n"
+    "\n"
+    "with arena():\n"
+    "    with arena():\n"
+    "        result = scaled(4)\n"
+    "print(result)\n"
+)
+
+
+def test_with_blocks_share_the_enclosing_scope(check):
+    module = check(SOURCE)
+
+    assert isinstance(module.statements()[1], With)
+    assert isinstance(module.statements()[1].statements()[0], With)
+
+
+@pytest.mark.parametrize(
+    "source", ["with scaled():\n    pass\n", "with arena(1):\n    pass\n", "arena()\n"]
+)
+def test_only_arena_is_a_context_manager(check, source: str):
+    with pytest.raises(ValueError):
+        check("def scaled() -> None:\n    pass\n\n" + source)
+
+
+def test_arenas_are_exited_on_every_path(generate, run_main, capfd):
+    module_ir: str = generate(SOURCE)
+
+    assert module_ir.count('call void @"__sw_arena_exit"') == 3
+
+    run_main(module_ir)
+
+    assert capfd.readouterr().out == "inside 8\n9\n"
+
+
+@pytest.fixture
+def allocator(jit):
+    """
+    The allocator runtime, through exported wrappers of its routines.
+    """
+    module = ir.Module(name="allocator")
+    module.triple = binding.get_default_triple()
+    runtime = AllocatorRuntime(module=module)
+    char_ptr = PTR_T(ir.IntType(8))
+
+    alloc = ir.Function(module, ir.FunctionType(char_ptr, [INT64_T]), name="alloc")
+    builder = ir.IRBuilder(alloc.append_basic_block())
+    builder.ret(builder.call(runtime.allocate(), alloc.args))
+
+    release = ir.Function(module, ir.FunctionType(VOID_T, [char_ptr]), name="release")
+    builder = ir.IRBuilder(release.append_basic_block())
+    builder.call(runtime.release(), release.args)
+    builder.ret_void()
+
+    # A block allocated like one of an arena, inside an arena nested in it
+    grown = ir.Function(module, ir.FunctionType(char_ptr, [INT64_T]), name="grown")
+    builder = ir.IRBuilder(grown.append_basic_block())
+    outer = builder.call(runtime.arena_enter(), [])
+    block = builder.call(runtime.allocate_in_arena(), grown.args)
+    inner = builder.call(runtime.arena_enter(), [])
+    result = builder.call(runtime.allocate_like(), [block, grown.args[0]])
+    builder.call(runtime.arena_exit(), [inner])
+    builder.call(runtime.arena_exit(), [outer])
+    builder.ret(result)
+
+    # Distance between two blocks allocated in an arena
+    arena_distance = ir.Function(module, ir.FunctionType(INT64_T, [INT64_T]), name="distance")
+    builder = ir.IRBuilder(arena_distance.append_basic_block())
+    mark = builder.call(runtime.arena_enter(), [])
+    first = builder.call(runtime.allocate_in_arena(), arena_distance.args)
+    second = builder.call(runtime.allocate_in_arena(), arena_distance.args)
+    builder.call(runtime.release(), [first])
+    builder.call(runtime.arena_exit(), [mark])
+    builder.ret(builder.sub(builder.ptrtoint(second, INT64_T), builder.ptrtoint(first, INT64_T)))
+
+    engine = jit(str(module))
+
+    # The engine owns the code, so it is kept along with the wrappers
+    return SimpleNamespace(
+        engine=engine,
+        alloc=ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_int64)(
+            engine.get_function_address("alloc")
+        ),
+        release=ctypes.CFUNCTYPE(None, ctypes.c_void_p)(engine.get_function_address("release")),
+        distance=ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_int64)(
+            engine.get_function_address("distance")
+        ),
+        grown=ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_int64)(
+            engine.get_function_address("grown")
+        ),
+    )
+
+
+def test_freed_blocks_are_reused_within_their_size_class(allocator):
+    block = allocator.alloc(24)
+    allocator.release(block)
+
+    # 17 to 32 bytes share a class
+    assert allocator.alloc(32) == block
+    assert allocator.alloc(20) != block
+
+    large = allocator.alloc(4096)
+    allocator.release(large)
+    allocator.release(None)
+
+
+def test_arena_blocks_are_bump_allocated(allocator):
+    # 10 bytes and a 16 byte header, aligned to 16
+    assert allocator.distance(10) == 32
+    # Blocks larger than a chunk get a chunk of their own
+    assert allocator.distance(2 * ARENA_CHUNK_SIZE) != 0
+
+    # Outside of arenas, blocks come from the free lists again
+    block = allocator.alloc(8)
+    allocator.release(block)
+    assert allocator.alloc(8) == block
+
+
+def test_blocks_are_not_allocated_like_those_of_outer_arenas(allocator):
+    # The inner arena would free the block before the outer one, so it comes
+    # from the free lists instead, and outlives both
+    block = allocator.grown(24)
+    allocator.release(block)
+
+    assert allocator.alloc(24) == block
+
+
+@pytest.mark.parametrize(
+    "source, output",
+    [
+        (
+            "with arena():\n"
+            "    ys: list[int] = [7, 8, 9]\n"
+            "with arena():\n"
+            "    zs: list[int] = [100, 200, 300]\n"
+            "print(ys[0], ys[1], ys[2])\n",
+            "7 8 9\n",
+        ),
+        (
+            "def mk() -> list[int]:\n"
+            "    with arena():\n"
+            "        xs: list[int] = [1, 2, 3]\n"
+            "        return xs\n"
+            "\n"
+            "a = mk()\n"
+            "b = mk()\n"
+            "b.append(5)\n"
+            "print(len(a), len(b))\n",
+            "3 4\n",
+        ),
+        (
+            "kept = [[0]]\n"
+            "\n"
+            "def keep(xs: list[int]) -> None:\n"
+            "    kept.append(xs)\n"
+            "\n"
+            "with arena():\n"
+            "    keep([1, 2])\n"
+            "with arena():\n"
+            "    ys = [3, 4]\n"
+            "print(kept[1][0], kept[1][1])\n",
+            "1 2\n",
+        ),
+    ],
+)
+def test_lists_that_outlive_their_arena_are_not_allocated_in_it(
+    generate, run_main, capfd, source: str, output: str
+):
+    module_ir: str = generate(source)
+
+    run_main(module_ir)
+
+    assert capfd.readouterr().out == output
+
+
+def test_lists_that_cannot_outlive_their_arena_are_allocated_in_it(generate, run_main, capfd):
+    module_ir: str = generate(
+        "def total(n: int) -> int:\n"
+        "    with arena():\n"
+        "        xs: list[int] = [n]\n"
+        "        with arena():\n"
+        "            xs.append(n * len([1, 2]))\n"
+        "        return xs[0] + xs[1]\n"
+        "\n"
+        "outer = [1]\n"
+        "with arena():\n"
+        "    ys = [2, 3]\n"
+        "    outer.append(ys[1])\n"
+        "    print(total(ys[0]))\n"
+        "print(outer[0], outer[1])\n"
+    )
+
+    # xs, [1, 2] and ys, but not outer
+    assert len(re.findall(r'call .* @"__sw_list_new_in_arena.i32"', module_ir)) == 3
+    assert len(re.findall(r'call .* @"__sw_list_new.i32"', module_ir)) == 1
+
+    run_main(module_ir)
+
+    assert capfd.readouterr().out == "6\n1 3\n"
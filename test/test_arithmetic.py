@@ -0,0 +1,90 @@
+import ctypes
+
+import pytest
+
+from sidewinder.compiler_toolchain.codegen.arithmetic import OverflowMode
+
+SOURCE = (
+    "def calc(a: int, b: int) -> int:\n"
+    "    return a * b - a + -b\n"
+    "\n"
+    "def ratio(a: int, b: int) -> float:\n"
+    "    return a / b\n"
+    "\n"
+    "def inside(x: float, lo: int, hi: int) -> bool:\n"
+    "    return lo <= x and x < hi or not x == x\n"
+    "\n"
+    "def positive_product(a: int, b: int) -> bool:\n"
+    "    return a * b > 0\n"
+    "\n"
+    "def tenth_of_product(a: int, b: int) -> float:\n"
+    "    return a * b / 10\n"
+    "\n"
+    "def sum_exceeds(a: int, b: int, limit: float) -> bool:\n"
+    "    return a + b > limit\n"
+)
+
+
+@pytest.fixture(params=list(OverflowMode))
+def engine(request, generate, jit):
+    engine = jit(generate(SOURCE, overflow_mode=request.param))
+    engine.overflow_mode = request.param
+
+    return engine
+
+
+def function(engine, name: str, restype, *argtypes):
+    return ctypes.CFUNCTYPE(restype, *argtypes)(engine.get_function_address(name))
+
+
+def test_operators_are_lowered_natively(engine):
+    calc = function(engine, "calc", ctypes.c_int32, ctypes.c_int32, ctypes.c_int32)
+    ratio = function(engine, "ratio", ctypes.c_float, ctypes.c_int32, ctypes.c_int32)
+    inside = function(
+        engine, "inside", ctypes.c_bool, ctypes.c_float, ctypes.c_int32, ctypes.c_int32
+    )
+
+    assert calc(6, 7) == 6 * 7 - 6 - 7
+    assert ratio(7, 2) == 3.5
+    assert inside(1.5, 1, 2)
+    assert not inside(2.0, 1, 2)
+    assert inside(float("nan"), 1, 2)
+
+
+def test_overflow_modes(engine):
+    positive_product = function(
+        engine, "positive_product", ctypes.c_bool, ctypes.c_int32, ctypes.c_int32
+    )
+    calc = function(engine, "calc", ctypes.c_int32, ctypes.c_int32, ctypes.c_int32)
+
+    assert positive_product(3, 4)
+
+    if engine.overflow_mode == OverflowMode.WRAP:
+        # 2**16 * 2**16 wraps to 0
+        assert not positive_product(65536, 65536)
+    elif engine.overflow_mode == OverflowMode.PROMOTE:
+        tenth_of_product = function(
+            engine, "tenth_of_product", ctypes.c_float, ctypes.c_int32, ctypes.c_int32
+        )
+        sum_exceeds = function(
+            engine, "sum_exceeds", ctypes.c_bool, ctypes.c_int32, ctypes.c_int32, ctypes.c_float
+        )
+
+        assert positive_product(65536, 65536)
+        # Int operands of float operations are converted at full width
+        assert tenth_of_product(100000, 100000) == 1e9
+        assert sum_exceeds(2**31 - 1, 2**31 - 1, 1.0)
+        # Stored results are still int32
+        assert calc(65536, 65536) == -(2 * 65536)
+
+
+def test_trapping_calls_are_not_evaluated_at_compile_time(generate):
+    source = "def square(x: int) -> int:\n    return x * x\n\ny = square(3)\n"
+
+    wrapping_ir: str = generate(source, overflow_mode=OverflowMode.WRAP)
+    assert '@"y" = constant i32 9' in wrapping_ir
+
+    trapping_ir: str = generate(source, overflow_mode=OverflowMode.TRAP)
+    assert "@llvm.smul.with.overflow.i32" in trapping_ir.replace('"', "")
+    assert 'call void @"llvm.trap"()' in trapping_ir
+    assert 'call i32 @"square"(i32 3)' in trapping_ir
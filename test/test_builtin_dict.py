@@ -0,0 +1,91 @@
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+include_directory: Path = Path(__file__).parent.parent / "cpp" / "include"
+
+program: str = """
+#include <sidewinder/__builtins/dict.hpp>
+
+struct Key : public RefCounted {
+  static inline int num_hashed = 0;
+
+  explicit Key(Int value) : value(value) {}
+
+  // Few distinct hashes, so that keys collide
+  Int __Hash() const { ++num_hashed; return value % 7; }
+  bool operator==(const Key& other) const { return value == other.value; }
+
+  Int value;
+};
+
+// Hashes are cached next to the key and value, with no per-entry nodes
+static_assert(sizeof(Dict<Int, Int>::Entry) == 16);
+
+#define CHECK(condition) \\
+  if (!(condition)) return __LINE__
+
+int main() {
+  Reference<Dict<Int, Float>> halves = Reference<Dict<Int, Float>>::Make();
+
+  for (Int i = -500; i < 500; ++i) {
+    halves->Set(i, i * 0.5f);
+  }
+  CHECK(halves->Size() == 1000);
+  CHECK(*halves->Find(-3) == -1.5f);
+  CHECK(halves->Find(500) == nullptr);
+
+  for (Int i = -500; i < 500; i += 2) {
+    CHECK(halves->Erase(i));
+  }
+  CHECK(!halves->Erase(-500) && !halves->Contains(-500) && halves->Size() == 500);
+
+  // Erased keys are inserted again at the end, replaced ones keep their place
+  halves->Set(-500, 1.0f);
+  halves->Set(-499, 2.0f);
+
+  Int expected = -499;
+  for (const auto& entry : *halves) {
+    if (expected == 501) {
+      CHECK(entry.key == -500 && entry.value == 1.0f);
+    } else {
+      CHECK(entry.key == expected);
+      CHECK(entry.value == (expected == -499 ? 2.0f : expected * 0.5f));
+    }
+    expected += 2;
+  }
+  CHECK(expected == 503);
+
+  Dict<Key, Int> objects;
+  for (Int i = 0; i < 100; ++i) {
+    objects.Set(Reference<Key>::Make(i), i * i);
+  }
+  // Growing reuses the cached hashes
+  CHECK(Key::num_hashed == 100);
+  CHECK(*objects.Find(Reference<Key>::Make(42)) == 1764);
+  CHECK(!objects.Contains(Reference<Key>::Make(100)));
+
+  return 0;
+}
+"""
+
+
+def _compiler() -> Optional[str]:
+    return shutil.which("g++") or shutil.which("clang++")
+
+
+@pytest.mark.skipif(_compiler() is None, reason="No C++ compiler available")
+def test_dict(tmp_path: Path):
+    source: Path = tmp_path / "dict_test.cpp"
+    executable: Path = tmp_path / "dict_test"
+    source.write_text(program)
+
+    subprocess.run(
+        [_compiler(), "-std=c++20", f"-I{include_directory}", str(source), "-o", str(executable)],
+        check=True,
+    )
+
+    assert subprocess.run([str(executable)]).returncode == 0
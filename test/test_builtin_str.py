@@ -0,0 +1,87 @@
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from llvmlite import ir
+
+from sidewinder.compiler_toolchain.codegen.code_generator import ModuleCodeGenerator
+from sidewinder.compiler_toolchain.codegen.runtime import str_hash
+from sidewinder.compiler_toolchain.codegen.types import STR_T
+
+include_directory: Path = Path(__file__).parent.parent / "cpp" / "include"
+
+program: str = """
+#include <sidewinder/__builtins/dict.hpp>
+#include <sidewinder/__builtins/str.hpp>
+
+#include <string>
+
+constinit Str kGreeting(RefCounted::Immortal{}, "h\\xc3\\xa9llo");
+
+static_assert(sizeof(Str) == 64);
+static_assert(HashBytes("h\\xc3\\xa9llo") == HASH);
+
+#define CHECK(condition) \\
+  if (!(condition)) return __LINE__
+
+bool IsInline(const Str& s) {
+  const char* object = reinterpret_cast<const char*>(&s);
+  return s.Data() >= object && s.Data() < object + sizeof(Str);
+}
+
+int main() {
+  // Literals are never deleted, however many references come and go
+  CHECK(kGreeting.RefCount() == 1);
+  { Reference<Str> borrowed(&kGreeting); }
+  CHECK(kGreeting.RefCount() == 1);
+
+  Reference<Str> short_str = Reference<Str>::Make("h\\xc3\\xa9llo");
+  Reference<Str> long_str = Reference<Str>::Make(std::string(Str::kInlineCapacity + 1, 'x'));
+  CHECK(IsInline(*short_str) && !IsInline(*long_str));
+  CHECK(long_str->Size() == Str::kInlineCapacity + 1 && long_str->Data()[long_str->Size()] == 0);
+  CHECK(*short_str == kGreeting && !(*short_str == *long_str));
+  CHECK(short_str->Hash() == kGreeting.Hash() && short_str->__Len() == 6);
+
+  Dict<Str, Int> counts;
+  counts.Set(Reference<Str>(&kGreeting), 1);
+  counts.Set(long_str, 2);
+  CHECK(*counts.Find(short_str) == 1);
+  CHECK(*counts.Find(Reference<Str>::Make(std::string(Str::kInlineCapacity + 1, 'x'))) == 2);
+  CHECK(!counts.Contains(Reference<Str>::Make("hello")));
+
+  return 0;
+}
+"""
+
+
+def _compiler() -> Optional[str]:
+    return shutil.which("g++") or shutil.which("clang++")
+
+
+@pytest.mark.skipif(_compiler() is None, reason="No C++ compiler available")
+def test_str(tmp_path: Path):
+    source: Path = tmp_path / "str_test.cpp"
+    executable: Path = tmp_path / "str_test"
+    source.write_text(program.replace("HASH", f"{str_hash('héllo')}u"))
+
+    subprocess.run(
+        [_compiler(), "-std=c++20", f"-I{include_directory}", str(source), "-o", str(executable)],
+        check=True,
+    )
+
+    assert subprocess.run([str(executable)]).returncode == 0
+
+
+def test_str_literals_are_pooled_with_their_hash_and_length():
+    generator = ModuleCodeGenerator(module=ir.Module(name="str"))
+    literal: ir.Constant = generator.add_str_literal("héllo")
+
+    assert literal.type == STR_T
+    generator.add_str_literal("héllo")
+    assert len(generator.constants()) == 1
+
+    header: ir.Constant = generator.constants()[0].initializer
+    assert header.constant[0].constant % (1 << 64) == str_hash("héllo")
+    assert header.constant[1].constant == 6
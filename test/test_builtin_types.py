@@ -0,0 +1,85 @@
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional, Sequence
+
+import pytest
+
+include_directory: Path = Path(__file__).parent.parent / "cpp" / "include"
+
+program: str = """
+#include <sidewinder/__builtins/types.hpp>
+
+#include <cstdlib>
+
+struct Str : public RefCounted {
+  static inline int num_deleted = 0;
+
+  ~Str() { ++num_deleted; }
+};
+
+struct Derived : public Str {};
+
+int Borrow(Const<Str> s) { return s->RefCount(); }
+int Take(Mutable<Str> s) { return s->RefCount(); }
+
+#define CHECK(condition) \\
+  if (!(condition)) return __LINE__
+
+int main() {
+  {
+    Reference<Str> a = Reference<Str>::Make();
+    CHECK(a->RefCount() == 1);
+
+    Reference<Str> b = a;
+    CHECK(a->RefCount() == 2);
+    CHECK(Borrow(a) == 2);
+    CHECK(Take(a) == 3);
+    CHECK(a->RefCount() == 2);
+
+    Reference<Str> c = std::move(b);
+    CHECK(!b && c == a && a->RefCount() == 2);
+
+    c = nullptr;
+    CHECK(a->RefCount() == 1 && Str::num_deleted == 0);
+
+    Reference<Str> derived = Reference<Derived>::Make();
+    CHECK(derived->RefCount() == 1);
+  }
+  CHECK(Str::num_deleted == 2);
+
+  CHECK(kNone<Str> == nullptr);
+  CHECK(!kNone<Int>.has_value());
+  CHECK((std::is_same_v<Const<Int>, const Int>));
+  CHECK((std::is_same_v<Const<Str>, const Ref<Str>&>));
+
+  return 0;
+}
+"""
+
+
+def _compiler() -> Optional[str]:
+    return shutil.which("g++") or shutil.which("clang++")
+
+
+@pytest.mark.skipif(_compiler() is None, reason="No C++ compiler available")
+@pytest.mark.parametrize("flags", [[], ["-DSIDEWINDER_THREADED"]], ids=["default", "threaded"])
+def test_reference_counting(tmp_path: Path, flags: Sequence[str]):
+    source: Path = tmp_path / "types_test.cpp"
+    executable: Path = tmp_path / "types_test"
+    source.write_text(program)
+
+    subprocess.run(
+        [
+            _compiler(),
+            "-std=c++20",
+            f"-I{include_directory}",
+            *flags,
+            str(source),
+            "-o",
+            str(executable),
+        ],
+        check=True,
+    )
+
+    assert subprocess.run([str(executable)]).returncode == 0
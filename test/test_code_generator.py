@@ -0,0 +1,118 @@
+from io import StringIO
+
+import pytest
+from llvmlite import binding, ir
+
+from sidewinder.compiler_toolchain.ast import Module
+from sidewinder.compiler_toolchain.codegen.code_generator import (
+    CodeGenerator,
+    CodeGeneratorASTVisitor,
+    ModuleCodeGenerator,
+)
+from sidewinder.compiler_toolchain.codegen.types import INT32_T, ConstantValueArgs
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+from sidewinder.compiler_toolchain.semantic.purity import PurityAnalyzer
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
+
+
+def check(source: str) -> Module:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    module = RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+
+    return TypeChecker().check(module=module)
+
+
+def generate(module: Module) -> str:
+    generator = CodeGenerator(triple=binding.get_default_triple())
+    module_ir: str = CodeGeneratorASTVisitor(generator=generator).generate_module(
+        name="test", node=module
+    )
+    binding.parse_assembly(module_ir).verify()
+
+    return module_ir
+
+
+def test_constants_are_deduplicated():
+    generator = ModuleCodeGenerator(module=ir.Module(name="test"))
+
+    hello = generator.add_string_constant("hello")
+    assert generator.add_string_constant("hello") is hello
+    assert generator.add_string_constant("world") is not hello
+
+    table = generator.add_constant_array(element_type=INT32_T, values=[1, 2, 3])
+    assert generator.add_constant(ir.Constant(ir.ArrayType(INT32_T, 3), [1, 2, 3])) is table
+
+    module_ir: str = generator.dump()
+    assert module_ir.count("private unnamed_addr constant") == 3
+    assert module_ir.count('c"hello\\00"') == 1
+
+
+def test_global_names_are_unique():
+    generator = ModuleCodeGenerator(module=ir.Module(name="test"))
+    initializer = ConstantValueArgs(ir_type=INT32_T, constant=0)
+
+    generator.add_global_variable(ir_type=INT32_T, name="x", initializer=initializer)
+
+    with pytest.raises(ValueError):
+        generator.add_global_variable(ir_type=INT32_T, name="x", initializer=initializer)
+
+
+def test_pure_calls_are_evaluated_at_compile_time():
+    module = check(
+        "offset = 1\n"
+        "\n"
+        "def add(x: int, y: int = 0) -> int:\n"
+        "    return x + y\n"
+        "\n"
+        "def half(x: int) -> float:\n"
+        "    return add(x, 1) + 0.5\n"
+        "\n"
+        "def shifted(x: int) -> int:\n"
+        "    return x + offset\n"
+        "\n"
+        "def loop(x: int) -> int:\n"
+        "    return loop(x)\n"
+        "\n"
+        "def add_offset(x: int, y: int = offset) -> int:\n"
+        "    return x + y\n"
+        "\n"
+        "def shifted_by_default(x: int) -> int:\n"
+        "    return add_offset(x)\n"
+        "\n"
+        "z: int = add(1, 3)\n"
+        "h = half(add(2))\n"
+        "s = shifted(1)\n"
+        "d = shifted_by_default(1)\n"
+    )
+
+    # The defaults of missing arguments are read by the caller
+    assert PurityAnalyzer().pure_functions(module=module) == {"add", "half", "add_offset"}
+
+    module_ir: str = generate(module=module)
+    assert '@"z" = constant i32 4' in module_ir
+    assert '@"h" = constant float 0x400c000000000000' in module_ir
+    assert 'call i32 @"shifted"(i32 1)' in module_ir
+    assert 'call i32 @"shifted_by_default"(i32 1)' in module_ir
+
+
+def test_assignments_in_functions_do_not_write_globals(run_main, capfd):
+    module_ir: str = generate(
+        module=check(
+            "x: int = 1\n"
+            "\n"
+            "def f() -> int:\n"
+            "    x = 2.5\n"
+            "    return 0\n"
+            "\n"
+            "def g() -> int:\n"
+            "    x = 7\n"
+            "    return x\n"
+            "\n"
+            "print(f(), g(), x)\n"
+        )
+    )
+
+    run_main(module_ir)
+
+    assert capfd.readouterr().out == "0 7 1\n"
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from sidewinder.compiler_toolchain.ast import Atom, AtomType, Module, Node, Sum
+from sidewinder.compiler_toolchain.codegen.arithmetic import OverflowMode
+from sidewinder.compiler_toolchain.optimization.constant_folder import ConstantFolder
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
+
+
+def fold(source: str, overflow_mode: OverflowMode = OverflowMode.WRAP) -> Module:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    module = RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+
+    return ConstantFolder(overflow_mode=overflow_mode).fold(
+        module=TypeChecker().check(module=module)
+    )
+
+
+def value_of(node: Node):
+    assert isinstance(node, Atom) and node.atom_type() != AtomType.IDENTIFIER
+    return node.pool().value(node.index())
+
+
+def test_literals_are_folded_with_int32_and_float32_semantics():
+    module = fold("a = 1 + 2 + 3\nb = 2147483647 + 1\nc = 0.1 + 1\nd = 'a' + 'b'\n")
+    a, b, c, d = (statement.right() for statement in module.statements())
+
+    assert value_of(a) == 6
+    assert value_of(b) == -2147483648
+    assert value_of(c) == 1.100000023841858
+    assert value_of(d) == "ab"
+
+
+def test_constants_are_propagated_through_single_assignments():
+    module = fold(
+        "def f(x: int) -> int:\n"
+        "    k = 2\n"
+        "    x = x + k\n"
+        "    return x + 0\n"
+        "\n"
+        "n = 1\n"
+        "m = 2\n"
+        "m = 3\n"
+        "r = f(n + 1) + m\n"
+    )
+    func_def, _, _, _, r = module.statements()
+
+    # x is a parameter and is reassigned, k is a constant
+    _, x_update, return_stmt = func_def.statements()
+    assert isinstance(x_update.right(), Sum)
+    assert value_of(x_update.right().right()) == 2
+    assert isinstance(return_stmt.expressions()[0], Atom)
+
+    # m is assigned twice, so it is not propagated
+    call, m = r.right().left(), r.right().right()
+    assert value_of(call.arguments()[0]) == 2
+    assert m.name() == "m"
+
+
+def test_float_zero_is_not_removed():
+    module = fold("def f(x: float) -> float:\n    return x + 0\n")
+
+    assert isinstance(module.statements()[0].statements()[0].expressions()[0], Sum)
+
+
+def test_overflowing_results_are_only_folded_when_wrapping():
+    source = "a = 2 * 3 - -4\nb = 2147483647 + 1\nc = -(0 - 2147483647 - 1)\nd = 1.5 * 2\n"
+    a, b, c, d = (statement.right() for statement in fold(source).statements())
+
+    assert value_of(a) == 10
+    assert value_of(b) == -2147483648
+    assert value_of(c) == -2147483648
+    assert value_of(d) == 3.0
+
+    for overflow_mode in (OverflowMode.TRAP, OverflowMode.PROMOTE):
+        a, b, c, d = (
+            statement.right()
+            for statement in fold(source, overflow_mode=overflow_mode).statements()
+        )
+
+        assert value_of(a) == 10
+        assert isinstance(b, Sum)
+        assert not isinstance(c, Atom)
+        assert value_of(d) == 3.0
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The proxy generator is a script rather than part of the package
+sys.path.append(str(Path(__file__).parent.parent / "doc"))
+
+from function_generator import (
+    FunctionSignature,
+    generate_direct_call,
+    generate_function_invocable_proxy,
+    parse_function_signature,
+    resolve_call_arguments,
+)
+
+
+@pytest.fixture
+def func_sig() -> FunctionSignature:
+    return parse_function_signature(s="int scale(int x, double factor = 1.5, int offset = 2)")
+
+
+@pytest.mark.parametrize(
+    "args, kwargs, resolved",
+    [
+        (["a", "b", "c"], {}, ["a", "b", "c"]),
+        (["a"], {"offset": "3", "factor": "4.0"}, ["a", "4.0", "3"]),
+        ([], {"offset": "3", "x": "a"}, ["a", "1.5", "3"]),
+        (["a"], {}, ["a", "1.5", "2"]),
+        (["a", "b"], {}, ["a", "b", "2"]),
+    ],
+)
+def test_call_arguments_are_resolved_in_parameter_order(
+    func_sig: FunctionSignature, args, kwargs, resolved
+):
+    assert list(resolve_call_arguments(func_sig=func_sig, args=args, kwargs=kwargs)) == resolved
+
+
+@pytest.mark.parametrize(
+    "args, kwargs",
+    [
+        # Too many arguments
+        (["a", "b", "c", "d"], {}),
+        # Unknown keyword
+        (["a"], {"scale": "3"}),
+        # Already given positionally
+        (["a"], {"x": "b"}),
+        # Missing argument without a default
+        ([], {"factor": "4.0"}),
+    ],
+)
+def test_invalid_call_arguments_are_rejected(func_sig: FunctionSignature, args, kwargs):
+    with pytest.raises(ValueError):
+        resolve_call_arguments(func_sig=func_sig, args=args, kwargs=kwargs)
+
+
+def test_direct_calls_name_the_implementation(func_sig: FunctionSignature):
+    assert (
+        generate_direct_call(func_sig=func_sig, args=["a"], kwargs={"offset": "3"})
+        == "__UserFunctionImplementation__scale(a, 1.5, 3)"
+    )
+
+
+def test_defaulted_overloads_call_the_implementation_directly(func_sig: FunctionSignature):
+    proxy: str = generate_function_invocable_proxy(func_sig=func_sig)
+
+    assert "return __UserFunctionImplementation__scale(x, factor, offset);" in proxy
+    assert "return __UserFunctionImplementation__scale(x, factor, 2);" in proxy
+    assert "return __UserFunctionImplementation__scale(x, 1.5, 2);" in proxy
+    assert "std::function" not in proxy
@@ -0,0 +1,95 @@
+from io import StringIO
+
+from llvmlite import binding
+
+from sidewinder.compiler_toolchain.ast import Atom, FunctionCall, FunctionDef, Module, Sum
+from sidewinder.compiler_toolchain.codegen.code_generator import (
+    CodeGenerator,
+    CodeGeneratorASTVisitor,
+)
+from sidewinder.compiler_toolchain.optimization.constant_folder import ConstantFolder
+from sidewinder.compiler_toolchain.optimization.inliner import Inliner
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
+
+
+def contains_call(expression) -> bool:
+    if isinstance(expression, Sum):
+        return contains_call(expression.left()) or contains_call(expression.right())
+
+    return isinstance(expression, FunctionCall)
+
+
+def optimize(source: str, inliner: Inliner) -> Module:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    module = RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+    TypeChecker().check(module=module)
+
+    return ConstantFolder().fold(module=inliner.inline(module=module))
+
+
+def test_small_pure_functions_are_inlined():
+    module = optimize(
+        "def add(x: int, y: int = 0) -> int:\n"
+        "    z = x + 1\n"
+        "    return z + y\n"
+        "\n"
+        "def twice(x: int) -> int:\n"
+        "    return add(x, x)\n"
+        "\n"
+        "def f(a: int) -> int:\n"
+        "    return twice(a) + add(2)\n",
+        inliner=Inliner(),
+    )
+    f = module.statements()[2]
+
+    # ((a + 1) + a) + 3, without any calls
+    (return_stmt,) = f.statements()
+    expression = return_stmt.expressions()[0]
+    assert isinstance(expression, Sum)
+    assert isinstance(expression.right(), Atom) and expression.right().int_value() == 3
+    assert not contains_call(expression)
+
+
+def test_calls_with_constant_arguments_are_specialized():
+    module = optimize(
+        "def scale(x: int, y: int, z: int = 5) -> int:\n"
+        "    return x + y + z\n"
+        "\n"
+        "def f(a: int) -> int:\n"
+        "    return scale(a, 2) + scale(a, 2) + scale(a, 3)\n",
+        inliner=Inliner(max_inline_size=0),
+    )
+    names = [statement.name() for statement in module.statements()]
+    assert names == ["scale", "f", "scale.0", "scale.1"]
+
+    specialization = module.statements()[2]
+    assert isinstance(specialization, FunctionDef)
+    assert [param.name() for param in specialization.parameters()] == ["x"]
+
+    generator = CodeGenerator(triple=binding.get_default_triple())
+    module_ir = CodeGeneratorASTVisitor(generator=generator).generate_module(
+        name="test", node=module
+    )
+    binding.parse_assembly(module_ir).verify()
+    assert module_ir.count('call i32 @"scale.0"(i32 %"a') == 2
+    # The bound parameters are folded into the body of the clone
+    scale_0: str = module_ir[module_ir.index('define i32 @"scale.0"') :]
+    assert 'add i32 %"x.1", 2' in scale_0[: scale_0.index("}")]
+
+
+def test_coercing_assignments_are_not_inlined(run_main, capfd):
+    module = optimize(
+        "def f(x: int) -> float:\n    y: float = x\n    return y\n\nprint(f(3))\n",
+        inliner=Inliner(),
+    )
+    generator = CodeGenerator(triple=binding.get_default_triple())
+    run_main(
+        CodeGeneratorASTVisitor(
+            generator=generator, evaluate_at_compile_time=False
+        ).generate_module(name="test", node=module)
+    )
+
+    # Substituting x for y would skip its conversion to float
+    assert capfd.readouterr().out == "3.0\n"
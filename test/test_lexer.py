@@ -0,0 +1,88 @@
+import pytest
+
+from sidewinder.compiler_toolchain.lexer import Lexer, UnsupportedSyntaxError
+from sidewinder.compiler_toolchain.token_type import TokenType
+
+
+def test_lex_function_def():
+    source = "def add(x: int, y: int) -> int:\n    return x + y\n\nprint(add(1, 2.5))\n"
+    tokens = Lexer(allow_fallback=False).lex_str(source=source)
+
+    assert tokens.token_types() == [
+        TokenType.DEF,
+        TokenType.IDENTIFIER,
+        TokenType.LEFT_PARENS,
+        TokenType.IDENTIFIER,
+        TokenType.COLON,
+        TokenType.INT,
+        TokenType.COMMA,
+        TokenType.IDENTIFIER,
+        TokenType.COLON,
+        TokenType.INT,
+        TokenType.RIGHT_PARENS,
+        TokenType.ARROW,
+        TokenType.INT,
+        TokenType.COLON,
+        TokenType.NEWLINE,
+        TokenType.INDENT,
+        TokenType.RETURN,
+        TokenType.IDENTIFIER,
+        TokenType.PLUS,
+        TokenType.IDENTIFIER,
+        TokenType.NEWLINE,
+        TokenType.DEDENT,
+        TokenType.IDENTIFIER,
+        TokenType.LEFT_PARENS,
+        TokenType.IDENTIFIER,
+        TokenType.LEFT_PARENS,
+        TokenType.LITERAL_NUMBER,
+        TokenType.COMMA,
+        TokenType.LITERAL_NUMBER,
+        TokenType.RIGHT_PARENS,
+        TokenType.RIGHT_PARENS,
+        TokenType.NEWLINE,
+        TokenType.EOF,
+    ]
+    assert tokens.text(28) == "2.5"
+    assert tokens.line(22) == 4
+
+
+def test_lex_brackets_join_lines():
+    tokens = Lexer(allow_fallback=False).lex_str(source="f(1,\n  2)\n")
+
+    assert TokenType.INDENT not in tokens.token_types()
+    assert tokens.token_types().count(TokenType.NEWLINE) == 1
+
+
+@pytest.mark.parametrize(
+    "source, token_type",
+    [
+        ("x != 1\n", TokenType.INEQUALITY),
+        ("x <= 1\n", TokenType.LESS_THAN_OR_EQUAL),
+        ("x >= 1\n", TokenType.GREATER_THAN_OR_EQUAL),
+        ("x == 1\n", TokenType.EQUALITY),
+    ],
+)
+def test_lex_comparison_operators(source: str, token_type: TokenType):
+    tokens = Lexer(allow_fallback=False).lex_str(source=source)
+
+    assert tokens.token_types()[1] == token_type
+    assert tokens.text(1) == source[2:4]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x += 1\n",
+        'f"{x}"\n',
+        "1_000\n",
+        '"""doc"""\n',
+        "a; b\n",
+        "x <<= 1\n",
+        "x >>= 1\n",
+        "not !x\n",
+    ],
+)
+def test_lex_unsupported(source: str):
+    with pytest.raises(UnsupportedSyntaxError):
+        Lexer(allow_fallback=False).lex_str(source=source)
@@ -0,0 +1,84 @@
+import pytest
+from llvmlite import ir
+
+from sidewinder.compiler_toolchain.ast import DataType, MethodCall
+from sidewinder.compiler_toolchain.codegen.types import INT1_T, INT32_T, INT64_T, PTR_T, ir_type_for
+
+SOURCE = (
+    "struct Point:\n"
+    "    x: int\n"
+    "    y: float\n"
+    "\n"
+    "def ends(xs: list[int]) -> int:\n"
+    "    return xs[0] + xs[-1]\n"
+    "\n"
+    "def squares(n: int) -> list[int]:\n"
+    "    xs: list[int] = []\n"
+    "    xs.append(n * n)\n"
+    "    return xs\n"
+    "\n"
+    "xs = squares(3)\n"
+    "xs.append(1)\n"
+    "xs.append(2)\n"
+    "xs.append(3)\n"
+    "xs.append(4)\n"
+    "xs.append(5)\n"
+    "xs.append(6)\n"
+    "xs.append(7)\n"
+    "xs.append(8)\n"
+    "print(len(xs), xs[8], ends(xs))\n"
+    "fs = [1, 2.5]\n"
+    "print(fs[0], fs[-1])\n"
+    "bs = [True, False, True]\n"
+    "bs.append(False)\n"
+    "print(bs[0], bs[1], bs[2], bs[-1], len(bs))\n"
+    "ps = [Point(1, 2), Point(3, 4.5)]\n"
+    "print(ps[1].x, ps[-2].y)\n"
+)
+
+
+def test_list_types_are_inferred_from_their_elements(check):
+    module = check(SOURCE)
+
+    assert module.statements()[13].left().data_type() == DataType.from_str("list[float]")
+    assert isinstance(module.statements()[4], MethodCall)
+    assert module.statements()[4].name() == "list.append"
+
+
+def test_lists_are_unboxed_and_contiguous():
+    assert ir_type_for(DataType.from_str("list[int]")) == PTR_T(
+        ir.LiteralStructType([INT64_T, INT64_T, PTR_T(INT32_T)])
+    )
+    # Bools are packed into words
+    assert ir_type_for(DataType.from_str("list[bool]")).pointee.elements[2] == PTR_T(ir.IntType(64))
+    assert INT1_T not in ir_type_for(DataType.from_str("list[bool]")).pointee.elements
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "xs = []\n",
+        "xs = [1, True]\n",
+        "xs = [1]\nprint(xs[1.5])\n",
+        "x = 1\nprint(x[0])\n",
+        "xs = [1]\nxs.append(1.5)\n",
+        "xs = [1]\nxs.pop()\n",
+        "x = 1\nprint(len(x))\n",
+    ],
+)
+def test_invalid_list_operations_are_rejected(check, source: str):
+    with pytest.raises(ValueError):
+        check(source)
+
+
+def test_list_operations(generate, run_main, capfd):
+    module_ir: str = generate(SOURCE)
+
+    # Elements are read inline, without a call
+    ends_ir: str = module_ir.split('define i32 @"ends"')[1].split("}\n")[0]
+    assert '@"__sw_list' not in ends_ir
+    assert "getelementptr i32, i32*" in ends_ir
+
+    run_main(module_ir)
+
+    assert capfd.readouterr().out == "9 8 17\n1.0 2.5\nTrue False True False 4\n3 2.0\n"
@@ -0,0 +1,132 @@
+import faulthandler
+import math
+import os
+
+import pytest
+
+from sidewinder.compiler_toolchain.codegen.arithmetic import OverflowMode
+from sidewinder.compiler_toolchain.codegen.runtime import format_float
+
+FLOATS = [
+    (1.0, "1.0"),
+    (0.1, "0.1"),
+    (-2.5, "-2.5"),
+    (80.0, "80.0"),
+    (100000.0, "100000.0"),
+    (3e10, "30000000000.0"),
+    (1e15, "1000000000000000.0"),
+    (1e16, "1e+16"),
+    (1e20, "1e+20"),
+    (1e-4, "0.0001"),
+    (1e-5, "1e-05"),
+    (-0.0, "-0.0"),
+    (float("inf"), "inf"),
+    (float("nan"), "nan"),
+]
+
+
+@pytest.mark.parametrize("value, text", FLOATS)
+def test_floats_are_formatted_shortest(value: float, text: str):
+    assert format_float(value) == text
+
+
+def test_floats_are_formatted_alike_at_run_time(generate, run_main, capfd):
+    # Compile-time and run-time formatting must agree
+    calls: str = "".join(
+        f"show({value!r})\n" for value, _ in FLOATS if value == value and abs(value) != math.inf
+    )
+    module_ir: str = generate(
+        "def show(x: float) -> None:\n"
+        "    print(x)\n"
+        "\n"
+        f"{calls}"
+        "show(1e20 * 1e20)\n"
+        "show(1e20 * 1e20 * 0.0)\n"
+    )
+    capfd.readouterr()
+
+    run_main(module_ir=module_ir)
+
+    assert capfd.readouterr().out.splitlines() == [
+        text for value, text in FLOATS if value == value and abs(value) != math.inf
+    ] + ["inf", "nan"]
+
+
+def test_adjacent_constant_prints_are_merged(generate):
+    module_ir: str = generate("print(1, 'a')\nprint(2.5, True, None)\nprint()\n")
+
+    assert 'c"1 a\\0a2.5 True None\\0a\\0a\\00"' in module_ir
+    assert module_ir.count('call void @"__sw_stdout_write"') == 1
+    assert "printf" not in module_ir
+
+
+def test_values_are_printed_through_the_buffer(generate, run_main, capfd):
+    module_ir: str = generate(
+        "def show(n: int, x: float, flag: bool, s: str) -> None:\n"
+        "    print('n =', n, x, flag, s)\n"
+        "    print(n * 1000, -n, 0.1 + x)\n"
+        "\n"
+        "def count(n: int) -> int:\n"
+        "    print('counting')\n"
+        "    return n + 1\n"
+        "\n"
+        "show(count(-3), 0.5, 1 < 2, 'done')\n"
+        "print(1.0 / 3)\n"
+    )
+    capfd.readouterr()
+
+    run_main(module_ir=module_ir)
+
+    assert capfd.readouterr().out == "counting\nn = -2 0.5 True done\n-2000 2 0.6\n0.33333334\n"
+
+
+def test_arguments_are_evaluated_before_printing(generate, run_main, capfd):
+    module_ir: str = generate(
+        "def g() -> int:\n"
+        "    print('inside')\n"
+        "    return 5\n"
+        "\n"
+        "print('before')\n"
+        "print('a', g())\n"
+    )
+    capfd.readouterr()
+
+    run_main(module_ir=module_ir)
+
+    assert capfd.readouterr().out == "before\ninside\na 5\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Traps are run in a child process")
+@pytest.mark.parametrize(
+    "source",
+    [
+        "def get(xs: list[int], i: int) -> int:\n"
+        "    return xs[i]\n"
+        "\n"
+        "print('before')\n"
+        "print(get([1, 2], 5))\n",
+        "def square(x: int) -> int:\n"
+        "    return x * x\n"
+        "\n"
+        "print('before')\n"
+        "print(square(100000))\n",
+    ],
+    ids=["index", "overflow"],
+)
+def test_output_is_flushed_before_trapping(generate, run_main, source: str, capfd):
+    module_ir: str = generate(source, overflow_mode=OverflowMode.TRAP)
+    capfd.readouterr()
+
+    pid: int = os.fork()
+    if pid == 0:
+        # The trap is expected, so it is not reported
+        faulthandler.disable()
+        try:
+            run_main(module_ir=module_ir)
+        finally:
+            os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+
+    assert os.WIFSIGNALED(status)
+    assert capfd.readouterr().out == "before\n"
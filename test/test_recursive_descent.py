@@ -0,0 +1,152 @@
+import re
+from io import StringIO
+
+import pytest
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    BinaryOperator,
+    DataTypeName,
+    FunctionCall,
+    FunctionDef,
+    Module,
+    Node,
+    Return,
+    Sum,
+    UnaryOperation,
+    UnaryOperator,
+)
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+
+
+def build_ast(source: str) -> Node:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    return RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+
+
+def without_ids(node: Node) -> str:
+    return re.sub(r" (?:@|at) (?:0x)?[0-9a-f]+", "", repr(node))
+
+
+def test_function_def_and_call():
+    module = build_ast(
+        "def add(x: int, y: int = 0) -> int:\n"
+        "    return x + y\n"
+        "\n"
+        "z: int = add(1, 3)\n"
+        "print(z)\n"
+    )
+
+    assert isinstance(module, Module)
+    func_def, assignment, call = module.statements()
+
+    assert isinstance(func_def, FunctionDef)
+    assert func_def.name() == "add"
+    assert [param.name() for param in func_def.parameters()] == ["x", "y"]
+    assert func_def.parameters()[1].default_value().int_value() == 0
+    assert func_def.return_type().name() == DataTypeName.INT
+
+    (return_stmt,) = func_def.statements()
+    assert isinstance(return_stmt, Return)
+    assert isinstance(return_stmt.expressions()[0], Sum)
+
+    assert isinstance(assignment, Assignment)
+    assert assignment.left().name() == "z"
+    assert isinstance(assignment.right(), FunctionCall)
+
+    assert isinstance(call, FunctionCall)
+    assert call.name() == "print"
+
+
+def test_sum_is_left_associative():
+    (sum_node,) = build_ast("f(1 + 2 + 3)\n").statements()[0].arguments()
+
+    assert isinstance(sum_node.left(), Sum)
+    assert sum_node.right().int_value() == 3
+
+
+def test_operator_precedence():
+    module = build_ast("f(not a < 1 + 2 * -b and c or d)\n")
+    (expression,) = module.statements()[0].arguments()
+
+    # ((not (a < (1 + (2 * (-b))))) and c) or d
+    assert expression.operator() == BinaryOperator.OR
+    conjunction = expression.left()
+    assert conjunction.operator() == BinaryOperator.AND
+
+    inversion = conjunction.left()
+    assert isinstance(inversion, UnaryOperation) and inversion.operator() == UnaryOperator.NOT
+
+    comparison = inversion.operand()
+    assert comparison.operator() == BinaryOperator.LESS_THAN
+    assert isinstance(comparison.right(), Sum)
+
+    product = comparison.right().right()
+    assert product.operator() == BinaryOperator.MULTIPLY
+    assert product.right().operator() == UnaryOperator.NEGATE
+
+
+def test_atoms_are_interned():
+    module = build_ast("f(x, 0x10, x, 2.5, -3, 'a', 0x10)\n")
+    x1, hex1, x2, num, neg, string, hex2 = module.statements()[0].arguments()
+
+    assert x1.index() == x2.index() and hex1.index() == hex2.index()
+    assert x1.pool() is module.atom_pool()
+    assert len(module.atom_pool()) == 6
+    assert hex1.int_value() == 16
+    assert num.float_value() == 2.5
+    assert neg.int_value() == -3
+    assert string.str_value() == "a"
+    assert [module.atom_pool().value(i) for i in module.atom_pool().constants()] == [
+        16,
+        2.5,
+        -3,
+        "a",
+    ]
+
+
+def test_syntax_error():
+    with pytest.raises(ValueError):
+        build_ast("def f(x):\n    return x\n")
+
+
+def build_antlr_ast(source: str) -> Node:
+    pytest.importorskip("PythonParser")
+
+    from sidewinder.compiler_toolchain.antlr.parser import AntlrParser
+    from sidewinder.compiler_toolchain.antlr.visitor_ast_builder import AntlrVisitorASTBuilder
+
+    parse_tree = AntlrParser().parse(input=StringIO(source))
+    return AntlrVisitorASTBuilder().generate_ast(parse_tree=parse_tree)
+
+
+@pytest.mark.parametrize("front_end", [build_ast, build_antlr_ast])
+@pytest.mark.parametrize(
+    "source", ["print(1 == 2 == False)\n", "x = 1 < 2 <= 3\n", "x = not 1 != 2 > 0\n"]
+)
+def test_chained_comparisons_are_rejected(front_end, source: str):
+    with pytest.raises(ValueError, match="Unsupported chained comparison"):
+        front_end(source)
+
+
+@pytest.mark.parametrize("front_end", [build_ast, build_antlr_ast])
+def test_parenthesized_comparisons_are_not_chained(front_end):
+    call: FunctionCall = front_end("print((1 == 2) == False)\n").statements()[0]
+    comparison = call.arguments()[0]
+
+    assert comparison.operator() == BinaryOperator.EQUAL
+    assert comparison.left().operator() == BinaryOperator.EQUAL
+
+
+@pytest.mark.parametrize("source", ["print(5, 7)\n", "print(1)\nprint(2, 3)\n"])
+def test_matches_antlr_front_end(source: str):
+    pytest.importorskip("PythonParser")
+
+    from sidewinder.compiler_toolchain.antlr.ast_builder import AntlrASTBuilder
+    from sidewinder.compiler_toolchain.antlr.parser import AntlrParser
+
+    parse_tree = AntlrParser().parse(input=StringIO(source))
+    expected: Node = AntlrASTBuilder().generate_ast(parse_tree=parse_tree)
+
+    assert without_ids(build_ast(source)) == without_ids(expected)
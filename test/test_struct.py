@@ -0,0 +1,65 @@
+import pytest
+from llvmlite import ir
+
+from sidewinder.compiler_toolchain.ast import DataType, DataTypeName
+from sidewinder.compiler_toolchain.codegen.types import FLOAT32_T, ir_type_for
+
+SOURCE = (
+    "def add(a: Complex, b: Complex) -> Complex:\n"
+    "    return Complex(a.real + b.real, a.imag + b.imag)\n"
+    "\n"
+    "struct Complex:\n"
+    "    real: float\n"
+    "    imag: float\n"
+    "\n"
+    "def norm(c: Complex) -> float:\n"
+    "    return c.real * c.real + c.imag * c.imag\n"
+    "\n"
+    "z: Complex = add(Complex(1, 2), Complex(0.5, 1))\n"
+    "print(z.real, z.imag, norm(z))\n"
+)
+
+
+def test_struct_types_are_resolved_from_their_fields(check):
+    module = check(SOURCE)
+    complex_type: DataType = module.statements()[1].data_type()
+
+    assert complex_type.name() == DataTypeName.STRUCT
+    assert complex_type.field_names() == ("real", "imag")
+    assert module.statements()[0].return_type() is complex_type
+    assert module.statements()[3].left().data_type() is complex_type
+    assert DataType.from_str("Complex?").parameters()[0] is DataType.struct_reference("Complex")
+
+
+def test_structs_lower_to_literal_struct_types(check):
+    complex_type: DataType = check(SOURCE).statements()[1].data_type()
+
+    assert ir_type_for(complex_type) == ir.LiteralStructType([FLOAT32_T, FLOAT32_T])
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "struct A:\n    b: B\n\nstruct B:\n    a: A\n",
+        "struct A:\n    x: int\n    x: int\n",
+        "struct A:\n    x: int = 1\n",
+        "struct A:\n    x: int\n\na = A(1)\nprint(a.y)\n",
+        "struct A:\n    x: int\n\na = A(1.5)\n",
+        "x: Undefined = 1\n",
+    ],
+)
+def test_invalid_structs_are_rejected(check, source: str):
+    with pytest.raises(ValueError):
+        check(source)
+
+
+def test_structs_are_passed_and_returned_by_value(generate, run_main, capfd):
+    module_ir: str = generate(SOURCE)
+
+    assert 'define {float, float} @"add"({float, float} %"a", {float, float} %"b")' in module_ir
+    # Parameters that are never reassigned need no stack slot
+    assert "alloca" not in module_ir.split('define i32 @"main"')[0]
+
+    run_main(module_ir)
+
+    assert capfd.readouterr().out == "1.5 3.0 11.25\n"
@@ -0,0 +1,121 @@
+from io import StringIO
+
+import pytest
+from llvmlite import binding, ir
+
+from sidewinder.compiler_toolchain.ast import Assignment, FunctionCall, FunctionDef, Module
+from sidewinder.compiler_toolchain.clang.linker import ClangLinker
+from sidewinder.compiler_toolchain.codegen.code_generator import (
+    CodeGenerator,
+    CodeGeneratorASTVisitor,
+    ModuleCodeGenerator,
+)
+from sidewinder.compiler_toolchain.optimization.tree_shaker import TreeShaker
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
+
+SOURCE = (
+    "def base() -> int:\n"
+    "    return 2\n"
+    "\n"
+    "def scale(x: int, y: int = base()) -> int:\n"
+    "    return x + y\n"
+    "\n"
+    "counter = scale(1)\n"
+    "unused_value = 5\n"
+    "\n"
+    "def unused(x: int) -> int:\n"
+    "    return x + 1\n"
+    "\n"
+    "def helper(x: int) -> int:\n"
+    "    return x + counter\n"
+    "\n"
+    "def side(x: int) -> int:\n"
+    "    return helper(x)\n"
+    "\n"
+    "def only_for_dropped(x: int) -> int:\n"
+    "    return x\n"
+    "\n"
+    "dropped = only_for_dropped(3)\n"
+    "kept_call = side(1)\n"
+    "result = unused(4)\n"
+    "total = result + 1\n"
+)
+
+
+def shake(source: str, tree_shaker: TreeShaker) -> Module:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    module = RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+    TypeChecker().check(module=module)
+
+    return tree_shaker.shake(module=module)
+
+
+def test_unreachable_functions_and_unread_globals_are_removed():
+    module = shake(SOURCE, tree_shaker=TreeShaker())
+
+    function_names = {
+        statement.name() for statement in module.statements() if isinstance(statement, FunctionDef)
+    }
+    # base() is only called from a default value, which the caller evaluates
+    assert function_names == {"base", "scale", "helper", "side"}
+
+    assigned_names = [
+        statement.left().name()
+        for statement in module.statements()
+        if isinstance(statement, Assignment)
+    ]
+    # Dropping total, which is never read, leaves result unread too
+    assert assigned_names == ["counter"]
+
+    # side() reads a global, so its call is kept for its effects
+    (call,) = [
+        statement for statement in module.statements() if isinstance(statement, FunctionCall)
+    ]
+    assert call.name() == "side"
+
+
+def test_used_builtins_are_reported():
+    tree_shaker = TreeShaker()
+    shake(SOURCE, tree_shaker=tree_shaker)
+
+    assert tree_shaker.used_builtins() == frozenset()
+
+
+def test_globals_get_their_own_sections():
+    module = shake(SOURCE, tree_shaker=TreeShaker())
+    generator = CodeGenerator(triple="x86_64-unknown-linux-gnu")
+    module_ir = CodeGeneratorASTVisitor(generator=generator).generate_module(
+        name="sections", node=module
+    )
+
+    assert 'define i32 @"helper"(i32 %"x") section ".text.helper"' in module_ir
+    # counter is evaluated at compile time, which makes it constant
+    assert 'section ".rodata.counter"' in module_ir
+    binding.parse_assembly(module_ir).verify()
+
+    darwin_generator = CodeGenerator(triple="arm64-apple-darwin23.0.0")
+    assert not darwin_generator.function_sections()
+
+
+def test_sections_are_assigned_before_the_module_is_dumped():
+    generator = ModuleCodeGenerator(module=ir.Module(name="sections"))
+    generator.dump()
+
+    with pytest.raises(RuntimeError):
+        generator.assign_sections()
+
+
+def test_linker_garbage_collects_sections(monkeypatch, tmp_path):
+    recorded = []
+    monkeypatch.setattr("subprocess.run", lambda args, check: recorded.append(args))
+    monkeypatch.setattr("sys.platform", "linux")
+
+    ClangLinker(clang_path=None).link(objects=[tmp_path / "a.o"], output=tmp_path / "a.out")
+    ClangLinker(clang_path=None, gc_sections=False).link(
+        objects=[tmp_path / "a.o"], output=tmp_path / "a.out"
+    )
+
+    assert "-Wl,--gc-sections" in recorded[0]
+    assert "-Wl,--gc-sections" not in recorded[1]
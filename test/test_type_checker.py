@@ -0,0 +1,115 @@
+from io import StringIO
+
+import pytest
+from llvmlite import binding
+
+from sidewinder.compiler_toolchain.ast import (
+    Assignment,
+    DataType,
+    DataTypeName,
+    FunctionDef,
+    Module,
+    Node,
+)
+from sidewinder.compiler_toolchain.codegen.code_generator import (
+    CodeGenerator,
+    CodeGeneratorASTVisitor,
+)
+from sidewinder.compiler_toolchain.codegen.types import ir_type_for
+from sidewinder.compiler_toolchain.recursive_descent.ast_builder import RecursiveDescentASTBuilder
+from sidewinder.compiler_toolchain.recursive_descent.parser import RecursiveDescentParser
+from sidewinder.compiler_toolchain.semantic.type_checker import TypeChecker
+
+
+def check(source: str) -> Node:
+    tokens = RecursiveDescentParser().parse(input=StringIO(source))
+    module = RecursiveDescentASTBuilder().generate_ast(parse_tree=tokens)
+
+    return TypeChecker().check(module=module)
+
+
+def test_expression_types_are_resolved():
+    module = check(
+        "def add(x: int, y: float = 0) -> float:\n"
+        "    return x + y\n"
+        "\n"
+        "z = add(1)\n"
+        "w = z + 2\n"
+    )
+
+    assert isinstance(module, Module)
+    func_def, z, w = module.statements()
+    assert isinstance(func_def, FunctionDef)
+    assert func_def.statements()[0].return_type().name() == DataTypeName.FLOAT
+
+    assert isinstance(z, Assignment)
+    assert z.right().data_type().name() == DataTypeName.FLOAT
+    assert w.left().data_type().name() == DataTypeName.FLOAT
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x: int = 1.5\n",
+        "y = x\n",
+        "def f(x: int) -> int:\n    return x\n\nf()\n",
+        "def f(x: int = 0, y: int) -> int:\n    return x\n",
+        "def f() -> int:\n    pass\n",
+        "x: int = 1\nx: float = 2.0\n",
+        "x = True + 1\n",
+        "x = 'a' - 'b'\n",
+        "x = 1 < True\n",
+        "x = 1 and True\n",
+        "x = not 1\n",
+        "x = -True\n",
+        "x: int = 4 / 2\n",
+    ],
+)
+def test_type_errors(source: str):
+    with pytest.raises(ValueError):
+        check(source)
+
+
+def test_primitives_are_lowered_unboxed():
+    module = check(
+        "def add(x: int, y: int = 2) -> int:\n"
+        "    return x + y\n"
+        "\n"
+        "def half() -> float:\n"
+        "    return 0.5\n"
+        "\n"
+        "z: int = add(1)\n"
+        "b = True\n"
+    )
+    generator = CodeGenerator(triple=binding.get_default_triple())
+    module_ir: str = CodeGeneratorASTVisitor(
+        generator=generator, evaluate_at_compile_time=False
+    ).generate_module(name="test", node=module)
+
+    binding.parse_assembly(module_ir).verify()
+    assert 'define i32 @"add"(i32 %"x", i32 %"y")' in module_ir
+    assert 'define float @"half"()' in module_ir
+    assert 'call i32 @"add"(i32 1, i32 2)' in module_ir
+    assert '@"b" = global i1 0' in module_ir
+
+
+def test_data_types_are_interned():
+    nested = DataType.from_str("dict[str, list[float]]")
+
+    assert nested is DataType(
+        name=DataTypeName.DICT,
+        parameters=(DataType(name=DataTypeName.STR), DataType.from_str("list[float]")),
+    )
+    assert str(nested) == "dict[str, list[float]]"
+    assert DataType.from_str("int?") is DataType.from_str("Optional[int]")
+    assert DataType.none_type() is FunctionDef().return_type()
+    assert ir_type_for(nested) is ir_type_for(DataType.from_str("dict[str,list[float]]"))
+
+    with pytest.raises(ValueError):
+        DataType(name=DataTypeName.LIST)
+
+
+def test_optional_annotations():
+    module = check("x: int? = None\nx = 3\n")
+
+    assert module.statements()[1].left().data_type() is DataType.from_str("Optional[int]")
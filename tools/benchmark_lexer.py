@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import argparse
+import timeit
+from pathlib import Path
+
+from antlr4 import InputStream
+from PythonLexer import PythonLexer
+
+from sidewinder.compiler_toolchain.lexer import Lexer
+
+
+def main() -> None:
+    args = parse_args()
+
+    source: str = args.input.read_text() * args.repeat
+    lexer = Lexer(allow_fallback=False)
+
+    fast_time: float = min(
+        timeit.repeat(lambda: lexer.lex_str(source=source), number=1, repeat=args.trials)
+    )
+    antlr_time: float = min(
+        timeit.repeat(
+            lambda: PythonLexer(input=InputStream(data=source)).getAllTokens(),
+            number=1,
+            repeat=args.trials,
+        )
+    )
+
+    print(f"Fast lexer:  {fast_time * 1000:.2f} ms")
+    print(f"ANTLR lexer: {antlr_time * 1000:.2f} ms")
+    print(f"Speedup:     {antlr_time / fast_time:.1f}x")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="")
+    parser.add_argument("-i", "--input", type=Path, required=True)
+    parser.add_argument("-r", "--repeat", type=int, default=100, help="Copies of the input to lex")
+    parser.add_argument("-t", "--trials", type=int, default=5)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import MutableSequence, Optional, Sequence
+
+# The proxy generator is a script rather than part of the package
+sys.path.append(str(Path(__file__).parent.parent / "doc"))
+
+from function_generator import (
+    FunctionSignature,
+    generate_used_function_proxies,
+    parse_function_signature,
+)
+
+_include_directory: Path = Path(__file__).parent.parent / "cpp" / "include"
+
+_proxy_program_prelude: str = """
+#include <any>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+struct FunctionBase {};
+"""
+
+
+def main() -> None:
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        executables: MutableSequence[Path] = []
+
+        if args.builtins:
+            executables.append(
+                build_proxy_program(num_builtins=args.builtins, directory=Path(temp_dir))
+            )
+
+        if args.input:
+            # Only needed for Sidewinder inputs, and needs the generated parser
+            from sidewinder.compiler_toolchain import swc
+
+        for input_path in args.input:
+            executable: Path = Path(temp_dir) / input_path.stem
+            swc.compile(input_paths=[input_path], output_path=executable)
+            executables.append(executable)
+
+        for executable in executables:
+            times: Sequence[float] = time_startup(executable=executable, runs=args.runs)
+            initializers: Optional[bool] = has_static_initializers(executable=executable)
+
+            print(
+                f"{executable.name}: min {min(times) * 1000:.3f} ms, "
+                f"median {statistics.median(times) * 1000:.3f} ms, "
+                f"static initializers: "
+                f"{'unknown' if initializers is None else 'yes' if initializers else 'none'}"
+            )
+
+
+def build_proxy_program(num_builtins: int, directory: Path) -> Path:
+    """
+    A C++ program that defines proxies for `num_builtins` builtins and
+    returns right away, so that running it measures the cost of their
+    initialization.
+    """
+    compiler: Optional[str] = shutil.which("g++") or shutil.which("clang++")
+
+    if compiler is None:
+        raise ValueError("No C++ compiler available to build the proxy program")
+
+    func_sigs: Sequence[FunctionSignature] = [
+        parse_function_signature(s=f"int builtin{i}(int x, int y = {i})")
+        for i in range(num_builtins)
+    ]
+    implementations: str = "".join(
+        f"int __UserFunctionImplementation__{func_sig.name}(int x, int y) {{ return x + y; }}\n"
+        for func_sig in func_sigs
+    )
+
+    source: Path = directory / "proxies.cpp"
+    source.write_text(
+        _proxy_program_prelude
+        + implementations
+        + generate_used_function_proxies(func_sigs=func_sigs, used_names=None)
+        + "int main() { return builtin0(0); }\n"
+    )
+
+    executable: Path = directory / f"proxies_{num_builtins}"
+    subprocess.run(
+        [compiler, "-std=c++20", "-O2", f"-I{_include_directory}", str(source)]
+        + ["-o", str(executable)],
+        check=True,
+    )
+
+    return executable
+
+
+def time_startup(executable: Path, runs: int) -> Sequence[float]:
+    """
+    Wall time of each of `runs` runs of `executable`, from spawning it to
+    its exit.
+    """
+    times: MutableSequence[float] = []
+
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        subprocess.run([str(executable)], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def has_static_initializers(executable: Path) -> Optional[bool]:
+    """
+    Whether `executable` runs initializers of its own before main(), which
+    GCC and Clang emit as _GLOBAL__sub_I_ functions, or None if there is no
+    nm to tell.
+    """
+    nm: Optional[str] = shutil.which("nm")
+
+    if nm is None:
+        return None
+
+    symbols: str = subprocess.run(
+        [nm, str(executable)], check=True, capture_output=True, text=True
+    ).stdout
+
+    return "_GLOBAL__sub_I_" in symbols
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measures the startup time of compiled Sidewinder binaries"
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        type=Path,
+        action="append",
+        default=[],
+        help="A Sidewinder source file to compile with swc and run. May be given several times.",
+    )
+    parser.add_argument(
+        "-b",
+        "--builtins",
+        type=int,
+        default=300,
+        help="Builtins to generate proxies for in a C++ program to run, or 0 for none",
+    )
+    parser.add_argument("-r", "--runs", type=int, default=100)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,8 @@ from pathlib import Path
 
 from PythonParser import PythonParser
 
-from sidewinder.compiler_toolchain.antlr.ast_builder import AntlrASTBuilder
 from sidewinder.compiler_toolchain.antlr.parser import AntlrParser
+from sidewinder.compiler_toolchain.antlr.visitor_ast_builder import AntlrVisitorASTBuilder
 from sidewinder.compiler_toolchain.ast import Node
 from sidewinder.compiler_toolchain.parser import ParseTreeNode
 
@@ -21,7 +21,7 @@ def main() -> None:
     parser: PythonParser = antlr_builder._create_parser(input=input_buffer)
     parse_tree: ParseTreeNode = parser.file_input()
     parse_tree = antlr_builder._postprocess_parse_tree(parse_tree=parse_tree)
-    ast_builder = AntlrASTBuilder()
+    ast_builder = AntlrVisitorASTBuilder()
     node: Node = ast_builder.generate_ast(parse_tree=parse_tree)
 
     print(f"Resulting AST: {node}")
@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import sys
 from io import StringIO
 from pathlib import Path
+from typing import Optional
 
 from PythonParser import PythonParser
 
 from sidewinder.compiler_toolchain.antlr.parser import AntlrParser
-from sidewinder.compiler_toolchain.antlr.rendering import render_as_png
+from sidewinder.compiler_toolchain.antlr.rendering import (
+    DEFAULT_MAX_LABEL_LENGTH,
+    LineRange,
+    find_subtree,
+    render_as_png,
+    write_parse_tree_dot,
+)
 from sidewinder.compiler_toolchain.parser import ParseTreeNode
 
 
@@ -22,13 +30,66 @@ def main() -> None:
     parse_tree: ParseTreeNode = parser.file_input()
     parse_tree = antlr_builder._postprocess_parse_tree(parse_tree=parse_tree)
 
-    render_as_png(parse_tree=parse_tree, parser=parser, output_path=output_path)
+    line_range: Optional[LineRange] = None
+
+    if args.first_line is not None or args.last_line is not None:
+        line_range = LineRange(
+            first=args.first_line if args.first_line is not None else 1,
+            last=args.last_line if args.last_line is not None else sys.maxsize,
+        )
+
+    if args.rule:
+        subtree: Optional[ParseTreeNode] = find_subtree(
+            tree=parse_tree, parser=parser, rule_name=args.rule, line=args.first_line
+        )
+
+        if subtree is None:
+            print(f"No {args.rule} node found", file=sys.stderr)
+            sys.exit(1)
+
+        parse_tree = subtree
+
+    if output_path.suffix == ".dot":
+        with output_path.open("w") as out:
+            write_parse_tree_dot(
+                tree=parse_tree,
+                parser=parser,
+                out=out,
+                max_depth=args.max_depth,
+                line_range=line_range,
+                max_label_length=args.max_label_length,
+            )
+    else:
+        render_as_png(
+            parse_tree=parse_tree,
+            parser=parser,
+            output_path=output_path,
+            max_depth=args.max_depth,
+            line_range=line_range,
+            max_label_length=args.max_label_length,
+        )
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="")
     parser.add_argument("-i", "--input", type=Path, required=True)
-    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        required=True,
+        help="Output path, written as DOT if it ends in .dot and as PNG otherwise",
+    )
+    parser.add_argument("--rule", type=str, help="Only render the first subtree for this rule")
+    parser.add_argument("--first-line", type=int, help="First source line to render")
+    parser.add_argument("--last-line", type=int, help="Last source line to render")
+    parser.add_argument("--max-depth", type=int, help="Maximum depth of nodes to render")
+    parser.add_argument(
+        "--max-label-length",
+        type=int,
+        default=DEFAULT_MAX_LABEL_LENGTH,
+        help="Labels longer than this are truncated",
+    )
 
     return parser.parse_args()
 